@@ -4,7 +4,28 @@ import glob
 import os
 import re
 import logging
+import argparse
+import io
+import hashlib
+import time
+import cProfile
+import pstats
+import tracemalloc
+import ctypes
+import ctypes.util
+import select
+import struct
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+# Replaced by configure_logger when run as a script
+logger = logging.getLogger(__name__)
 
 # Mapping of book abbreviations to (English Name, Amharic Name)
 BOOK_MAPPINGS = {
@@ -100,6 +121,337 @@ def configure_logger(log_file, log_level=logging.INFO):
     logger.addHandler(file_handler)
     return logger
 
+# Per-book counters, in the order of the summary table
+METRIC_FIELDS = ('files', 'bytes', 'verses', 'read_seconds', 'parse_seconds', 'serialize_seconds',
+                 'write_seconds', 'total_seconds', 'peak_memory')
+
+# The counters of the book being built, set by collect_metrics; None when nothing is collecting
+_metrics = None
+
+def new_metrics():
+    """Returns a zeroed set of book counters, keyed by METRIC_FIELDS."""
+    return {field: 0.0 if field.endswith('_seconds') else 0 for field in METRIC_FIELDS}
+
+@contextmanager
+def collect_metrics(metrics):
+    """Makes the readers, parsers and writers of this module add their counters to metrics.
+
+    Args:
+        metrics (dict): Counters from new_metrics, updated in place.
+    """
+    global _metrics
+    previous, _metrics = _metrics, metrics
+    try:
+        yield metrics
+    finally:
+        _metrics = previous
+
+def read_source(path):
+    """Reads and decodes a source HTML file, counting it in the active metrics.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: The decoded text.
+    """
+    start = time.perf_counter()
+    with open(path, 'r', encoding='iso-8859-1') as f:
+        text = f.read()
+    if _metrics is not None:
+        _metrics['files'] += 1
+        _metrics['bytes'] += len(text)
+        _metrics['read_seconds'] += time.perf_counter() - start
+    return text
+
+def parse_html(text):
+    """Builds the BeautifulSoup tree of a source file, counting the time in the active metrics.
+
+    Args:
+        text (str): The decoded HTML.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    start = time.perf_counter()
+    soup = BeautifulSoup(text, 'html.parser')
+    if _metrics is not None:
+        _metrics['parse_seconds'] += time.perf_counter() - start
+    return soup
+
+def serialize_book(book_title_english, book_title_amharic, chapters):
+    """Serializes a parsed book to the JSON written to json/{abbr}.json.
+
+    Args:
+        book_title_english (str): The English title.
+        book_title_amharic (str): The Amharic title.
+        chapters (list): The chapter entries, each with 'chapter' and 'verses' keys.
+
+    Returns:
+        str: The JSON string.
+    """
+    start = time.perf_counter()
+    json_output = json.dumps({
+        'book': book_title_english,
+        'book_amharic': book_title_amharic,
+        'chapters': chapters
+    }, ensure_ascii=False, indent=2)
+    if _metrics is not None:
+        _metrics['verses'] += sum(len(chapter['verses']) for chapter in chapters)
+        _metrics['serialize_seconds'] += time.perf_counter() - start
+    return json_output
+
+def split_verse_text(text):
+    """Splits the text of a verse font tag into its verse number(s) and verse text.
+
+    Merged verses are marked like "3፤4 ..." and become the range "3-4".
+
+    Args:
+        text (str): The text of the <font> tag.
+
+    Returns:
+        tuple: (verse_numbers, verse_text) as strings.
+    """
+    parts = text.strip().split(" ")
+    verse_numbers = parts[0].replace("&#4964;", "")
+    verse_numbers_list = verse_numbers.split("፤")
+    verse_numbers_list = [v for v in verse_numbers_list if v]  # Remove empty strings
+    if len(verse_numbers_list) > 1:
+        verse_numbers = "-".join(verse_numbers_list)
+    elif len(verse_numbers_list) == 1:
+        verse_numbers = verse_numbers_list[0]
+    verse_text = " ".join(parts[1:]).strip()
+    return verse_numbers, verse_text
+
+def extract_verses_soup(chapter_file):
+    """Yields the verses of a chapter file by building a BeautifulSoup tree.
+
+    Args:
+        chapter_file (str): The path to the chapter file.
+
+    Yields:
+        tuple: (verse_numbers, verse_text) for each verse, in document order.
+    """
+    soup = parse_html(read_source(chapter_file))
+    for p in soup.find_all('p'):
+        font_tag = p.find('font', {'face': 'GF Zemen Unicode'})
+        if font_tag:
+            yield split_verse_text(font_tag.text)
+
+class VerseFont:
+    """An open <font face="GF Zemen Unicode">: its text so far and the slots of the <p>s it is the verse of."""
+
+    __slots__ = ('buffer', 'slots')
+
+    def __init__(self, slots):
+        self.buffer = []
+        self.slots = slots
+
+class VerseFontParser(HTMLParser):
+    """Single pass HTML scanner that finds the verse text of a chapter without building a tree.
+
+    It reports, for each <p>, the text of the first <font face="GF Zemen Unicode"> inside it,
+    which is what extract_verses_soup gets from p.find('font', ...) on the html.parser tree.
+    Open tags are tracked on a stack and closed the way BeautifulSoup does it: an end tag pops
+    back to the most recent open tag of that name and is ignored if there is none, and tags
+    still open at the end of the file are closed there.
+
+    Text follows BeautifulSoup's html.parser builder too: character and entity references are
+    converted by its rules (an unknown &name; keeps its ampersand and loses the semicolon, a
+    reference without a semicolon at the end of the file stays literal), the data between two
+    tags becomes one string, whitespace-only strings collapse to a space or a newline outside
+    <pre> and <textarea>, CDATA sections are text, and comments, declarations and strings
+    inside script, style, template, rt and rp are not.
+    """
+
+    VOID_ELEMENTS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+    STRING_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+    PRESERVE_WHITESPACE = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+    NUMERIC_REFERENCE_RES = {10: re.compile("^([0-9]+)(.*)"), 16: re.compile("^([0-9a-f]+)(.*)")}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []  # [tag, state]: a <p> state is True until its verse font is found,
+                         # a verse <font> state is its VerseFont
+        self.capturing = []  # Open verse fonts whose text is still being collected
+        self.pending = deque()  # One slot per <p> with a verse font, in <p> order
+        self.verses = []  # Finished verse texts, drained by the caller
+        self.data = []  # Data since the last tag, comment or declaration
+        self.closed_empty_elements = []  # Void tags whose end tag, if one follows, is skipped
+
+    def handle_starttag(self, tag, attrs, close_empty_element=True):
+        self._end_string()
+        state = None
+        if tag == 'p':
+            state = True
+        elif tag == 'font' and dict(attrs).get('face') == 'GF Zemen Unicode':
+            # Every open <p> still waiting for a verse font gets this one
+            slots = []
+            for entry in self.stack:
+                if entry[0] == 'p' and entry[1]:
+                    entry[1] = False
+                    slot = [None]
+                    slots.append(slot)
+                    self.pending.append(slot)
+            if slots:
+                state = VerseFont(slots)
+                self.capturing.append(state)
+        self.stack.append([tag, state])
+        if tag in self.VOID_ELEMENTS and close_empty_element:
+            self._pop_to(tag)
+            self.closed_empty_elements.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, close_empty_element=False)
+        self._end_string()
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_empty_elements:
+            self.closed_empty_elements.remove(tag)
+            return
+        self._end_string()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        base, reference_re = 10, self.NUMERIC_REFERENCE_RES[10]
+        if name[:1] in ('x', 'X'):
+            name, base, reference_re = name[1:], 16, self.NUMERIC_REFERENCE_RES[16]
+        try:
+            number, rest = int(name, base), ""
+        except ValueError:
+            match = reference_re.search(name)
+            number, rest = (int(match.group(1), base), match.group(2)) if match else (None, name)
+        if number is not None:
+            self.data.append(UnicodeDammit.numeric_character_reference(number)[0])
+        self.data.append(rest)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.data.append(f"&{name}" if character is None else character)
+
+    def handle_comment(self, data):
+        self._end_string()
+
+    def handle_decl(self, decl):
+        self._end_string()
+
+    def handle_pi(self, data):
+        self._end_string()
+
+    def unknown_decl(self, data):
+        self._end_string()
+        if data.upper().startswith("CDATA["):
+            self.data.append(data[len("CDATA["):])
+            self._end_string(cdata=True)
+
+    def close(self):
+        super().close()
+        self._end_string()
+        # Tags still open at the end of the file run to the end of the document
+        for font in reversed(self.capturing[:]):
+            self._finish_font(font)
+        self.stack = []
+
+    def _end_string(self, cdata=False):
+        # Joins the data since the last event into one string and adds it to the open verse fonts
+        if not self.data:
+            return
+        text = "".join(self.data)
+        self.data = []
+        if (not any(tag in self.PRESERVE_WHITESPACE for tag, _ in self.stack)
+                and all(c in BeautifulSoup.ASCII_SPACES for c in text)):
+            text = "\n" if "\n" in text else " "
+        if not cdata and any(tag in self.STRING_CONTAINERS for tag, _ in self.stack):
+            return
+        for font in self.capturing:
+            font.buffer.append(text)
+
+    def _pop_to(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                break
+        else:
+            return
+        for closed_tag, state in reversed(self.stack[i:]):
+            if closed_tag == 'font' and state is not None:
+                self._finish_font(state)
+        del self.stack[i:]
+
+    def _finish_font(self, font):
+        # By identity: two open fonts can hold equal text
+        self.capturing = [open_font for open_font in self.capturing if open_font is not font]
+        text = "".join(font.buffer)
+        for slot in font.slots:
+            slot[0] = text
+        while self.pending and self.pending[0][0] is not None:
+            self.verses.append(self.pending.popleft()[0])
+
+def extract_verses_stream(chapter_file, chunk_size=65536):
+    """Yields the verses of a chapter file from a single streaming pass, without building a tree.
+
+    The output is identical to extract_verses_soup.
+
+    Args:
+        chapter_file (str): The path to the chapter file.
+        chunk_size (int): Number of characters fed to the scanner at a time.
+
+    Yields:
+        tuple: (verse_numbers, verse_text) for each verse, in document order.
+    """
+    parser = VerseFontParser()
+    read_seconds = parse_seconds = 0.0
+    size = 0
+    with open(chapter_file, 'r', encoding='iso-8859-1') as f:
+        while True:
+            start = time.perf_counter()
+            chunk = f.read(chunk_size)
+            fed = time.perf_counter()
+            read_seconds += fed - start
+            if not chunk:
+                break
+            size += len(chunk)
+            parser.feed(chunk)
+            parse_seconds += time.perf_counter() - fed
+            for text in parser.verses:
+                yield split_verse_text(text)
+            parser.verses.clear()
+    start = time.perf_counter()
+    parser.close()
+    parse_seconds += time.perf_counter() - start
+    if _metrics is not None:
+        _metrics['files'] += 1
+        _metrics['bytes'] += size
+        _metrics['read_seconds'] += read_seconds
+        _metrics['parse_seconds'] += parse_seconds
+    for text in parser.verses:
+        yield split_verse_text(text)
+
+# Verse extraction backends, selected with --backend
+VERSE_EXTRACTORS = {
+    'soup': extract_verses_soup,
+    'stream': extract_verses_stream,
+}
+
+def index_chapters(chapters):
+    """Indexes a list of chapter entries by chapter number.
+
+    A chapter listed twice keeps its first entry, which is the one its verses are added to.
+
+    Args:
+        chapters (list): Chapter entries as built from the TOC, each with 'chapter' and 'verses' keys.
+
+    Returns:
+        dict: Maps chapter numbers to chapter entries.
+    """
+    chapter_index = {}
+    for chapter in chapters:
+        chapter_index.setdefault(chapter['chapter'], chapter)
+    return chapter_index
+
 def parse_title_from_toc(toc_file):
     """Parses the title of a book from a table of contents (TOC) file.
 
@@ -110,46 +462,59 @@ def parse_title_from_toc(toc_file):
         str: The title of the book, or "Unknown Book" if not found.
     """
     try:
-        with open(toc_file, 'r', encoding='iso-8859-1') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-            title_tag = soup.find('font', {'face': 'GF Zemen Unicode'})
-            if title_tag:
-                # Extract the text and remove the English name in parentheses
-                title_text = title_tag.text.strip()
-                title_text = title_text.split('(')[0].strip()
-                return title_text
-            else:
-                logger.warning(f"Title tag not found in {toc_file}")
-                return "Unknown Book"
+        soup = parse_html(read_source(toc_file))
+        title_tag = soup.find('font', {'face': 'GF Zemen Unicode'})
+        if title_tag:
+            # Extract the text and remove the English name in parentheses
+            title_text = title_tag.text.strip()
+            title_text = title_text.split('(')[0].strip()
+            return title_text
+        else:
+            logger.warning(f"Title tag not found in {toc_file}")
+            return "Unknown Book"
     except Exception as e:
         logger.error(f"Error in parse_title_from_toc: {e}", exc_info=True)
         return "Unknown Book"
 
-def parse_bible_html_no_main(toc_file, chapter_files, book_title_amharic):
+def parse_toc_chapters(toc_file, href_prefix):
+    """Parses the chapter list of a book from its table of contents (TOC) file.
+
+    Args:
+        toc_file (str): The path to the TOC file.
+        href_prefix (str): Only links whose href starts with this (the book abbreviation) are chapters.
+
+    Returns:
+        list: One {'chapter': int, 'verses': []} entry per chapter link, in TOC order.
+    """
+    chapters = []
+    soup = parse_html(read_source(toc_file))
+    links = soup.find_all('a', href=True)
+    for link in links:
+        if link['href'].startswith(href_prefix):
+            chapter_num = link.text.strip().split(" ")[-1]
+            chapter_num = re.sub(r'\D', '', chapter_num)
+            chapters.append({
+                'chapter': int(chapter_num),
+                'verses': []
+            })
+    logger.debug(f"Parsed chapter numbers from TOC: {chapters}")
+    return chapters
+
+def parse_bible_html_no_main(toc_file, chapter_files, book_title_amharic, backend='soup'):
     """Parses Bible HTML files when the main book file is missing, using TOC and chapter files.
 
     Args:
         toc_file (str): The path to the table of contents (TOC) file.
         chapter_files (list): A list of paths to the chapter files.
         book_title_amharic (str): The Amharic title of the book.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
 
     Returns:
         str: A JSON string containing the parsed Bible data, or None if an error occurred.
     """
     chapters = []
     try:
-        with open(toc_file, 'r', encoding='iso-8859-1') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-            links = soup.find_all('a', href=True)
-            for link in links:
-                if link['href'].startswith(os.path.splitext(os.path.basename(toc_file))[0].replace("_toc", "")):
-                    chapter_num = link.text.strip().split(" ")[-1]
-                    chapter_num = re.sub(r'\D', '', chapter_num)
-                    chapters.append({
-                        'chapter': int(chapter_num),
-                        'verses': []
-                    })
-            logger.debug(f"Parsed chapter numbers from TOC: {chapters}")
+        chapters = parse_toc_chapters(toc_file, os.path.splitext(os.path.basename(toc_file))[0].replace("_toc", ""))
 
         # Get English title from the toc file name
         book_title_english = os.path.splitext(os.path.basename(toc_file))[0].replace("_toc", "")
@@ -165,134 +530,93 @@ def parse_bible_html_no_main(toc_file, chapter_files, book_title_amharic):
             logger.warning(f"No mapping found for {book_abbr}, using default Amharic title.")
 
 
+        chapter_index = index_chapters(chapters)
+        # Checked once per book: the per-verse message is never formatted unless DEBUG is on
+        log_verses = logger.isEnabledFor(logging.DEBUG)
         for chapter_file in chapter_files:
             chapter_num = int(os.path.basename(chapter_file).split('-')[1].split('.')[0])
-            with open(chapter_file, 'r', encoding='iso-8859-1') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-                paragraphs = soup.find_all('p')
-                for p in paragraphs:
-                    font_tag = p.find('font', {'face': 'GF Zemen Unicode'})
-                    if font_tag:
-                        text = font_tag.text.strip()
-                        parts = text.split(" ")
-                        verse_numbers = parts[0].replace("&#4964;", "")
-                        verse_numbers_list = verse_numbers.split("፤")
-                        verse_numbers_list = [v for v in verse_numbers_list if v]  # Remove empty strings
-                        if len(verse_numbers_list) > 1:
-                            verse_numbers = "-".join(verse_numbers_list)
-                        elif len(verse_numbers_list) == 1:
-                            verse_numbers = verse_numbers_list[0]
-                        verse_text = " ".join(parts[1:]).strip()
-
-                        for chapter in chapters:
-                            if chapter['chapter'] == chapter_num:
-                                chapter['verses'].append({
-                                    'verse': verse_numbers,
-                                    'text': verse_text
-                                })
-                                logger.debug(f"Parsed verse: Chapter {chapter_num}, Verse {verse_numbers}: {verse_text}")
-                                break
+            chapter = chapter_index.get(chapter_num)
+            if chapter is None:
+                logger.warning(f"Chapter {chapter_num} is not listed in the TOC, skipping {chapter_file}")
+                continue
+            for verse_numbers, verse_text in VERSE_EXTRACTORS[backend](chapter_file):
+                chapter['verses'].append({
+                    'verse': verse_numbers,
+                    'text': verse_text
+                })
+                if log_verses:
+                    logger.debug(f"Parsed verse: Chapter {chapter_num}, Verse {verse_numbers}: {verse_text}")
     except Exception as e:
         logger.error(f"Error in parse_bible_html_no_main: {e}", exc_info=True)
         return None
 
     logger.info(f"parse_bible_html_no_main - book_title_amharic: {book_title_amharic}")  # ADDED LOG
-    return json.dumps({
-        'book': book_title_english,
-        'book_amharic': book_title_amharic,
-        'chapters': chapters
-    }, ensure_ascii=False, indent=2)
+    return serialize_book(book_title_english, book_title_amharic, chapters)
 
-def parse_bible_html(toc_file, chapter_files, book_file):
+def parse_bible_html(toc_file, chapter_files, book_file, backend='soup'):
     """Parses Bible HTML files and returns a JSON representation.
 
     Args:
         toc_file (str): The path to the table of contents (TOC) file.
         chapter_files (list): A list of paths to the chapter files.
         book_file (str): The path to the main book file.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
 
     Returns:
         str: A JSON string containing the parsed Bible data, or None if an error occurred.
     """
     try:
         # Parse book title
-        with open(book_file, 'r', encoding='iso-8859-1') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-
-            # English title from file name
-            book_title_english = os.path.splitext(os.path.basename(book_file))[0]
-            logger.debug(f"Parsed English title: {book_title_english}")
-
-            # Amharic title - USE MAPPING
-            book_abbr = book_title_english.lower()
-            if book_abbr in BOOK_MAPPINGS:
-                book_title_english, book_title_amharic = BOOK_MAPPINGS[book_abbr]
-                logger.debug(f"Using mapping for {book_abbr}: English='{book_title_english}', Amharic='{book_title_amharic}'")
-            else:
-                book_title_amharic = "Unknown Book"  # Default value
-                logger.warning(f"No mapping found for {book_abbr}, using default Amharic title.")
+        soup = parse_html(read_source(book_file))
+
+        # English title from file name
+        book_title_english = os.path.splitext(os.path.basename(book_file))[0]
+        logger.debug(f"Parsed English title: {book_title_english}")
+
+        # Amharic title - USE MAPPING
+        book_abbr = book_title_english.lower()
+        if book_abbr in BOOK_MAPPINGS:
+            book_title_english, book_title_amharic = BOOK_MAPPINGS[book_abbr]
+            logger.debug(f"Using mapping for {book_abbr}: English='{book_title_english}', Amharic='{book_title_amharic}'")
+        else:
+            book_title_amharic = "Unknown Book"  # Default value
+            logger.warning(f"No mapping found for {book_abbr}, using default Amharic title.")
 
 
         # Parse chapter information
-        chapters = []
-        with open(toc_file, 'r', encoding='iso-8859-1') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-            links = soup.find_all('a', href=True)
-            for link in links:
-                if link['href'].startswith(os.path.splitext(os.path.basename(book_file))[0]):
-                  chapter_num = link.text.strip().split(" ")[-1]
-                  chapter_num = re.sub(r'\D', '', chapter_num)
-                  chapters.append({
-                      'chapter': int(chapter_num),
-                      'verses': []
-                  })
-            logger.debug(f"Parsed chapter numbers from TOC: {chapters}")
+        chapters = parse_toc_chapters(toc_file, os.path.splitext(os.path.basename(book_file))[0])
 
         # Parse verse content of each chapter
+        chapter_index = index_chapters(chapters)
+        # Checked once per book: the per-verse message is never formatted unless DEBUG is on
+        log_verses = logger.isEnabledFor(logging.DEBUG)
         for chapter_file in chapter_files:
             chapter_num = int(os.path.basename(chapter_file).split('-')[1].split('.')[0])
-            with open(chapter_file, 'r', encoding='iso-8859-1') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-                paragraphs = soup.find_all('p')
-                for p in paragraphs:
-                    font_tag = p.find('font', {'face': 'GF Zemen Unicode'})
-                    if font_tag:
-                        text = font_tag.text.strip()
-                        parts = text.split(" ")
-                        verse_numbers = parts[0].replace("&#4964;", "")
-                        verse_numbers_list = verse_numbers.split("፤")
-                        verse_numbers_list = [v for v in verse_numbers_list if v]  # Remove empty strings
-                        if len(verse_numbers_list) > 1:
-                            verse_numbers = "-".join(verse_numbers_list)
-                        elif len(verse_numbers_list) == 1:
-                            verse_numbers = verse_numbers_list[0]
-                        verse_text = " ".join(parts[1:]).strip()
-
-                        for chapter in chapters:
-                            if chapter['chapter'] == chapter_num:
-                                chapter['verses'].append({
-                                    'verse': verse_numbers,
-                                    'text': verse_text
-                                })
-                                logger.debug(f"Parsed verse: Chapter {chapter_num}, Verse {verse_numbers}: {verse_text}")
-                                break
+            chapter = chapter_index.get(chapter_num)
+            if chapter is None:
+                logger.warning(f"Chapter {chapter_num} is not listed in the TOC, skipping {chapter_file}")
+                continue
+            for verse_numbers, verse_text in VERSE_EXTRACTORS[backend](chapter_file):
+                chapter['verses'].append({
+                    'verse': verse_numbers,
+                    'text': verse_text
+                })
+                if log_verses:
+                    logger.debug(f"Parsed verse: Chapter {chapter_num}, Verse {verse_numbers}: {verse_text}")
     except Exception as e:
         logger.error(f"Error in parse_bible_html: {e}", exc_info=True)
         return None
 
     logger.info(f"parse_bible_html - book_title_amharic: {book_title_amharic}")  # ADDED LOG
-    return json.dumps({
-        'book': book_title_english,
-        'book_amharic': book_title_amharic,
-        'chapters': chapters
-    }, ensure_ascii=False, indent=2)
+    return serialize_book(book_title_english, book_title_amharic, chapters)
 
-def parse_from_chapter_files(book_name, chapter_files):
+def parse_from_chapter_files(book_name, chapter_files, backend='soup'):
     """Parses Bible data from chapter files when TOC and main files are missing.
 
     Args:
         book_name (str): The name of the book (used for English title).
         chapter_files (list): A list of paths to the chapter files.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
 
     Returns:
         str: A JSON string containing the parsed Bible data, or None if an error occurred.
@@ -314,192 +638,729 @@ def parse_from_chapter_files(book_name, chapter_files):
             book_title_amharic = "Unknown Book"
             logger.warning(f"No mapping found for {book_abbr}, using default Amharic title.")
 
+        # Group the verses by chapter number, then emit the chapters in order
+        chapter_verses = {}
         for chapter_file in chapter_files:
             chapter_num = int(os.path.basename(chapter_file).split('-')[1].split('.')[0])
-            with open(chapter_file, 'r', encoding='iso-8859-1') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-                paragraphs = soup.find_all('p')
-                for p in paragraphs:
-                    font_tag = p.find('font', {'face': 'GF Zemen Unicode'})
-                    if font_tag:
-                        text = font_tag.text.strip()
-                        parts = text.split(" ")
-                        verse_numbers = parts[0].replace("&#4964;", "")
-                        verse_numbers_list = verse_numbers.split("፤")
-                        verse_numbers_list = [v for v in verse_numbers_list if v]  # Remove empty strings
-                        if len(verse_numbers_list) > 1:
-                            verse_numbers = "-".join(verse_numbers_list)
-                        elif len(verse_numbers_list) == 1:
-                            verse_numbers = verse_numbers_list[0]
-                        verse_text = " ".join(parts[1:]).strip()
-
-                        chapters.append({
-                            'chapter': chapter_num,
-                            'verses': [{'verse': verse_numbers, 'text': verse_text}]
-                        })
-                    chapters.sort(key=lambda x: x['chapter'])
+            for verse_numbers, verse_text in VERSE_EXTRACTORS[backend](chapter_file):
+                chapter_verses.setdefault(chapter_num, []).append({'verse': verse_numbers, 'text': verse_text})
+        chapters = [{'chapter': chapter_num, 'verses': verses}
+                    for chapter_num, verses in sorted(chapter_verses.items())]
 
     except Exception as e:
         logger.error(f"Error in parse_from_chapter_files: {e}", exc_info=True)
         return None
 
     logger.info(f"parse_from_chapter_files - book_title_amharic: {book_title_amharic}")  # ADDED LOG
-    return json.dumps({
-        'book': book_title_english,
-        'book_amharic': book_title_amharic,
-        'chapters': chapters
-    }, ensure_ascii=False, indent=2)
+    return serialize_book(book_title_english, book_title_amharic, chapters)
 
-if __name__ == "__main__":
-    # Configure logging
-    logger = configure_logger('bible_parser.log', log_level=logging.INFO)
-    logger.info("Starting Bible parsing script")
+BOOK_ABBREVIATIONS = ["gen", "exo", "lev", "num", "deu", "jos", "jdg", "rut", "1sa", "2sa", "1ki", "2ki", "1ch", "2ch", "ezr", "neh", "est", "job",
+                      "psa", "pro", "ecc", "sos", "isa", "jer", "lam", "eze", "dan", "hos", "joe", "amo", "oba", "jon", "mic", "nah", "hab", "zep",
+                      "hag", "zec", "mal", "mat", "mar", "luk", "joh", "act", "rom", "1co", "2co", "gal", "eph", "php", "col", "1th", "2th", "1ti",
+                      "2ti", "tit", "phi", "heb", "jam", "1pe", "2pe", "1jo", "2jo", "3jo", "jud", "rev"]
+
+def build_book(book_abbr, chapter_files_only=False, backend='soup'):
+    """Parses one book from the source directory, picking the parser that fits the files present.
+
+    This does no writing, so it can run in a worker process; the caller writes the result.
+
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+        chapter_files_only (bool): Ignore the TOC and main files and parse the chapter files alone.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Returns:
+        tuple: (book_abbr, json_output, note). json_output is None if the book could not be parsed,
+        note describes the source files used and is appended to the success log line.
+    """
+    if book_abbr in BOOK_MAPPINGS:
+        book_name, _ = BOOK_MAPPINGS[book_abbr]
+    else:
+        book_name = book_abbr  # Use abbreviation if no mapping
+        logger.warning(f"No mapping found for {book_abbr}, using abbreviation.")
 
-    book_abbreviations = ["gen", "exo", "lev", "num", "deu", "jos", "jdg", "rut", "1sa", "2sa", "1ki", "2ki", "1ch", "2ch", "ezr", "neh", "est", "job",
-                          "psa", "pro", "ecc", "sos", "isa", "jer", "lam", "eze", "dan", "hos", "joe", "amo", "oba", "jon", "mic", "nah", "hab", "zep",
-                          "hag", "zec", "mal", "mat", "mar", "luk", "joh", "act", "rom", "1co", "2co", "gal", "eph", "php", "col", "1th", "2th", "1ti",
-                          "2ti", "tit", "phi", "heb", "jam", "1pe", "2pe", "1jo", "2jo", "3jo", "jud", "rev"]
+    chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
+    toc_file = f"source/{book_abbr}_toc.htm"
 
-    processed_books = set() # Moved to here
+    if chapter_files_only:
+        if not chapter_files:
+            return book_abbr, None, None
+        logger.info(f"Attempting to parse {book_abbr} from chapter files (no main or TOC file).")
+        json_output = parse_from_chapter_files(book_abbr, chapter_files, backend)  # Use book_abbr
+        if not json_output:
+            logger.error(f"Failed to parse {book_abbr} even from chapter files.")
+        return book_abbr, json_output or None, " (from chapter files only)"
 
-    # REVISED LOGIC
-    htm_files = []
-    for f in glob.glob("source/*.htm"):
+    if os.path.exists(toc_file):
+        if os.path.exists(f"source/{book_abbr}.htm"):
+            if not chapter_files:
+                logger.warning(f"Skipping {book_name} due to missing chapter files.")
+                return book_abbr, None, None
+            logger.info(f"Processing {book_name} with main and TOC files...")
+            json_output = parse_bible_html(toc_file, chapter_files, f"source/{book_abbr}.htm", backend)
+            if json_output is None:
+                logger.error(f"Failed to parse {book_name}.")
+            return book_abbr, json_output, ""
+
+        # Handle missing main .htm file
+        logger.info(f"Main HTM file missing for {book_name}, attempting to parse from TOC and chapter files.")
+        if not chapter_files:
+            logger.warning(f"Skipping {book_name} due to missing main HTM and chapter files.")
+            return book_abbr, None, None
+        json_output = parse_bible_html_no_main(toc_file, chapter_files, book_name, backend)  # Pass book_name
+        if json_output is None:
+            logger.error(f"Failed to parse {book_name} from TOC and chapter files.")
+        return book_abbr, json_output, " (from TOC and chapter files)"
+
+    # Handle missing toc file, but existing chapter files
+    if not chapter_files:
+        logger.warning(f"Skipping {book_name} due to missing toc file and chapter files.")
+        return book_abbr, None, None
+    logger.info(f"TOC file missing for {book_name}, attempting to parse from chapter files.")
+    json_output = parse_from_chapter_files(book_abbr, chapter_files, backend)  # Use book_abbr
+    if not json_output:
+        logger.error(f"Failed to parse {book_name} from chapter files.")
+    return book_abbr, json_output or None, " (from chapter files only)"
+
+def build_book_with_metrics(book_abbr, chapter_files_only=False, backend='soup'):
+    """Runs build_book while collecting the book's counters.
+
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+        chapter_files_only (bool): Passed to build_book.
+        backend (str): Passed to build_book.
+
+    Returns:
+        tuple: (book_abbr, json_output, note, metrics), metrics as from new_metrics. peak_memory is
+        only measured when tracemalloc is tracing in the process that builds the book.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with collect_metrics(new_metrics()) as metrics:
+        _, json_output, note = build_book(book_abbr, chapter_files_only, backend)
+    metrics['total_seconds'] = time.perf_counter() - start
+    if tracing:
+        metrics['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    return book_abbr, json_output, note, metrics
+
+def format_metrics_table(books):
+    """Formats the per-book counters as a text table with a totals row.
+
+    Args:
+        books (dict): Maps book abbreviations to counters from build_book_with_metrics.
+
+    Returns:
+        str: The table, one line per book.
+    """
+    headers = ('book', 'files', 'bytes', 'verses', 'read s', 'parse s', 'serialize s', 'write s', 'total s', 'peak KiB')
+    totals = new_metrics()
+    rows = []
+    for book_abbr, metrics in books.items():
+        for field in METRIC_FIELDS:
+            totals[field] = max(totals[field], metrics[field]) if field == 'peak_memory' else totals[field] + metrics[field]
+        rows.append((book_abbr, metrics))
+    rows.append(('total', totals))
+    lines = ["".join(f"{header:>12}" for header in headers)]
+    for book_abbr, metrics in rows:
+        lines.append(f"{book_abbr:>12}{metrics['files']:>12}{metrics['bytes']:>12}{metrics['verses']:>12}"
+                     + "".join(f"{metrics[field]:>12.3f}" for field in METRIC_FIELDS if field.endswith('_seconds'))
+                     + f"{metrics['peak_memory'] // 1024:>12}")
+    return "\n".join(lines)
+
+def write_metrics_report(report_file, books, backend, jobs, elapsed):
+    """Writes the per-book counters of a run as JSON.
+
+    Args:
+        report_file (str): The path of the report.
+        books (dict): Maps book abbreviations to counters from build_book_with_metrics.
+        backend (str): The verse extraction backend used.
+        jobs (int): The number of worker processes.
+        elapsed (float): Wall time of the whole run in seconds.
+    """
+    totals = {field: sum(metrics[field] for metrics in books.values()) for field in METRIC_FIELDS}
+    totals['peak_memory'] = max((metrics['peak_memory'] for metrics in books.values()), default=0)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({'parser_version': PARSER_VERSION, 'backend': backend, 'jobs': jobs, 'elapsed_seconds': elapsed,
+                   'books': books, 'totals': totals}, f, indent=2)
+
+def write_book_json(book_abbr, json_output, note=""):
+    """Writes a parsed book to json/{book_abbr}.json.
+
+    Args:
+        book_abbr (str): The book abbreviation, used as the output file name.
+        json_output (str): The JSON string returned by one of the parsers.
+        note (str): Suffix for the success log line describing the source files used.
+    """
+    output_file = f"json/{book_abbr}.json"  # Always use abbreviation for filename
+
+    # Check if directory exists, create if necessary
+    if not os.path.exists("json/"):
+        os.makedirs("json/")
+        logger.info(f"Created directory: json/")
+
+    start = time.perf_counter()
+    # Write to a temporary file and rename it over the old one, so readers never see a partial book
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json_output)
+    os.replace(tmp_file, output_file)
+    if _metrics is not None:
+        _metrics['write_seconds'] += time.perf_counter() - start
+    logger.info(f"Successfully created {output_file}{note}")
+
+def chapter_file_number(chapter_file):
+    """Returns the chapter number of a chapter file, e.g. 12 for source/gen-12.htm."""
+    return int(os.path.basename(chapter_file).split('-')[1].split('.')[0])
+
+def iter_book_verses(book_abbr, backend='soup'):
+    """Yields the verses of a book one at a time, without assembling the book.
+
+    The source files are chosen the way main() chooses them: the TOC decides which chapters are
+    included, in which order, when both the TOC and the main file exist, otherwise every chapter
+    file is read in chapter order.
+
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Yields:
+        tuple: (chapter_num, verse_numbers, verse_text)
+    """
+    chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
+    chapter_files.sort(key=chapter_file_number)
+    toc_file = f"source/{book_abbr}_toc.htm"
+
+    if os.path.exists(toc_file) and os.path.exists(f"source/{book_abbr}.htm"):
+        files_by_chapter = {}
+        for chapter_file in chapter_files:
+            files_by_chapter.setdefault(chapter_file_number(chapter_file), []).append(chapter_file)
+        chapter_nums = index_chapters(parse_toc_chapters(toc_file, book_abbr))
+        for chapter_num in chapter_nums:
+            for chapter_file in files_by_chapter.get(chapter_num, []):
+                for verse_numbers, verse_text in VERSE_EXTRACTORS[backend](chapter_file):
+                    yield chapter_num, verse_numbers, verse_text
+        return
+
+    for chapter_file in chapter_files:
+        chapter_num = chapter_file_number(chapter_file)
+        for verse_numbers, verse_text in VERSE_EXTRACTORS[backend](chapter_file):
+            yield chapter_num, verse_numbers, verse_text
+
+def iter_corpus_verses(backend='soup'):
+    """Yields every verse of every book found under source/, in canonical book order.
+
+    A book that fails part way is logged and its remaining verses are skipped.
+
+    Args:
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Yields:
+        tuple: (book_title_english, book_title_amharic, chapter_num, verse_numbers, verse_text)
+    """
+    books = list(BOOK_ABBREVIATIONS)
+    for f in sorted(glob.glob("source/*.htm")):
         filename = os.path.basename(f).replace('.htm', '').lower()
+        if filename not in books and re.match(r"^[0-9]?[a-z]+$", filename):
+            books.append(filename)
+
+    for book_abbr in books:
+        if book_abbr in BOOK_MAPPINGS:
+            book_title_english, book_title_amharic = BOOK_MAPPINGS[book_abbr]
+        else:
+            book_title_english, book_title_amharic = book_abbr, "Unknown Book"
+        book_verses = 0
+        try:
+            for chapter_num, verse_numbers, verse_text in iter_book_verses(book_abbr, backend):
+                yield book_title_english, book_title_amharic, chapter_num, verse_numbers, verse_text
+                book_verses += 1
+        except Exception as e:
+            logger.error(f"Error exporting {book_abbr}: {e}", exc_info=True)
+        if book_verses:
+            logger.info(f"Exported {book_verses} verses of {book_title_english}")
+
+# The export file handling and the SQLite schema and writer are shared with the tools in tools/
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'tools')
+
+def export_ndjson(output_file, backend='soup'):
+    """Streams every verse of every book into a JSON Lines file while parsing.
+
+    Each line is one verse record with translation, book, book_amharic, chapter, verse and text.
+    Books are written in canonical order and no book is held in memory.
+
+    Args:
+        output_file (str): The path of the export; see corpus.open_export in tools/ for compression.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Returns:
+        int: The number of verses written.
+    """
+    sys.path.insert(0, TOOLS_DIR)
+    from corpus import open_export
+
+    verse_count = 0
+    with open_export(output_file) as out:
+        for book_title_english, book_title_amharic, chapter_num, verse_numbers, verse_text in iter_corpus_verses(backend):
+            out.write(json.dumps({
+                'translation': 'amh',
+                'book': book_title_english,
+                'book_amharic': book_title_amharic,
+                'chapter': chapter_num,
+                'verse': verse_numbers,
+                'text': verse_text
+            }, ensure_ascii=False))
+            out.write('\n')
+            verse_count += 1
+    logger.info(f"Successfully created {output_file} with {verse_count} verses")
+    return verse_count
+
+def export_sqlite(database, backend='soup'):
+    """Streams every verse into a SQLite database while parsing, replacing any Amharic rows in it.
+
+    The database schema (normalized books/chapters/verses tables plus an FTS5 index) is defined
+    in tools/sqlite_db.py, whose loader adds the KJV to the same file.
+
+    Args:
+        database (str): The path of the SQLite database.
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Returns:
+        int: The number of verses written.
+    """
+    sys.path.insert(0, TOOLS_DIR)
+    from sqlite_db import SQLiteWriter
+
+    with SQLiteWriter(database, 'amh') as writer:
+        for book_title_english, book_title_amharic, chapter_num, verse_numbers, verse_text in iter_corpus_verses(backend):
+            writer.add_verse(book_title_english, book_title_amharic, chapter_num, verse_numbers, verse_text)
+    logger.info(f"Successfully loaded {writer.verse_count} verses into {database}")
+    return writer.verse_count
+
+# Bump whenever a change to the parsers changes their JSON output, so the next run rebuilds every book
+PARSER_VERSION = 2
+
+MANIFEST_FILE = ".build_manifest.json"
+
+def book_input_files(book_abbr):
+    """Lists the source files a book is built from: its TOC, main and chapter files, where present.
+
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+
+    Returns:
+        list: Paths of the existing input files, sorted.
+    """
+    inputs = glob.glob(f"source/{book_abbr}-[0-9]*.htm")
+    for path in (f"source/{book_abbr}_toc.htm", f"source/{book_abbr}.htm"):
+        if os.path.exists(path):
+            inputs.append(path)
+    return sorted(inputs)
+
+def book_fingerprint(book_abbr, previous=None):
+    """Computes the content hashes of a book's input files.
+
+    Files whose size and modification time match the previous fingerprint keep their recorded
+    hash instead of being read again.
+
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+        previous (dict): The fingerprint recorded for the book by the last build, if any.
+
+    Returns:
+        dict: Maps each input path to [size, mtime_ns, sha256 hex digest].
+    """
+    previous = previous or {}
+    fingerprint = {}
+    for path in book_input_files(book_abbr):
+        stat = os.stat(path)
+        recorded = previous.get(path)
+        if recorded and recorded[0] == stat.st_size and recorded[1] == stat.st_mtime_ns:
+            digest = recorded[2]
+        else:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        fingerprint[path] = [stat.st_size, stat.st_mtime_ns, digest]
+    return fingerprint
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Loads the build manifest written by the last run.
+
+    Args:
+        manifest_file (str): The path to the manifest file.
+
+    Returns:
+        dict: Maps book abbreviations to their recorded inputs, or an empty manifest if the file
+        is missing, unreadable or from another parser version.
+    """
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('parser_version') != PARSER_VERSION:
+        logger.info("Parser version changed, rebuilding all books")
+        return {}
+    return manifest.get('books', {})
+
+def save_manifest(books, manifest_file=MANIFEST_FILE):
+    """Writes the build manifest.
+
+    Args:
+        books (dict): Maps book abbreviations to their input fingerprints.
+        manifest_file (str): The path to the manifest file.
+    """
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump({'parser_version': PARSER_VERSION, 'books': books}, f, indent=2, sort_keys=True)
 
-        if filename in book_abbreviations or re.match(r"^[0-9]?[a-z]+$", filename):
-            htm_files.append(f)
+def is_up_to_date(book_abbr, fingerprint, manifest):
+    """Checks whether a book's output was built from exactly these inputs.
 
-            # Get book abbreviation and mapping
-            book_abbr = filename
-            if book_abbr in BOOK_MAPPINGS:
-                book_name, book_amharic = BOOK_MAPPINGS[book_abbr]
+    Args:
+        book_abbr (str): The book abbreviation (e.g., "gen").
+        fingerprint (dict): The current fingerprint from book_fingerprint.
+        manifest (dict): The books recorded by the last build.
+
+    Returns:
+        bool: True if the book can be skipped.
+    """
+    recorded = manifest.get(book_abbr)
+    if not recorded or not fingerprint or not os.path.exists(f"json/{book_abbr}.json"):
+        return False
+    if recorded.keys() != fingerprint.keys():
+        return False
+    return all(recorded[path][2] == fingerprint[path][2] for path in fingerprint)
+
+SOURCE_FILE_RE = re.compile(r"^([0-9]?[a-z]+)(?:-[0-9]+|_toc)?\.htm$")
+
+def source_book(file_name):
+    """Returns the abbreviation of the book a source file belongs to.
+
+    Args:
+        file_name (str): A file name in source/, e.g. "gen-12.htm", "gen_toc.htm" or "gen.htm".
+
+    Returns:
+        str: The book abbreviation, or None if the file is not a chapter, TOC or main file.
+    """
+    match = SOURCE_FILE_RE.match(os.path.basename(file_name).lower())
+    return match.group(1) if match else None
+
+class InotifyWatcher:
+    """Reports changed files in a directory using Linux inotify, called through ctypes.
+
+    Args:
+        directory (str): The directory to watch (not recursive).
+
+    Raises:
+        OSError: If inotify is not available or the directory cannot be watched.
+    """
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        # IN_NONBLOCK and IN_CLOEXEC have the values of O_NONBLOCK and O_CLOEXEC
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"Cannot watch {directory}")
+
+    def changes(self, timeout=None):
+        """Waits for changes.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait until something changes.
+
+        Returns:
+            set: Names of the files that changed, empty if the timeout passed first.
+        """
+        names = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if name:
+                    names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    """Reports changed files in a directory by comparing sizes and modification times.
+
+    Args:
+        directory (str): The directory to watch (not recursive).
+        interval (float): Seconds between scans.
+    """
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout=None):
+        """Waits for changes, scanning every interval seconds; see InotifyWatcher.changes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            snapshot = self._scan()
+            names = {name for name in snapshot.keys() | self._snapshot.keys()
+                     if snapshot.get(name) != self._snapshot.get(name)}
+            self._snapshot = snapshot
+            if names or (deadline is not None and time.monotonic() >= deadline):
+                return names
+
+    def close(self):
+        pass
+
+def open_source_watcher(directory="source", poll_interval=None):
+    """Returns an inotify watcher for directory, or a polling one if inotify is unavailable.
+
+    Args:
+        directory (str): The directory to watch.
+        poll_interval (float): Poll every this many seconds instead of using inotify.
+    """
+    if poll_interval is None:
+        try:
+            watcher = InotifyWatcher(directory)
+            logger.info(f"Watching {directory}/ with inotify")
+            return watcher
+        except (OSError, TypeError) as e:
+            logger.warning(f"inotify unavailable ({e}), polling {directory}/ instead")
+            poll_interval = 1.0
+    logger.info(f"Polling {directory}/ every {poll_interval}s")
+    return PollingWatcher(directory, poll_interval)
+
+def rebuild_books(book_abbrs, backend='soup'):
+    """Reparses the given books and rewrites their JSON, updating the build manifest.
+
+    A book is parsed the way a full run would parse it: from its TOC and main files if it has a
+    main file, from its chapter files alone otherwise. A book that fails to parse keeps its
+    previous JSON.
+
+    Args:
+        book_abbrs (iterable): Book abbreviations (e.g., "gen").
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+
+    Returns:
+        list: The abbreviations of the books rewritten.
+    """
+    manifest = load_manifest()
+    rebuilt = []
+    for book_abbr in sorted(book_abbrs):
+        start = time.perf_counter()
+        chapter_files_only = not os.path.exists(f"source/{book_abbr}.htm")
+        _, json_output, note = build_book(book_abbr, chapter_files_only, backend)
+        if json_output is None:
+            logger.warning(f"{book_abbr} could not be parsed, json/{book_abbr}.json left as it was")
+            continue
+        write_book_json(book_abbr, json_output, note)
+        manifest[book_abbr] = book_fingerprint(book_abbr, manifest.get(book_abbr))
+        rebuilt.append(book_abbr)
+        logger.info(f"Rebuilt {book_abbr} in {time.perf_counter() - start:.3f}s")
+    save_manifest(manifest)
+    return rebuilt
+
+def watch_sources(backend='soup', debounce=0.3, poll_interval=None):
+    """Rebuilds books whenever their source files change, until interrupted.
+
+    Changes are collected until source/ has been quiet for debounce seconds, so an editor
+    saving several files (or one file several times) triggers one rebuild per book.
+
+    Args:
+        backend (str): The verse extraction backend, a key of VERSE_EXTRACTORS.
+        debounce (float): Seconds without changes to wait before rebuilding.
+        poll_interval (float): Poll every this many seconds instead of using inotify.
+    """
+    watcher = open_source_watcher("source", poll_interval)
+    pending = set()
+    try:
+        while True:
+            books = {source_book(name) for name in watcher.changes(debounce if pending else None)} - {None}
+            if books:
+                logger.debug(f"Changed: {sorted(books)}")
+                pending |= books
+            elif pending:
+                rebuild_books(pending, backend)
+                pending.clear()
+    except KeyboardInterrupt:
+        logger.info("Stopped watching source/")
+    finally:
+        watcher.close()
+
+def main(argv=None):
+    """Parses every book found under source/ and writes json/{abbr}.json for each.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Convert the Amharic Bible HTML sources to JSON.")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Number of books to parse in parallel (0 = one per CPU core, default: 1).")
+    parser.add_argument('--backend', choices=sorted(VERSE_EXTRACTORS), default='soup',
+                        help="Verse extraction backend: 'soup' builds a BeautifulSoup tree per chapter file, "
+                             "'stream' scans it in one pass without a tree (default: soup).")
+    parser.add_argument('--force', action='store_true',
+                        help=f"Rebuild every book, even those whose inputs are unchanged since the last run "
+                             f"(recorded in {MANIFEST_FILE}).")
+    parser.add_argument('--ndjson', metavar='FILE',
+                        help="Instead of json/, stream one JSON record per verse to FILE while parsing "
+                             "(compressed if FILE ends in .gz or .zst).")
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help="Instead of json/, stream the verses into the SQLite database FILE while parsing "
+                             "(schema in tools/sqlite_db.py).")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Write the per-book counters (files, bytes, verses, read/parse/serialize/write time) "
+                             "to FILE as JSON and print them as a table.")
+    parser.add_argument('--profile', choices=['cpu', 'memory'],
+                        help="'cpu' runs the build under cProfile and writes the stats to --profile-output; "
+                             "'memory' traces allocations with tracemalloc and records each book's peak.")
+    parser.add_argument('--profile-output', metavar='FILE', default='parse_bible.prof',
+                        help="Where --profile cpu writes its stats, for pstats or snakeviz (default: parse_bible.prof).")
+    parser.add_argument('--watch', action='store_true',
+                        help="After building, keep running and rebuild each book whose source files change.")
+    parser.add_argument('--debounce', type=float, default=0.3, metavar='SECONDS',
+                        help="With --watch, wait until source/ has been quiet this long before rebuilding (default: 0.3).")
+    parser.add_argument('--poll', type=float, metavar='SECONDS',
+                        help="With --watch, scan source/ every SECONDS instead of using inotify.")
+    args = parser.parse_args(argv)
+    if args.watch and (args.ndjson or args.sqlite):
+        parser.error("--watch only maintains json/, it cannot be combined with --ndjson or --sqlite")
+
+    logger.info("Starting Bible parsing script")
+
+    if args.ndjson or args.sqlite:
+        if args.ndjson:
+            export_ndjson(args.ndjson, args.backend)
+        if args.sqlite:
+            export_sqlite(args.sqlite, args.backend)
+        logger.info("Finished Bible parsing script")
+        return
+
+    jobs = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    profiler = None
+    if args.profile == 'cpu':
+        if jobs > 1:
+            logger.warning("--profile cpu only sees the main process, run with --jobs 1 to profile the parsers")
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif args.profile == 'memory':
+        # Started before the workers are forked, so they trace too
+        tracemalloc.start()
+
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        map_books = executor.map
+        logger.info(f"Parsing books with {jobs} worker processes")
+    else:
+        map_books = map
+
+    previous_manifest = {} if args.force else load_manifest()
+    manifest = {}
+    fingerprints = {}
+    processed_books = set()
+    book_metrics = {}
+
+    def write_books(results):
+        # Writes the parsed books, adding the write time to each book's counters
+        for book_abbr, json_output, note, metrics in results:
+            if json_output is not None:
+                with collect_metrics(metrics):
+                    write_book_json(book_abbr, json_output, note)
+                processed_books.add(book_abbr)
+                manifest[book_abbr] = fingerprints[book_abbr]
+            if json_output is not None or metrics['files']:
+                book_metrics[book_abbr] = metrics
+
+    def fresh_books(book_abbrs):
+        # Drops books whose inputs are unchanged since the last build, counting them as processed
+        stale = []
+        for book_abbr in book_abbrs:
+            if book_abbr not in fingerprints:
+                fingerprints[book_abbr] = book_fingerprint(book_abbr, previous_manifest.get(book_abbr))
+            if is_up_to_date(book_abbr, fingerprints[book_abbr], previous_manifest):
+                logger.info(f"Skipping {book_abbr}, inputs unchanged since the last build")
+                manifest[book_abbr] = fingerprints[book_abbr]
+                processed_books.add(book_abbr)
             else:
-                book_name = book_abbr # Use abbreviation if no mapping
-                logger.warning(f"No mapping found for {book_abbr}, using abbreviation.")
-
-            toc_file = f"source/{book_abbr}_toc.htm"
-            if os.path.exists(toc_file):
-                if os.path.exists(f"source/{book_abbr}.htm"):
-                    chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
-                    if chapter_files:
-                        logger.info(f"Processing {book_name} with main and TOC files...")
-                        json_output = parse_bible_html(toc_file, chapter_files, f"source/{book_abbr}.htm")
-                        if json_output is None:
-                            logger.error(f"Failed to parse {book_name}.")
-                        else:
-                            output_file = f"json/{book_abbr}.json" # Always use abbreviation for filename
-
-                            # Check if directory exists, create if necessary
-                            if not os.path.exists("json/"):
-                                os.makedirs("json/")
-                                logger.info(f"Created directory: json/")
-                            # Check if file exists
-                            if not os.path.exists(output_file):
-                                with open(output_file, 'w') as fp:
-                                  pass # empty file
-                                logger.info(f"Created empty file {output_file}")
-                            with open(output_file, 'w', encoding='utf-8') as f:
-                                f.write(json_output)
-                            logger.info(f"Successfully created {output_file}")
-                            processed_books.add(book_abbr)
-                    else:
-                        logger.warning(f"Skipping {book_name} due to missing chapter files.")
-
-                else:
-                    # Handle missing main .htm file
-                    logger.info(f"Main HTM file missing for {book_name}, attempting to parse from TOC and chapter files.")
-                    chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
-                    if chapter_files:
-                        json_output = parse_bible_html_no_main(toc_file, chapter_files, book_name)  # Pass book_name
-                        if json_output is None:
-                            logger.error(f"Failed to parse {book_name} from TOC and chapter files.")
-                        else:
-                            output_file = f"json/{book_abbr}.json"  # Always use abbreviation for filename
-
-                            # Check if directory exists, create if necessary
-                            if not os.path.exists("json/"):
-                                os.makedirs("json/")
-                                logger.info(f"Created directory: json/")
-                            # Check if file exists
-                            if not os.path.exists(output_file):
-                                with open(output_file, 'w') as fp:
-                                  pass # empty file
-                                logger.info(f"Created empty file {output_file}")
-                            with open(output_file, 'w', encoding='utf-8') as f:
-                                f.write(json_output)
-                            logger.info(f"Successfully created {output_file} (from TOC and chapter files)")
-                            processed_books.add(book_abbr)
-                    else:
-                        logger.warning(f"Skipping {book_name} due to missing main HTM and chapter files.")
+                stale.append(book_abbr)
+        return stale
 
+    try:
+        # Books with a main .htm file in source/
+        main_books = []
+        for f in glob.glob("source/*.htm"):
+            filename = os.path.basename(f).replace('.htm', '').lower()
+            if filename in BOOK_ABBREVIATIONS or re.match(r"^[0-9]?[a-z]+$", filename):
+                main_books.append(filename)
             else:
-                # Handle missing toc file, but existing chapter files
-                chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
-                if chapter_files:
-                    logger.info(f"TOC file missing for {book_name}, attempting to parse from chapter files.")
-                    json_output = parse_from_chapter_files(book_abbr, chapter_files) # Use book_abbr
-                    if json_output:
-                        output_file = f"json/{book_abbr}.json" # Always use abbreviation for filename
-
-                        # Check if directory exists, create if necessary
-                        if not os.path.exists("json/"):
-                            os.makedirs("json/")
-                            logger.info(f"Created directory: json/")
-
-                        # Check if file exists
-                        if not os.path.exists(output_file):
-                            with open(output_file, 'w') as fp:
-                                pass # empty file
-                            logger.info(f"Created empty file {output_file}")
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            f.write(json_output)
-                        logger.info(f"Successfully created {output_file} (from chapter files only)")
-                        processed_books.add(book_abbr)
-                    else:
-                        logger.error(f"Failed to parse {book_name} from chapter files.")
-
-                else:
-                    logger.warning(f"Skipping {book_name} due to missing toc file and chapter files.")
-        else:
-            logger.debug(f"Filename {filename} skipped")
-
-    logger.debug(f"processed_books: {processed_books}")
-
-    # Check for books that were completely missed
-    for book_abbr in book_abbreviations:
-        if book_abbr not in processed_books:
-            chapter_files = sorted(glob.glob(f"source/{book_abbr}-[0-9]*.htm"))
-            if chapter_files:  # if chapter files exist
-                logger.info(f"Attempting to parse {book_abbr} from chapter files (no main or TOC file).")
-
-                # Use mapping for book name
-                if book_abbr in BOOK_MAPPINGS:
-                    book_name, _ = BOOK_MAPPINGS[book_abbr]
-                    logger.info(f"Using mapping for output file name: {book_name} (from {book_abbr})")
-                else:
-                    book_name = book_abbr # Use abbreviation directly
-                    logger.warning(f"No mapping found for {book_abbr}, using abbreviation for output file.")
-
-                json_output = parse_from_chapter_files(book_abbr, chapter_files) # Use book_abbr
-                if json_output:
-                    output_file = f"json/{book_abbr}.json"  # Always use abbreviation for filename
-
-                    # Check if directory exists, create if necessary
-                    if not os.path.exists("json/"):
-                        os.makedirs("json/")
-                        logger.info(f"Created directory: json/")
-
-                    # Check if file exists
-                    if not os.path.exists(output_file):
-                        with open(output_file, 'w') as fp:
-                            pass # empty file
-                        logger.info(f"Created empty file {output_file}")
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(json_output)
-                    logger.info(f"Successfully created {output_file} (from chapter files only)")
-                    processed_books.add(book_abbr)
-                else:
-                    logger.error(f"Failed to parse {book_abbr} even from chapter files.")
+                logger.debug(f"Filename {filename} skipped")
+        main_books = fresh_books(main_books)
+
+        # Results come back in submission order, so the files are written exactly as a serial run would
+        write_books(map_books(partial(build_book_with_metrics, backend=args.backend), main_books))
+
+        logger.debug(f"processed_books: {processed_books}")
+
+        # Check for books that were completely missed
+        missed_books = fresh_books([book_abbr for book_abbr in BOOK_ABBREVIATIONS if book_abbr not in processed_books])
+        write_books(map_books(partial(build_book_with_metrics, chapter_files_only=True, backend=args.backend),
+                              missed_books))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        save_manifest(manifest)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_output)
+            stats = io.StringIO()
+            pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(25)
+            logger.info(f"Profile written to {args.profile_output}, top functions by cumulative time:\n{stats.getvalue()}")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    elapsed = time.perf_counter() - start
+    table = format_metrics_table(book_metrics)
+    logger.info(f"Built {len(book_metrics)} books in {elapsed:.2f}s:\n{table}")
+    if args.metrics:
+        write_metrics_report(args.metrics, book_metrics, args.backend, jobs, elapsed)
+        print(table)
+        logger.info(f"Metrics written to {args.metrics}")
+
+    if args.watch:
+        watch_sources(args.backend, args.debounce, args.poll)
 
     logger.info("Finished Bible parsing script")
+
+if __name__ == "__main__":
+    # Configure logging
+    logger = configure_logger('bible_parser.log', log_level=logging.INFO)
+    main()
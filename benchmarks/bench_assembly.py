@@ -0,0 +1,98 @@
+"""Micro-benchmark of verse assembly in the three parsers, using the Psalms from json/psa.json.
+
+Verse extraction is swapped for an in-memory backend, so the timings cover only the work of
+putting verses into chapters (and serializing the result). The book is repeated to scale the
+number of chapters; the time per verse should stay flat as the chapter count grows.
+
+Run from the repository root: python benchmarks/bench_assembly.py
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+AMHARIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'amh', 'Amharic Bible 1962')
+sys.path.insert(0, AMHARIC_DIR)
+import parse_bible
+
+def load_psalms(json_file):
+    """Loads the verses of each chapter of the Psalms.
+
+    Args:
+        json_file (str): The path to json/psa.json.
+
+    Returns:
+        list: One list of (verse, text) tuples per chapter, in chapter order.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        book = json.load(f)
+    chapters = {}
+    for chapter in book['chapters']:
+        chapters.setdefault(chapter['chapter'], []).extend((v['verse'], v['text']) for v in chapter['verses'])
+    return [chapters[n] for n in sorted(chapters)]
+
+def build_inputs(work_dir, psalms, copies):
+    """Writes a TOC and main file for the scaled book and maps its chapter files to their verses.
+
+    Args:
+        work_dir (str): Directory for the generated files.
+        psalms (list): The chapters returned by load_psalms.
+        copies (int): How many times to repeat the book.
+
+    Returns:
+        tuple: (toc_file, book_file, chapter_files, verses_by_file, verse_count)
+    """
+    chapter_count = len(psalms) * copies
+    toc_file = os.path.join(work_dir, 'psa_toc.htm')
+    with open(toc_file, 'w', encoding='iso-8859-1') as f:
+        for n in range(1, chapter_count + 1):
+            f.write(f'<a href="psa-{n}.htm">Chapter {n}</a>\n')
+    book_file = os.path.join(work_dir, 'psa.htm')
+    with open(book_file, 'w', encoding='iso-8859-1') as f:
+        f.write('<html></html>')
+
+    verses_by_file = {}
+    for n in range(1, chapter_count + 1):
+        verses_by_file[os.path.join(work_dir, f'psa-{n}.htm')] = psalms[(n - 1) % len(psalms)]
+    chapter_files = sorted(verses_by_file)
+    verse_count = sum(len(verses) for verses in verses_by_file.values())
+    return toc_file, book_file, chapter_files, verses_by_file, verse_count
+
+def best_of(repeat, func, *args):
+    """Returns the fastest of several timed calls, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Number of times to repeat the 150 chapters of the Psalms (default: 1 2 4 8).")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case, the best is reported (default: 5).")
+    parser.add_argument('--json', default=os.path.join(AMHARIC_DIR, 'json', 'psa.json'),
+                        help="The Psalms JSON to take the verses from.")
+    args = parser.parse_args(argv)
+
+    psalms = load_psalms(args.json)
+    print(f"{'parser':<26} {'chapters':>8} {'verses':>7} {'ms':>9} {'us/verse':>9}")
+    for copies in args.copies:
+        with tempfile.TemporaryDirectory() as work_dir:
+            toc_file, book_file, chapter_files, verses_by_file, verse_count = build_inputs(work_dir, psalms, copies)
+            parse_bible.VERSE_EXTRACTORS['memory'] = verses_by_file.__getitem__
+            cases = [
+                ('parse_bible_html', parse_bible.parse_bible_html, toc_file, chapter_files, book_file, 'memory'),
+                ('parse_bible_html_no_main', parse_bible.parse_bible_html_no_main, toc_file, chapter_files, 'psa', 'memory'),
+                ('parse_from_chapter_files', parse_bible.parse_from_chapter_files, 'psa', chapter_files, 'memory'),
+            ]
+            for name, func, *func_args in cases:
+                seconds = best_of(args.repeat, func, *func_args)
+                print(f"{name:<26} {len(chapter_files):>8} {verse_count:>7} {seconds * 1000:>9.1f} {seconds * 1e6 / verse_count:>9.2f}")
+            del parse_bible.VERSE_EXTRACTORS['memory']
+
+if __name__ == "__main__":
+    main()
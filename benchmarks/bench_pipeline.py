@@ -0,0 +1,282 @@
+"""Benchmark harness for the HTML-to-JSON pipeline and the verse lookup paths.
+
+Parsing is measured on a synthetic source/ tree (see synthetic.py) for each verse extraction
+backend. Each parser is timed end to end on the books in its layout, and the work is also split
+into stages over the same chapter files:
+
+    read       open and decode the chapter files
+    parse      build the BeautifulSoup tree ('soup') or scan with VerseFontParser ('stream')
+    extract    pull the verse paragraphs out of the tree and split off the verse numbers
+    serialize  json.dumps of the assembled books, as the parsers do
+
+Lookups are measured on the shipped JSON: loading and walking a book per lookup (what ad hoc
+consumers do), the cached reader in tools/reader.py, and the packed file in tools/packed.py.
+
+Results are written as JSON; pass --compare with an earlier result file to print the ratios.
+
+Usage:
+    python benchmarks/bench_pipeline.py --output results.json [--books 6 --chapters 20 --verses 30]
+    python benchmarks/bench_pipeline.py --output new.json --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+sys.path.insert(0, os.path.join(ROOT, 'amh', 'Amharic Bible 1962'))
+
+import corpus
+import packed
+import parse_bible
+import reader
+import synthetic
+from bs4 import BeautifulSoup
+
+def best_of(repeat, func, *args):
+    """Returns (fastest time in seconds, result of the last call) over several calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _book_files(source_dir, abbr):
+    chapter_files = [os.path.join(source_dir, name) for name in os.listdir(source_dir)
+                     if name.startswith(f"{abbr}-") and name.endswith('.htm')]
+    return sorted(chapter_files), os.path.join(source_dir, f"{abbr}_toc.htm"), os.path.join(source_dir, f"{abbr}.htm")
+
+def bench_parsers(source_dir, layouts, backend, repeat):
+    """Times each parser end to end on the books in its layout.
+
+    Returns:
+        dict: Parser name -> {'books', 'verses', 'seconds', 'us_per_verse'}.
+    """
+    results = {}
+    for name, layout in (('parse_bible_html', 'full'), ('parse_bible_html_no_main', 'no_main'),
+                         ('parse_from_chapter_files', 'chapters_only')):
+        books = [abbr for abbr, book_layout in layouts.items() if book_layout == layout]
+        if not books:
+            continue
+
+        def run():
+            verse_count = 0
+            for abbr in books:
+                chapter_files, toc_file, book_file = _book_files(source_dir, abbr)
+                if name == 'parse_bible_html':
+                    output = parse_bible.parse_bible_html(toc_file, chapter_files, book_file, backend)
+                elif name == 'parse_bible_html_no_main':
+                    output = parse_bible.parse_bible_html_no_main(toc_file, chapter_files, abbr, backend)
+                else:
+                    output = parse_bible.parse_from_chapter_files(abbr, chapter_files, backend)
+                verse_count += sum(len(c['verses']) for c in json.loads(output)['chapters'])
+            return verse_count
+
+        seconds, verse_count = best_of(repeat, run)
+        results[name] = {'books': len(books), 'verses': verse_count, 'seconds': seconds,
+                         'us_per_verse': seconds * 1e6 / max(verse_count, 1)}
+    return results
+
+def bench_stages(source_dir, layouts, backend, repeat):
+    """Times the read, parse, extract and serialize stages over every chapter file.
+
+    Returns:
+        dict: Stage name -> seconds, plus the file, byte and verse counts.
+    """
+    chapter_files = []
+    for abbr in layouts:
+        for chapter_file in _book_files(source_dir, abbr)[0]:
+            chapter_files.append((abbr, parse_bible.chapter_file_number(chapter_file), chapter_file))
+
+    def read():
+        texts = []
+        for _, _, chapter_file in chapter_files:
+            with open(chapter_file, 'r', encoding='iso-8859-1') as f:
+                texts.append(f.read())
+        return texts
+
+    read_seconds, texts = best_of(repeat, read)
+
+    if backend == 'soup':
+        def parse():
+            return [BeautifulSoup(text, 'html.parser') for text in texts]
+
+        def extract(trees):
+            chapters = []
+            for soup in trees:
+                verses = []
+                for p in soup.find_all('p'):
+                    font_tag = p.find('font', {'face': 'GF Zemen Unicode'})
+                    if font_tag:
+                        verses.append(parse_bible.split_verse_text(font_tag.text))
+                chapters.append(verses)
+            return chapters
+    else:
+        def parse():
+            trees = []
+            for text in texts:
+                scanner = parse_bible.VerseFontParser()
+                scanner.feed(text)
+                scanner.close()
+                trees.append(scanner.verses)
+            return trees
+
+        def extract(trees):
+            return [[parse_bible.split_verse_text(text) for text in verse_texts] for verse_texts in trees]
+
+    parse_seconds, trees = best_of(repeat, parse)
+    extract_seconds, chapters = best_of(repeat, extract, trees)
+
+    def serialize():
+        books = {}
+        for (abbr, chapter_num, _), verses in zip(chapter_files, chapters):
+            books.setdefault(abbr, []).append({'chapter': chapter_num,
+                                               'verses': [{'verse': v, 'text': t} for v, t in verses]})
+        return [json.dumps({'book': abbr, 'book_amharic': abbr, 'chapters': book_chapters},
+                           ensure_ascii=False, indent=2)
+                for abbr, book_chapters in books.items()]
+
+    serialize_seconds, _ = best_of(repeat, serialize)
+    return {'read': read_seconds, 'parse': parse_seconds, 'extract': extract_seconds, 'serialize': serialize_seconds,
+            'files': len(chapter_files), 'bytes': sum(len(text) for text in texts),
+            'verses': sum(len(verses) for verses in chapters)}
+
+def bench_lookups(lookups, seed):
+    """Times random KJV verse lookups through each lookup path.
+
+    Returns:
+        dict: Path name -> {'lookups', 'seconds', 'us_per_lookup'}.
+    """
+    refs = [(book, chapter, verse) for book, chapter, verse, _ in corpus.iter_verses('kjv')]
+    rng = random.Random(seed)
+    sample = [rng.choice(refs) for _ in range(lookups)]
+    results = {}
+
+    def json_scan(refs):
+        for book, chapter, verse in refs:
+            with open(corpus.book_file('kjv', book), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            next(v['text'] for c in data['chapters'] if int(c['chapter']) == chapter
+                 for v in c['verses'] if v['verse'] == verse)
+
+    # Loading a whole book per lookup is slow, so this path gets a smaller sample
+    scan_sample = sample[:max(1, lookups // 20)]
+    start = time.perf_counter()
+    json_scan(scan_sample)
+    results['json_scan'] = time.perf_counter() - start, len(scan_sample)
+
+    bible = reader.Bible('kjv', max_bytes=1 << 30)
+    start = time.perf_counter()
+    for ref in sample:
+        bible.get(*ref)
+    results['reader_cold'] = time.perf_counter() - start, len(sample)
+    start = time.perf_counter()
+    for ref in sample:
+        bible.get(*ref)
+    results['reader_warm'] = time.perf_counter() - start, len(sample)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        packed_file = os.path.join(work_dir, 'kjv.bibpack')
+        packed.write_packed('kjv', packed_file)
+        start = time.perf_counter()
+        with packed.PackedBible(packed_file) as bible:
+            for ref in sample:
+                bible.verse(*ref)
+        results['packed'] = time.perf_counter() - start, len(sample)
+
+    return {name: {'lookups': count, 'seconds': seconds, 'us_per_lookup': seconds * 1e6 / count}
+            for name, (seconds, count) in results.items()}
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, float) and (key == 'seconds' or key.startswith('us_per') or key in
+                                          ('read', 'parse', 'extract', 'serialize')):
+            flat[prefix + key] = value
+    return flat
+
+def compare(old, new):
+    """Prints old and new timings side by side with the new/old ratio."""
+    old_flat = _flatten({'parse': old.get('parse', {}), 'lookup': old.get('lookup', {})})
+    new_flat = _flatten({'parse': new.get('parse', {}), 'lookup': new.get('lookup', {})})
+    print(f"{'metric':<60} {'old':>12} {'new':>12} {'ratio':>7}")
+    for key in sorted(new_flat):
+        if key in old_flat and old_flat[key]:
+            print(f"{key:<60} {old_flat[key]:>12.6f} {new_flat[key]:>12.6f} {new_flat[key] / old_flat[key]:>7.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parsing pipeline and the verse lookups.")
+    parser.add_argument('--output', '-o', help="Write the results as JSON to this file (default: stdout).")
+    parser.add_argument('--compare', metavar='OLD', help="An earlier results file to compare against.")
+    parser.add_argument('--books', type=int, default=6, help="Books in the synthetic tree (default: 6).")
+    parser.add_argument('--chapters', type=int, default=20, help="Chapters per book (default: 20).")
+    parser.add_argument('--verses', type=int, default=30, help="Verses per chapter (default: 30).")
+    parser.add_argument('--words', type=int, default=18, help="Words per verse (default: 18).")
+    parser.add_argument('--backend', nargs='+', choices=sorted(parse_bible.VERSE_EXTRACTORS),
+                        default=sorted(parse_bible.VERSE_EXTRACTORS))
+    parser.add_argument('--lookups', type=int, default=20000, help="Random verse lookups per path (default: 20000).")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per measurement, the best is kept (default: 3).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip', nargs='+', choices=['parse', 'lookup'], default=[])
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'scale': {'books': args.books, 'chapters': args.chapters, 'verses': args.verses, 'words': args.words,
+                  'lookups': args.lookups, 'repeat': args.repeat, 'seed': args.seed},
+    }
+
+    if 'parse' not in args.skip:
+        results['parse'] = {}
+        with tempfile.TemporaryDirectory() as work_dir:
+            tree = synthetic.generate(work_dir, args.books, args.chapters, args.verses, args.words, args.seed)
+            results['scale']['files'] = tree['files']
+            results['scale']['bytes'] = tree['bytes']
+            source_dir = os.path.join(work_dir, 'source')
+            for backend in args.backend:
+                results['parse'][backend] = {
+                    'parsers': bench_parsers(source_dir, tree['layouts'], backend, args.repeat),
+                    'stages': bench_stages(source_dir, tree['layouts'], backend, args.repeat),
+                }
+
+    if 'lookup' not in args.skip:
+        results['lookup'] = bench_lookups(args.lookups, args.seed)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    sys.exit(main())
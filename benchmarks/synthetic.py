@@ -0,0 +1,104 @@
+"""Generates a synthetic source/ tree in the layout parse_bible.py expects.
+
+Books are written in the three layouts the parser handles, in rotation: TOC, main and chapter
+files; TOC and chapter files without a main file; and chapter files only. Verses are
+<p><font face="GF Zemen Unicode"> paragraphs with random Ethiopic words written as numeric
+character references, like the real source, and every tenth verse is merged with the next one
+("3፤4 ..."). The output is deterministic for a given seed.
+
+Usage:
+    python benchmarks/synthetic.py OUT_DIR [--books 6] [--chapters 20] [--verses 30] [--words 18]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+import corpus
+
+LAYOUTS = ('full', 'no_main', 'chapters_only')
+
+def _entities(text):
+    return "".join(c if ord(c) < 128 else f"&#{ord(c)};" for c in text)
+
+def _word(rng):
+    # Ethiopic syllables U+1200-U+1357
+    return "".join(chr(rng.randrange(0x1200, 0x1358)) for _ in range(rng.randint(2, 6)))
+
+def generate(out_dir, books=6, chapters=20, verses=30, words=18, seed=0):
+    """Writes the synthetic tree to out_dir/source.
+
+    Args:
+        out_dir (str): The project directory to create; files go to its source/ subdirectory.
+        books (int): Number of books, taken from the start of the canonical list (up to 66).
+        chapters (int): Chapters per book.
+        verses (int): Verses per chapter.
+        words (int): Words per verse.
+        seed (int): Random seed.
+
+    Returns:
+        dict: {'layouts': {book abbreviation: layout}, 'files': file count, 'bytes': total size}
+    """
+    rng = random.Random(seed)
+    source_dir = os.path.join(out_dir, 'source')
+    os.makedirs(source_dir, exist_ok=True)
+    abbreviations = [corpus.book_abbreviations()[book] for book in corpus.book_names()][:books]
+    layouts = {}
+    file_count = 0
+    byte_count = 0
+
+    def write(name, content):
+        nonlocal file_count, byte_count
+        data = content.encode('iso-8859-1')
+        with open(os.path.join(source_dir, name), 'wb') as f:
+            f.write(data)
+        file_count += 1
+        byte_count += len(data)
+
+    for i, abbr in enumerate(abbreviations):
+        layout = LAYOUTS[i % len(LAYOUTS)]
+        layouts[abbr] = layout
+        english, amharic = corpus.book_mappings()[abbr]
+        if layout in ('full', 'no_main'):
+            links = "\n".join(f'<a href="{abbr}-{n}.htm">{_entities(amharic)} {n}</a><br>' for n in range(1, chapters + 1))
+            write(f"{abbr}_toc.htm",
+                  f'<html><head><title>{english}</title></head><body>\n'
+                  f'<p><font face="GF Zemen Unicode" size="5">{_entities(amharic)} ({english})</font></p>\n'
+                  f'{links}\n</body></html>\n')
+        if layout == 'full':
+            write(f"{abbr}.htm",
+                  f'<html><head><title>{english}</title></head><body>\n'
+                  f'<p><font face="GF Zemen Unicode" size="5">{_entities(amharic)}</font></p>\n</body></html>\n')
+        for n in range(1, chapters + 1):
+            paragraphs = []
+            verse = 1
+            while verse <= verses:
+                text = " ".join(_word(rng) for _ in range(words)) + "።"
+                if verse % 10 == 0 and verse < verses:
+                    number = f"{verse}፤{verse + 1}"
+                    verse += 2
+                else:
+                    number = str(verse)
+                    verse += 1
+                paragraphs.append(f'<p><font face="GF Zemen Unicode" size="3">{_entities(number + " " + text)}</font></p>')
+            write(f"{abbr}-{n}.htm",
+                  f'<html><head><title>{english} {n}</title></head><body>\n'
+                  f'<p><b><font face="Arial">{english} {n}</font></b></p>\n'
+                  + "\n".join(paragraphs) + "\n</body></html>\n")
+    return {'layouts': layouts, 'files': file_count, 'bytes': byte_count}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic source/ tree for parse_bible.py.")
+    parser.add_argument('out_dir')
+    parser.add_argument('--books', type=int, default=6)
+    parser.add_argument('--chapters', type=int, default=20)
+    parser.add_argument('--verses', type=int, default=30)
+    parser.add_argument('--words', type=int, default=18)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    result = generate(args.out_dir, args.books, args.chapters, args.verses, args.words, args.seed)
+    print(f"{args.out_dir}/source: {result['files']} files, {result['bytes']} bytes")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""Puts tools/, benchmarks/ and the Amharic parser on the import path, as the scripts expect to be run."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (os.path.join(ROOT, 'tools'), os.path.join(ROOT, 'benchmarks'), os.path.join(ROOT, 'amh', 'Amharic Bible 1962')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,65 @@
+"""Incremental builds of parse_bible.py: books with unchanged inputs are skipped."""
+import json
+import os
+
+import pytest
+
+import parse_bible
+import synthetic
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # gen in the full layout, exo without a main file, lev from chapter files only
+    layouts = synthetic.generate(str(tmp_path), books=3, chapters=3, verses=5, words=4)['layouts']
+    assert layouts == {'gen': 'full', 'exo': 'no_main', 'lev': 'chapters_only'}
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def written():
+    # A rewrite goes through a temporary file and a rename, so it always gives the JSON a new inode
+    return {name: os.stat(os.path.join('json', name)).st_ino for name in sorted(os.listdir('json'))}
+
+def edit(path):
+    with open(path, 'a', encoding='iso-8859-1') as f:
+        f.write('<p><font face="GF Zemen Unicode">6 &#4768;</font></p>\n')
+
+def test_second_run_skips_every_book(tree):
+    parse_bible.main([])
+    first = written()
+    assert list(first) == ['exo.json', 'gen.json', 'lev.json']
+    parse_bible.main([])
+    assert written() == first
+    manifest = json.loads((tree / parse_bible.MANIFEST_FILE).read_text())
+    assert manifest['parser_version'] == parse_bible.PARSER_VERSION
+    assert sorted(manifest['books']) == ['exo', 'gen', 'lev']
+
+@pytest.mark.parametrize('changed', ['source/gen-2.htm', 'source/exo_toc.htm', 'source/lev-3.htm'])
+def test_only_the_changed_book_is_rebuilt(tree, changed):
+    parse_bible.main([])
+    first = written()
+    edit(changed)
+    parse_bible.main([])
+    book = f"{parse_bible.source_book(changed)}.json"
+    assert {name for name, inode in written().items() if inode != first[name]} == {book}
+
+def test_missing_json_is_rebuilt(tree):
+    parse_bible.main([])
+    first = written()
+    os.remove('json/exo.json')
+    parse_bible.main([])
+    second = written()
+    assert second['gen.json'] == first['gen.json'] and second['lev.json'] == first['lev.json']
+    assert 'exo.json' in second
+
+def test_force_rebuilds_every_book(tree):
+    parse_bible.main([])
+    first = written()
+    parse_bible.main(['--force'])
+    assert all(inode != first[name] for name, inode in written().items())
+
+def test_new_parser_version_rebuilds_every_book(tree, monkeypatch):
+    parse_bible.main([])
+    first = written()
+    monkeypatch.setattr(parse_bible, 'PARSER_VERSION', parse_bible.PARSER_VERSION + 1)
+    parse_bible.main([])
+    assert all(inode != first[name] for name, inode in written().items())
@@ -0,0 +1,31 @@
+"""Substring search over the columnar text buffer."""
+import pytest
+
+import columnar
+
+@pytest.fixture(scope='module')
+def kjv():
+    return columnar.ColumnarCorpus('kjv')
+
+def test_find_maps_hits_to_verses(kjv):
+    ids = kjv.find('living water')
+    assert ids
+    assert all('living water' in kjv.text(verse_id) for verse_id in ids)
+    assert ids == [verse_id for verse_id in range(len(kjv)) if 'living water' in kjv.text(verse_id)]
+
+def test_find_rejects_empty_string(kjv):
+    with pytest.raises(ValueError):
+        kjv.find('')
+
+@pytest.mark.parametrize('with_numpy', [True, False])
+def test_select_returns_a_list(kjv, monkeypatch, with_numpy):
+    if with_numpy and columnar.numpy is None:
+        pytest.skip("NumPy is not installed")
+    if not with_numpy:
+        monkeypatch.setattr(columnar, 'numpy', None)
+    ids = kjv.select(books=['Ruth', 'Jonah'], min_words=30, max_words=40)
+    assert type(ids) is list
+    assert ids and all(type(verse_id) is int for verse_id in ids)
+    assert ids == [verse_id for verse_id in [*kjv.book_ids('Ruth'), *kjv.book_ids('Jonah')]
+                   if 30 <= kjv.column('words')[verse_id] <= 40]
+    assert kjv.select(books=['Ruth'], min_words=1000) == []
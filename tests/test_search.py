@@ -0,0 +1,30 @@
+"""Query parsing of the full-text search index."""
+import pytest
+
+import search
+
+@pytest.fixture(scope='module')
+def index_dir(tmp_path_factory):
+    index_dir = str(tmp_path_factory.mktemp('search'))
+    search.build_index('kjv', search.index_file('kjv', index_dir))
+    return index_dir
+
+@pytest.fixture(scope='module')
+def index(index_dir):
+    return search.SearchIndex(search.index_file('kjv', index_dir))
+
+def test_punctuation_terms_are_skipped(index):
+    lamb = index.search('lamb')
+    assert lamb
+    assert index.search('lamb -') == lamb
+    assert index.search('lamb "" ።') == lamb
+    assert index.search('-') == []
+
+@pytest.mark.parametrize('query', ['NOT', '(lamb', 'lamb OR', 'lamb )'])
+def test_malformed_query_raises(index, query):
+    with pytest.raises(ValueError):
+        index.search(query)
+
+def test_main_reports_malformed_query(index_dir, capsys):
+    assert search.main(['query', 'kjv', '(lamb', '--index-dir', index_dir]) == 1
+    assert 'Missing ) in query' in capsys.readouterr().err
@@ -0,0 +1,67 @@
+"""Request framing, conditional GETs and caching of the verse service."""
+import asyncio
+
+import pytest
+
+import server
+
+async def _exchange(service, request):
+    # Sends raw bytes on one connection and returns everything the server writes until it closes
+    listener = await asyncio.start_server(service.handle, '127.0.0.1', 0, limit=server.MAX_HEADER_BYTES)
+    async with listener:
+        port = listener.sockets[0].getsockname()[1]
+        stream_reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(stream_reader.read(), 10)
+        writer.close()
+        return response
+
+def exchange(service, request):
+    return asyncio.run(_exchange(service, request))
+
+@pytest.fixture(scope='module')
+def service():
+    return server.VerseService()
+
+@pytest.mark.parametrize('header, matches', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", W/"abc"', True),
+    ('*', True),
+    ('"x", "y"', False),
+    ('abc', False),
+    ('', False),
+])
+def test_etag_matches(header, matches):
+    assert server.etag_matches(header, '"abc"') is matches
+
+def test_body_of_rejected_method_is_not_a_request(service):
+    smuggled = b"GET /kjv HTTP/1.1\r\nHost: x\r\n\r\n"
+    response = exchange(service, b"POST / HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n" % len(smuggled) + smuggled)
+    assert response.startswith(b"HTTP/1.1 405 ")
+    assert b"Connection: close\r\n" in response
+    assert response.count(b"HTTP/1.1 ") == 1
+
+@pytest.mark.parametrize('framing', [b"Content-Length: 0\r\nContent-Length: 30\r\n", b"Transfer-Encoding: chunked\r\n"])
+def test_get_with_body_closes_the_connection(service, framing):
+    smuggled = b"GET /kjv HTTP/1.1\r\nHost: x\r\n\r\n"
+    response = exchange(service, b"GET / HTTP/1.1\r\nHost: x\r\n" + framing + b"\r\n" + smuggled)
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert b"Connection: close\r\n" in response
+    assert response.count(b"HTTP/1.1 ") == 1
+
+def test_keep_alive_and_conditional_get(service):
+    etag = service.render('/kjv/John/3/16').etag
+    response = exchange(service, b"GET /kjv/John/3/16 HTTP/1.1\r\nHost: x\r\n\r\n"
+                                 b"GET /kjv/John/3/16 HTTP/1.1\r\nHost: x\r\nIf-None-Match: \"x\", W/" + etag.encode() +
+                                 b"\r\nConnection: close\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert response.count(b"HTTP/1.1 ") == 2
+    assert b"HTTP/1.1 304 Not Modified\r\n" in response
+
+def test_errors_are_not_cached(service):
+    service.store('/kjv/John/3/16', service.render('/kjv/John/3/16'))
+    service.store('/nowhere', service.render('/nowhere'))
+    assert service.cached('/nowhere') is None
+    assert service.cached('/kjv/John/3/16').status == 200
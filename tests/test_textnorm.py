@@ -0,0 +1,19 @@
+"""Normalization shared by the search, concordance and columnar tools."""
+import pytest
+
+import textnorm
+
+@pytest.mark.parametrize('text, normalized', [
+    ('ሐ ሑ ኀ ኆ', 'ሀ ሁ ሀ ሆ'),
+    ('ሠላም ዐይን ፀሐይ', 'ሰላም አይን ጸሀይ'),
+    # ኸ is the ከ-series /x/, not a homophone of ሀ
+    ('ኸ ኹ ኾ', 'ኸ ኹ ኾ'),
+    # Labialized forms do not line up between series and are kept
+    ('ሗ', 'ሗ'),
+    ('The LORD’s', "the lord's"),
+])
+def test_normalize(text, normalized):
+    assert textnorm.normalize(text) == normalized
+
+def test_tokenize_splits_on_ethiopic_punctuation():
+    assert textnorm.tokenize("ሕዝብ፤ሰማይ። The LORD’s") == ['ህዝብ', 'ሰማይ', 'the', "lord's"]
@@ -0,0 +1,24 @@
+"""Checks of tools/validate.py on hand-made chapters."""
+import pytest
+
+import validate
+
+def _checks(verses):
+    return [issue['check'] for issue in validate.check_verses('amh', 'Genesis', {'chapter': 1, 'verses': verses})]
+
+@pytest.mark.parametrize('text', [
+    'a &#4964; b',
+    # What the parser leaves: a reference without its semicolon stays literal, an unknown one loses it
+    'end &#4964',
+    'c &bogus d',
+    'e &#x1364 f',
+])
+def test_html_entity_reported(text):
+    assert _checks([{'verse': '1', 'text': text}]) == ['html_entity']
+
+def test_clean_chapter_has_no_issues():
+    assert _checks([{'verse': '1', 'text': 'a & b'}, {'verse': '2-3', 'text': 'c'}]) == []
+
+def test_numbering_issues():
+    checks = _checks([{'verse': '1', 'text': 'a'}, {'verse': '1', 'text': 'b'}, {'verse': '4', 'text': ''}])
+    assert checks == ['duplicate_verse', 'empty_text', 'missing_verse']
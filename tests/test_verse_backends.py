@@ -0,0 +1,68 @@
+"""The stream backend of parse_bible.py must extract exactly what the soup backend does."""
+import glob
+import json
+import os
+
+import pytest
+
+import parse_bible
+import synthetic
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+CHAPTER_FILES = sorted(glob.glob(os.path.join(FIXTURES, 'chapters', '*.htm')))
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 65536])
+@pytest.mark.parametrize('chapter_file', CHAPTER_FILES, ids=os.path.basename)
+def test_stream_matches_soup(chapter_file, chunk_size):
+    soup = list(parse_bible.extract_verses_soup(chapter_file))
+    stream = list(parse_bible.extract_verses_stream(chapter_file, chunk_size=chunk_size))
+    assert stream == soup
+
+@pytest.mark.parametrize('name, verses', [
+    ('nested_unclosed-2.htm', [('1', 'text'), ('1', 'text')]),
+    ('nested_closed-3.htm', [('1', 'text more'), ('1', 'text')]),
+    ('malformed-4.htm', [('x', ''), ('', ''), ('2', 'y3 z'), ('3', 'z')]),
+    ('entities-5.htm', [('1', 'a b  c &bogus d & e f'), ('2', '፤g €h'), ('3', 'end &#4964')]),
+    ('eof_reference-6.htm', [('1', 'last &copy')]),
+])
+def test_stream_verses(name, verses):
+    assert list(parse_bible.extract_verses_stream(os.path.join(FIXTURES, 'chapters', name))) == verses
+
+def test_verse_across_chunk_boundary():
+    # The default chunk boundary falls inside a character reference of verse 557
+    verses = list(parse_bible.extract_verses_stream(os.path.join(FIXTURES, 'chapters', 'chunk_boundary-7.htm')))
+    assert len(verses) == 558
+    assert verses[556][0] == '557'
+    assert verses[556][1].endswith('xx\u12a0&\u1348 bold tail\u1362')
+
+def test_backends_write_the_same_json():
+    outputs = {backend: json.loads(parse_bible.parse_from_chapter_files('gen', CHAPTER_FILES, backend))
+               for backend in parse_bible.VERSE_EXTRACTORS}
+    assert outputs['stream'] == outputs['soup']
+    assert [chapter['chapter'] for chapter in outputs['soup']['chapters']] == [1, 2, 3, 4, 5, 6, 7]
+
+@pytest.fixture(scope='module')
+def synthetic_tree(tmp_path_factory):
+    # The tree benchmarks/bench_pipeline.py measures: 6 books in every source layout, 3360 verses
+    out_dir = tmp_path_factory.mktemp('synthetic')
+    synthetic.generate(str(out_dir))
+    return out_dir
+
+def test_backends_match_on_every_chapter_file(synthetic_tree):
+    chapter_files = sorted(glob.glob(str(synthetic_tree / 'source' / '*-[0-9]*.htm')))
+    assert len(chapter_files) == 120
+    for chapter_file in chapter_files:
+        outputs = {backend: list(extract(chapter_file)) for backend, extract in parse_bible.VERSE_EXTRACTORS.items()}
+        assert outputs['stream'] == outputs['soup'], chapter_file
+
+def test_main_writes_the_same_json_with_either_backend(synthetic_tree, tmp_path, monkeypatch):
+    written = {}
+    for backend in parse_bible.VERSE_EXTRACTORS:
+        run_dir = tmp_path / backend
+        run_dir.mkdir()
+        (run_dir / 'source').symlink_to(synthetic_tree / 'source')
+        monkeypatch.chdir(run_dir)
+        parse_bible.main(['--backend', backend])
+        written[backend] = {path.name: path.read_bytes() for path in (run_dir / 'json').iterdir()}
+    assert len(written['soup']) == 6
+    assert written['stream'] == written['soup']
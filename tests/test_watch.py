@@ -0,0 +1,78 @@
+"""Watch mode of parse_bible.py, driven by PollingWatcher so it needs no inotify."""
+import os
+
+import pytest
+
+import parse_bible
+import synthetic
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # 17 books, so Ezra (chapter files only) and Esther (TOC without a main file) are included
+    layouts = synthetic.generate(str(tmp_path), books=17, chapters=2, verses=3, words=3)['layouts']
+    assert (layouts['gen'], layouts['exo'], layouts['lev'], layouts['ezr'], layouts['est']) == \
+        ('full', 'no_main', 'chapters_only', 'chapters_only', 'no_main')
+    monkeypatch.chdir(tmp_path)
+    parse_bible.main([])
+    return tmp_path
+
+def written():
+    # A rewrite goes through a temporary file and a rename, so it always gives the JSON a new inode
+    return {name: os.stat(os.path.join('json', name)).st_ino for name in sorted(os.listdir('json'))}
+
+class EditingWatcher(parse_bible.PollingWatcher):
+    """Edits a source file before the first scan, then stops the watch loop once it has rebuilt."""
+
+    def __init__(self, directory, interval, path):
+        super().__init__(directory, interval)
+        self.path = path
+        self.calls = 0
+
+    def changes(self, timeout=None):
+        self.calls += 1
+        if self.calls == 1:
+            with open(self.path, 'a', encoding='iso-8859-1') as f:
+                f.write('<p><font face="GF Zemen Unicode">4 &#4768;&#4635;</font></p>\n')
+        elif timeout is None:
+            # Nothing pending any more: the loop has rebuilt and would wait for the next change
+            raise KeyboardInterrupt
+        return super().changes(timeout)
+
+@pytest.mark.parametrize('name, book', [
+    ('gen-12.htm', 'gen'),
+    ('gen_toc.htm', 'gen'),
+    ('gen.htm', 'gen'),
+    ('1sa-3.htm', '1sa'),
+    ('EST-1.HTM', 'est'),
+    ('source/ezr-10.htm', 'ezr'),
+    ('gen-12.htm.swp', None),
+    ('.gen-12.htm', None),
+    ('notes.txt', None),
+])
+def test_source_book(name, book):
+    assert parse_bible.source_book(name) == book
+
+@pytest.mark.parametrize('changed', ['gen-2.htm', 'exo_toc.htm', 'lev-1.htm', 'ezr-2.htm', 'est-1.htm'])
+def test_watch_rebuilds_only_the_changed_book(tree, monkeypatch, changed):
+    before = written()
+    watchers = []
+
+    def open_watcher(directory, poll_interval):
+        watchers.append(EditingWatcher(directory, 0.01, os.path.join(directory, changed)))
+        return watchers[0]
+
+    monkeypatch.setattr(parse_bible, 'open_source_watcher', open_watcher)
+    parse_bible.watch_sources(debounce=0.05)
+
+    book = f"{parse_bible.source_book(changed)}.json"
+    after = written()
+    assert {name for name in after if after[name] != before[name]} == {book}
+    assert not [name for name in os.listdir('json') if name.endswith('.tmp')]
+    if '-' in changed:
+        # The verse added to the chapter file is in the rebuilt JSON
+        with open(os.path.join('json', book), encoding='utf-8') as f:
+            assert 'አማ' in f.read()
+
+    # The manifest was updated, so a normal run afterwards has nothing to rebuild
+    parse_bible.main([])
+    assert written() == after
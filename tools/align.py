@@ -0,0 +1,204 @@
+"""Verse alignment between the KJV and the Amharic 1962 translation.
+
+The two JSON trees name books differently (Ruth.json vs rut.json), store the chapter as a string
+in the KJV and an int in the Amharic, and the Amharic text merges some verses into ranges such as
+"3-4". The alignment is worked out once and stored as two arrays indexed by verse id (the row
+numbers of the packed files from packed.py, which count verses in canonical order):
+
+    header      magic b'BIBLALN1', version, KJV verse count, Amharic verse count
+    kjv_to_amh  per KJV verse: the id of the Amharic verse or range containing it, or NO_VERSE
+    amh_to_kjv  per Amharic verse: first KJV verse id and number of KJV verses it covers
+
+Verses are matched by book, chapter number and verse number. Amharic entries without a verse
+number (psalm titles and the like) have no KJV counterpart, and no attempt is made to map
+between the two versification schemes where their chapter divisions differ.
+
+Usage:
+    python tools/align.py build [--out build/]
+    python tools/align.py show John 3 16
+"""
+import argparse
+import os
+import struct
+import sys
+from array import array
+
+import corpus
+import packed
+
+MAGIC = b'BIBLALN1'
+VERSION = 1
+
+HEADER = struct.Struct('<8s3I')
+
+NO_VERSE = packed.NO_VERSE
+
+def alignment_file(out_dir=corpus.BUILD_DIR):
+    """Returns the default path of the alignment file."""
+    return os.path.join(out_dir, 'kjv-amh.aln')
+
+def _verse_slots(translation):
+    """Numbers the verses of a translation and maps each verse number to its id.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+
+    Returns:
+        tuple: (verse count, {(book, chapter): {verse number: verse id}}, [(book, chapter, numbers)]
+        per verse id, where numbers is the (first, last) range of the label or None).
+    """
+    slots = {}
+    verses = []
+    for book, data in corpus.iter_books(translation):
+        for chapter in data['chapters']:
+            # A chapter repeated in the JSON keeps the numbers of its first occurrence
+            chapter_slots = slots.setdefault((book, chapter['chapter']), {})
+            repeated = bool(chapter_slots)
+            for verse in chapter['verses']:
+                numbers = corpus.verse_numbers(verse['verse'])
+                if numbers and not repeated:
+                    for n in range(numbers[0], numbers[1] + 1):
+                        chapter_slots.setdefault(n, len(verses))
+                verses.append((book, chapter['chapter'], None if repeated else numbers))
+    return len(verses), slots, verses
+
+def build_alignment(output_file):
+    """Aligns the KJV with the Amharic translation and writes the alignment file.
+
+    Args:
+        output_file (str): The path of the alignment file to write.
+
+    Returns:
+        dict: Verse counts, and how many verses of each side found a counterpart.
+    """
+    kjv_count, kjv_slots, kjv_verses = _verse_slots('kjv')
+    amh_count, amh_slots, amh_verses = _verse_slots('amh')
+
+    kjv_to_amh = array('I', [NO_VERSE]) * kjv_count
+    for (book, chapter), chapter_slots in kjv_slots.items():
+        amh_chapter = amh_slots.get((book, chapter), {})
+        for n, kjv_id in chapter_slots.items():
+            kjv_to_amh[kjv_id] = amh_chapter.get(n, NO_VERSE)
+
+    amh_to_kjv = array('I', [NO_VERSE, 0]) * amh_count
+    for amh_id, (book, chapter, numbers) in enumerate(amh_verses):
+        if numbers is None:
+            continue
+        kjv_chapter = kjv_slots.get((book, chapter), {})
+        kjv_ids = [kjv_chapter[n] for n in range(numbers[0], numbers[1] + 1) if n in kjv_chapter]
+        if kjv_ids:
+            amh_to_kjv[amh_id * 2] = min(kjv_ids)
+            amh_to_kjv[amh_id * 2 + 1] = max(kjv_ids) - min(kjv_ids) + 1
+
+    if sys.byteorder != 'little':
+        kjv_to_amh.byteswap()
+        amh_to_kjv.byteswap()
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kjv_count, amh_count))
+        f.write(kjv_to_amh.tobytes())
+        f.write(amh_to_kjv.tobytes())
+    os.replace(tmp_file, output_file)
+    if sys.byteorder != 'little':
+        kjv_to_amh.byteswap()
+        amh_to_kjv.byteswap()
+    return {'kjv_verses': kjv_count, 'amh_verses': amh_count,
+            'kjv_aligned': sum(1 for amh_id in kjv_to_amh if amh_id != NO_VERSE),
+            'amh_aligned': sum(1 for kjv_id in amh_to_kjv[0::2] if kjv_id != NO_VERSE)}
+
+class Alignment:
+    """Side-by-side lookups between the KJV and the Amharic text.
+
+    Loads the alignment arrays (about 400 KB) and opens the packed file of each translation, so a
+    lookup is a few array reads and no JSON is loaded.
+
+    Args:
+        path (str): The alignment file, by default build/kjv-amh.aln.
+        packed_dir (str): Directory holding kjv.bibpack and amh.bibpack.
+    """
+
+    def __init__(self, path=None, packed_dir=corpus.BUILD_DIR):
+        path = path or alignment_file()
+        with open(path, 'rb') as f:
+            magic, version, kjv_count, amh_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} alignment file")
+            self._kjv_to_amh = array('I')
+            self._kjv_to_amh.fromfile(f, kjv_count)
+            self._amh_to_kjv = array('I')
+            self._amh_to_kjv.fromfile(f, amh_count * 2)
+        if sys.byteorder != 'little':
+            self._kjv_to_amh.byteswap()
+            self._amh_to_kjv.byteswap()
+        self.kjv = packed.PackedBible(packed.packed_file('kjv', packed_dir))
+        self.amh = packed.PackedBible(packed.packed_file('amh', packed_dir))
+        if (self.kjv.verse_count, self.amh.verse_count) != (kjv_count, amh_count):
+            self.close()
+            raise ValueError(f"{path} does not match the packed files in {packed_dir}, rebuild both")
+
+    def close(self):
+        self.kjv.close()
+        self.amh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def amharic_id(self, kjv_id):
+        """Returns the id of the Amharic verse aligned with a KJV verse id, or None."""
+        amh_id = self._kjv_to_amh[kjv_id]
+        return None if amh_id == NO_VERSE else amh_id
+
+    def kjv_ids(self, amh_id):
+        """Returns the range of KJV verse ids aligned with an Amharic verse id (empty if none)."""
+        first, count = self._amh_to_kjv[amh_id * 2], self._amh_to_kjv[amh_id * 2 + 1]
+        return range(0) if first == NO_VERSE else range(first, first + count)
+
+    def kjv_to_amh(self, book, chapter, verse):
+        """Returns (label, text) of the Amharic verse or range for a KJV verse, or None."""
+        amh_id = self.amharic_id(self.kjv.verse_id(book, chapter, verse))
+        return None if amh_id is None else self.amh.verse_by_id(amh_id)
+
+    def amh_to_kjv(self, book, chapter, verse):
+        """Returns the (label, text) pairs of the KJV verses covered by an Amharic verse or range."""
+        return [self.kjv.verse_by_id(kjv_id) for kjv_id in self.kjv_ids(self.amh.verse_id(book, chapter, verse))]
+
+    def side_by_side(self, book, chapter, verse):
+        """Returns {'kjv': (label, text), 'amh': (label, text) or None} for a KJV reference."""
+        kjv_id = self.kjv.verse_id(book, chapter, verse)
+        amh_id = self.amharic_id(kjv_id)
+        return {'kjv': self.kjv.verse_by_id(kjv_id),
+                'amh': None if amh_id is None else self.amh.verse_by_id(amh_id)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the KJV / Amharic verse alignment.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Align the two translations.")
+    build.add_argument('--out', default=corpus.BUILD_DIR, help="Output directory (default: build/).")
+    show = commands.add_parser('show', help="Print a KJV verse next to its Amharic counterpart.")
+    show.add_argument('book')
+    show.add_argument('chapter', type=int)
+    show.add_argument('verse')
+    show.add_argument('--dir', default=corpus.BUILD_DIR, help="Directory holding the alignment and packed files.")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        output_file = alignment_file(args.out)
+        stats = build_alignment(output_file)
+        print(f"{output_file}: {stats['kjv_aligned']} of {stats['kjv_verses']} KJV verses and "
+              f"{stats['amh_aligned']} of {stats['amh_verses']} Amharic verses aligned")
+        return
+
+    with Alignment(alignment_file(args.dir), args.dir) as alignment:
+        pair = alignment.side_by_side(args.book, args.chapter, args.verse)
+        print(f"KJV {pair['kjv'][0]}\t{pair['kjv'][1]}")
+        if pair['amh']:
+            print(f"AMH {pair['amh'][0]}\t{pair['amh'][1]}")
+        else:
+            print("AMH -")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Compressed distribution archive with per-book random access.
+
+Each book of each translation is stored as compact JSON (the same document as its file in the
+json/ directory, without the indentation) and compressed on its own, so a reader can
+decompress one book without touching the rest. With the zstandard package installed the books
+are compressed with zstd using a dictionary trained on the corpus itself and stored in the
+archive; without it, with zlib (deflate, as in gzip) using a preset dictionary sampled from the
+corpus.
+
+File layout (all integers are little-endian uint32):
+
+    header      magic b'BIBLARC1', version, codec, entry count, names size, dictionary size
+    entries     per book: name offset/length, data offset, compressed size, raw size, CRC-32
+    names       "kjv/Genesis", "amh/Genesis", ... as UTF-8
+    dictionary  the zstd dictionary or zlib preset dictionary
+    data        the compressed books
+
+The header, index and dictionary come first, so a reader needs one small read to locate any
+book and one more to fetch it.
+
+Usage:
+    python tools/archive.py build [build/bible.bibarc] [--codec zstd|zlib] [--translation kjv amh]
+    python tools/archive.py get build/bible.bibarc kjv Ruth
+    python tools/archive.py bench build/bible.bibarc
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+import corpus
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b'BIBLARC1'
+VERSION = 1
+
+HEADER = struct.Struct('<8s5I')
+ENTRY = struct.Struct('<6I')
+
+CODECS = {'zlib': 0, 'zstd': 1}
+
+ZSTD_LEVEL = 19
+ZSTD_DICTIONARY_SIZE = 112 * 1024
+
+# zlib only looks back 32 KB, so a preset dictionary longer than that is wasted
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+
+def archive_file(out_dir=corpus.BUILD_DIR):
+    """Returns the default path of the archive."""
+    return os.path.join(out_dir, 'bible.bibarc')
+
+def compact_book(translation, book):
+    """Returns a book's JSON file re-serialized without indentation, as UTF-8."""
+    with open(corpus.book_file(translation, book), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _samples(documents):
+    # Chapter-sized pieces of every book, the unit the dictionary trainers work best with
+    samples = []
+    for document in documents:
+        data = json.loads(document)
+        for chapter in data['chapters']:
+            samples.append(json.dumps(chapter, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    return samples
+
+def _zlib_dictionary(documents):
+    # zlib has no trainer: fill the dictionary with the JSON skeleton and the most common words,
+    # the most frequent last, since deflate encodes short distances most cheaply
+    counts = {}
+    for document in documents:
+        for chapter in json.loads(document)['chapters']:
+            for verse in chapter['verses']:
+                for word in verse['text'].split():
+                    counts[word] = counts.get(word, 0) + 1
+    words = sorted(counts, key=lambda word: (counts[word], word))
+    dictionary = bytearray(b'{"chapter":,"verses":[{"verse":"","text":""}]},')
+    for word in reversed(words):
+        encoded = (word + ' ').encode('utf-8')
+        if len(dictionary) + len(encoded) > ZLIB_DICTIONARY_SIZE:
+            break
+        dictionary[:0] = encoded
+    return bytes(dictionary)
+
+def build_archive(output_file, translations=('kjv', 'amh'), codec=None):
+    """Writes the archive.
+
+    Args:
+        output_file (str): The path of the archive.
+        translations (tuple): Keys of corpus.TRANSLATION_DIRS, stored in this order.
+        codec (str): 'zstd' or 'zlib'; defaults to zstd when the zstandard package is installed.
+
+    Returns:
+        dict: The codec, number of books, raw and compressed sizes, and the dictionary size.
+    """
+    codec = codec or ('zstd' if zstandard else 'zlib')
+    if codec == 'zstd' and zstandard is None:
+        raise SystemExit("The zstd codec needs the zstandard package (pip install zstandard)")
+
+    names = []
+    documents = []
+    for translation in translations:
+        for book in corpus.book_names():
+            if os.path.exists(corpus.book_file(translation, book)):
+                names.append(f"{translation}/{book}")
+                documents.append(compact_book(translation, book))
+
+    if codec == 'zstd':
+        dictionary = zstandard.train_dictionary(ZSTD_DICTIONARY_SIZE, _samples(documents))
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+        compress = compressor.compress
+        dictionary = dictionary.as_bytes()
+    else:
+        dictionary = _zlib_dictionary(documents)
+
+        def compress(document):
+            compressor = zlib.compressobj(9, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+            return compressor.compress(document) + compressor.flush()
+
+    blobs = [compress(document) for document in documents]
+    encoded_names = [name.encode('utf-8') for name in names]
+    names_size = sum(len(name) for name in encoded_names)
+    data_offset = HEADER.size + len(names) * ENTRY.size + names_size + len(dictionary)
+
+    entries = []
+    name_offset = 0
+    for name, document, blob in zip(encoded_names, documents, blobs):
+        entries.append(ENTRY.pack(name_offset, len(name), data_offset, len(blob), len(document), zlib.crc32(document)))
+        name_offset += len(name)
+        data_offset += len(blob)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, CODECS[codec], len(names), names_size, len(dictionary)))
+        f.write(b''.join(entries))
+        f.write(b''.join(encoded_names))
+        f.write(dictionary)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_file, output_file)
+    return {'codec': codec, 'books': len(names), 'raw_bytes': sum(len(d) for d in documents),
+            'compressed_bytes': sum(len(b) for b in blobs), 'dictionary_bytes': len(dictionary),
+            'bytes': os.path.getsize(output_file)}
+
+class BibleArchive:
+    """Reads single books out of an archive.
+
+    Opening reads only the header, index and dictionary; each book is then one seek, one read
+    and one decompression.
+
+    Args:
+        path (str): The path of a file written by build_archive.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, version, codec, count, names_size, dictionary_size = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a version {VERSION} Bible archive")
+        entries = [ENTRY.unpack(self._file.read(ENTRY.size)) for _ in range(count)]
+        names = self._file.read(names_size)
+        dictionary = self._file.read(dictionary_size)
+        self._entries = {names[offset:offset + length].decode('utf-8'): (data_offset, size, raw_size, crc)
+                         for offset, length, data_offset, size, raw_size, crc in entries}
+
+        self.codec = {number: name for name, number in CODECS.items()}[codec]
+        if self.codec == 'zstd':
+            if zstandard is None:
+                self._file.close()
+                raise RuntimeError(f"{path} is zstd-compressed, which needs the zstandard package")
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dictionary))
+        self._dictionary = dictionary
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def names(self):
+        """Returns the stored entries as "translation/Book" strings, in archive order."""
+        return list(self._entries)
+
+    def raw(self, translation, book):
+        """Returns the compact JSON of one book as UTF-8 bytes.
+
+        Args:
+            translation (str): A key of corpus.TRANSLATION_DIRS.
+            book (str): The book, by any name corpus.resolve_book accepts.
+
+        Raises:
+            KeyError: If the archive has no such book.
+            ValueError: If the stored data is corrupt.
+        """
+        name = f"{translation}/{corpus.resolve_book(book)}"
+        try:
+            data_offset, size, raw_size, crc = self._entries[name]
+        except KeyError:
+            raise KeyError(f"{self.path} has no {name}") from None
+        self._file.seek(data_offset)
+        blob = self._file.read(size)
+        if self.codec == 'zstd':
+            document = self._decompressor.decompress(blob, max_output_size=raw_size)
+        else:
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS, self._dictionary)
+            document = decompressor.decompress(blob) + decompressor.flush()
+        if len(document) != raw_size or zlib.crc32(document) != crc:
+            raise ValueError(f"{self.path}: {name} is corrupt")
+        return document
+
+    def book(self, translation, book):
+        """Returns one book as the dict stored in its JSON file."""
+        return json.loads(self.raw(translation, book))
+
+def bench(path, repeat=5):
+    """Compares the archive with the JSON directories: total size and time to load each book.
+
+    Returns:
+        dict: {'json': {...}, 'archive': {...}}, with bytes and the mean milliseconds to load a book.
+    """
+    results = {}
+    with BibleArchive(path) as archive:
+        names = [name.split('/', 1) for name in archive.names()]
+        json_bytes = sum(os.path.getsize(corpus.book_file(translation, book)) for translation, book in names)
+
+        def load_json():
+            for translation, book in names:
+                with open(corpus.book_file(translation, book), 'r', encoding='utf-8') as f:
+                    json.load(f)
+
+        def load_archive():
+            for translation, book in names:
+                archive.book(translation, book)
+
+        def decompress_archive():
+            for translation, book in names:
+                archive.raw(translation, book)
+
+        for key, func in (('json', load_json), ('archive', load_archive), ('archive_decompress_only', decompress_archive)):
+            best = min(_timed(func) for _ in range(repeat))
+            results[key] = {'ms_per_book': best * 1000 / len(names)}
+        results['json']['bytes'] = json_bytes
+        results['archive']['bytes'] = os.path.getsize(path)
+        results['archive']['codec'] = archive.codec
+    return results
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or read the compressed per-book archive.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Compress every book into one archive.")
+    build.add_argument('file', nargs='?', default=archive_file())
+    build.add_argument('--codec', choices=sorted(CODECS), help="Default: zstd if the zstandard package is installed.")
+    build.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    get = commands.add_parser('get', help="Print one book's JSON.")
+    get.add_argument('file')
+    get.add_argument('translation', choices=sorted(corpus.TRANSLATION_DIRS))
+    get.add_argument('book')
+    bench_command = commands.add_parser('bench', help="Compare size and load time with the JSON directories.")
+    bench_command.add_argument('file', nargs='?', default=archive_file())
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        stats = build_archive(args.file, args.translation, args.codec)
+        print(f"{args.file}: {stats['books']} books, {stats['raw_bytes']} bytes of compact JSON -> "
+              f"{stats['bytes']} bytes ({stats['codec']}, {stats['dictionary_bytes']} byte dictionary)")
+    elif args.command == 'get':
+        with BibleArchive(args.file) as archive:
+            sys.stdout.write(archive.raw(args.translation, args.book).decode('utf-8') + '\n')
+    else:
+        results = bench(args.file)
+        for key, result in results.items():
+            size = f"{result['bytes']:>10} bytes" if 'bytes' in result else " " * 16
+            print(f"{key:<24}{size}{result['ms_per_book']:>9.3f} ms/book")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Columnar in-memory corpus for analytics.
+
+A translation is held as a handful of flat integer columns and one UTF-8 text buffer instead of
+nested dicts and strings:
+
+    per verse    book index, chapter number, first and last verse number, word count,
+                 character count (array columns), text start offset into the buffer
+    per chapter  first verse id, book index, chapter number
+    per book     first chapter row
+
+Verse ids are the row numbers, which count verses in canonical order as in packed.py and
+search.py. Labels that are not just the verse number (merged Amharic ranges such as "3-4",
+unnumbered entries) are kept in a small dict. The KJV takes 4.6 MB this way against 13.3 MB as
+the nested dicts of load_book, the Amharic text 6.5 MB against 14.5 MB.
+
+Aggregations run over the columns: with NumPy installed they use numpy views of the same
+buffers, without it they use running totals and comprehensions over the arrays.
+
+    from columnar import ColumnarCorpus
+
+    kjv = ColumnarCorpus('kjv')
+    kjv.chapter_word_counts()[:3]        # [('Genesis', 1, 797), ...]
+    kjv.length_stats(kjv.book_ids('Psalms'))
+    kjv.find('living water')             # verse ids
+
+Usage:
+    python tools/columnar.py [--translation kjv amh]
+"""
+import argparse
+import statistics
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+import corpus
+from textnorm import token_counts
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ColumnarCorpus:
+    """One translation in columns.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+    """
+
+    # Column name -> array typecode
+    COLUMNS = {'book': 'B', 'chapter': 'H', 'first': 'H', 'last': 'H', 'words': 'H', 'chars': 'H'}
+
+    def __init__(self, translation):
+        self.translation = translation
+        self.books = corpus.book_names()
+        self._book_index = {book: i for i, book in enumerate(self.books)}
+        columns = {name: array(typecode) for name, typecode in self.COLUMNS.items()}
+        offsets = array('I', [0])
+        chapter_starts = array('I')
+        chapter_books = array('B')
+        chapter_numbers = array('H')
+        book_chapters = array('I', [0]) * (len(self.books) + 1)
+        labels = {}
+        text = bytearray()
+
+        verse_id = 0
+        for book, data in corpus.iter_books(translation):
+            book_index = self._book_index[book]
+            book_chapters[book_index] = len(chapter_starts)
+            columns['words'].extend(array('H', token_counts(translation, book)))
+            for chapter in data['chapters']:
+                chapter_starts.append(verse_id)
+                chapter_books.append(book_index)
+                chapter_numbers.append(chapter['chapter'])
+                for verse in chapter['verses']:
+                    numbers = corpus.verse_numbers(verse['verse']) or (0, 0)
+                    if verse['verse'] != str(numbers[0]):
+                        labels[verse_id] = verse['verse']
+                    encoded = verse['text'].encode('utf-8')
+                    columns['book'].append(book_index)
+                    columns['chapter'].append(chapter['chapter'])
+                    columns['first'].append(numbers[0])
+                    columns['last'].append(numbers[1])
+                    columns['chars'].append(len(verse['text']))
+                    text += encoded
+                    offsets.append(len(text))
+                    verse_id += 1
+            book_chapters[book_index + 1] = len(chapter_starts)
+        # Books missing from the translation get an empty chapter range
+        for i in range(1, len(book_chapters)):
+            book_chapters[i] = max(book_chapters[i], book_chapters[i - 1])
+        chapter_starts.append(verse_id)
+
+        self.columns = columns
+        self.offsets = offsets
+        self.chapter_starts = chapter_starts
+        self.chapter_books = chapter_books
+        self.chapter_numbers = chapter_numbers
+        self.book_chapters = book_chapters
+        self.labels = labels
+        self.text_buffer = bytes(text)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        """Memory held by the columns and the text buffer, in bytes."""
+        arrays = list(self.columns.values()) + [self.offsets, self.chapter_starts, self.chapter_books,
+                                                self.chapter_numbers, self.book_chapters]
+        return (sum(a.itemsize * len(a) for a in arrays) + len(self.text_buffer)
+                + sum(sys.getsizeof(label) for label in self.labels.values()) + sys.getsizeof(self.labels))
+
+    def column(self, name):
+        """Returns a column as a NumPy array sharing its memory, or the array itself without NumPy."""
+        values = self.offsets if name == 'offsets' else self.columns[name]
+        if numpy is None:
+            return values
+        return numpy.frombuffer(values, dtype=numpy.dtype(values.typecode))
+
+    def text(self, verse_id):
+        """Returns the text of a verse."""
+        return self.text_buffer[self.offsets[verse_id]:self.offsets[verse_id + 1]].decode('utf-8')
+
+    def label(self, verse_id):
+        """Returns the verse label, e.g. "16" or "3-4"."""
+        label = self.labels.get(verse_id)
+        return str(self.columns['first'][verse_id]) if label is None else label
+
+    def verse(self, verse_id):
+        """Returns (book, chapter, label, text) of a verse."""
+        return (self.books[self.columns['book'][verse_id]], self.columns['chapter'][verse_id],
+                self.label(verse_id), self.text(verse_id))
+
+    def book_ids(self, book):
+        """Returns the range of verse ids of a book.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+        """
+        index = self._book_index[corpus.resolve_book(book)]
+        return range(self.chapter_starts[self.book_chapters[index]], self.chapter_starts[self.book_chapters[index + 1]])
+
+    def chapter_ids(self, book, chapter):
+        """Returns the range of verse ids of a chapter (its first occurrence, if repeated).
+
+        Raises:
+            KeyError: If the book has no such chapter.
+        """
+        index = self._book_index[corpus.resolve_book(book)]
+        for row in range(self.book_chapters[index], self.book_chapters[index + 1]):
+            if self.chapter_numbers[row] == int(chapter):
+                return range(self.chapter_starts[row], self.chapter_starts[row + 1])
+        raise KeyError(f"{book} has no chapter {chapter}")
+
+    def _chapter_sums(self, name):
+        # Differences of the running total at the chapter boundaries, so empty chapters sum to 0
+        if numpy is not None:
+            totals = numpy.concatenate(([0], numpy.cumsum(self.column(name), dtype=numpy.int64)))
+            starts = numpy.frombuffer(self.chapter_starts, dtype=numpy.uint32)
+            return (totals[starts[1:]] - totals[starts[:-1]]).tolist()
+        totals = array('Q', [0])
+        totals.extend(accumulate(self.columns[name]))
+        starts = self.chapter_starts
+        return [totals[starts[i + 1]] - totals[starts[i]] for i in range(len(starts) - 1)]
+
+    def chapter_word_counts(self):
+        """Returns (book, chapter, word count) for every chapter in canonical order."""
+        return [(self.books[book], chapter, words)
+                for book, chapter, words in zip(self.chapter_books, self.chapter_numbers, self._chapter_sums('words'))]
+
+    def book_word_counts(self):
+        """Returns {book: word count} for the books of the translation."""
+        counts = {}
+        for book, words in zip(self.chapter_books, self._chapter_sums('words')):
+            counts[self.books[book]] = counts.get(self.books[book], 0) + words
+        return counts
+
+    def select(self, books=None, min_words=None, max_words=None):
+        """Returns the verse ids matching every given filter.
+
+        Args:
+            books (list): Keep only these books, by any name corpus.resolve_book accepts.
+            min_words (int): Keep verses with at least this many words.
+            max_words (int): Keep verses with at most this many words.
+
+        Returns:
+            list: Verse ids in canonical order, with or without NumPy.
+        """
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            if books is not None:
+                wanted = numpy.zeros(len(self.books), dtype=bool)
+                wanted[[self._book_index[corpus.resolve_book(book)] for book in books]] = True
+                mask &= wanted[self.column('book')]
+            words = self.column('words')
+            if min_words is not None:
+                mask &= words >= min_words
+            if max_words is not None:
+                mask &= words <= max_words
+            return numpy.flatnonzero(mask).tolist()
+        ids = range(len(self))
+        if books is not None:
+            ids = [i for book in sorted(self._book_index[corpus.resolve_book(b)] for b in books)
+                   for i in self.book_ids(self.books[book])]
+        words = self.columns['words']
+        lo = 0 if min_words is None else min_words
+        hi = float('inf') if max_words is None else max_words
+        return [i for i in ids if lo <= words[i] <= hi]
+
+    def length_stats(self, ids=None, column='chars'):
+        """Summarizes verse lengths.
+
+        Args:
+            ids (iterable): Verse ids to include, all verses by default.
+            column (str): 'chars' or 'words'.
+
+        Returns:
+            dict: count, min, max, mean, median and stdev (population).
+        """
+        values = self.columns[column]
+        if ids is None:
+            selected = values
+        elif isinstance(ids, range) and ids.step == 1:
+            selected = values[ids.start:ids.stop]
+        else:
+            selected = [values[i] for i in ids]
+        if not len(selected):
+            return {'count': 0}
+        if numpy is not None:
+            data = numpy.asarray(selected, dtype=numpy.float64)
+            return {'count': int(data.size), 'min': int(data.min()), 'max': int(data.max()),
+                    'mean': float(data.mean()), 'median': float(numpy.median(data)), 'stdev': float(data.std())}
+        return {'count': len(selected), 'min': min(selected), 'max': max(selected),
+                'mean': statistics.fmean(selected), 'median': statistics.median(selected),
+                'stdev': statistics.pstdev(selected)}
+
+    def find(self, substring):
+        """Returns the ids of the verses containing a substring (case-sensitive).
+
+        The text buffer is searched as a whole with bytes.find, and each hit is mapped back to
+        its verse by binary search over the offsets.
+
+        Raises:
+            ValueError: If the substring is empty.
+        """
+        if not substring:
+            raise ValueError("Cannot search for an empty string")
+        needle = substring.encode('utf-8')
+        ids = []
+        position = self.text_buffer.find(needle)
+        while position != -1:
+            verse_id = bisect_right(self.offsets, position) - 1
+            end = self.offsets[verse_id + 1]
+            # A match running into the next verse is not a hit, and a later match in the same
+            # verse would run over too; either way carry on from the next verse
+            if position + len(needle) <= end:
+                ids.append(verse_id)
+            position = self.text_buffer.find(needle, end)
+        return ids
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load translations into columns and print summary statistics.")
+    parser.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    args = parser.parse_args(argv)
+    for translation in args.translation:
+        columns = ColumnarCorpus(translation)
+        words = columns.length_stats(column='words')
+        chars = columns.length_stats()
+        print(f"{translation}: {len(columns)} verses, {len(columns.chapter_numbers)} chapters, "
+              f"{columns.nbytes / 1e6:.1f} MB in memory")
+        print(f"  words per verse: mean {words['mean']:.1f}, median {words['median']:g}, max {words['max']}")
+        print(f"  characters per verse: mean {chars['mean']:.1f}, median {chars['median']:g}, max {chars['max']}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""Concordance and bigram tables, built once and memory-mapped for lookups.
+
+For each translation the build step writes one file holding, for every word, the sorted ids of
+the verses containing it and its number of occurrences, and the count of every bigram (two
+consecutive words within a verse). Words are the tokens of textnorm.tokenize, read from the
+per-book token caches, and verse ids count the verses in canonical order, as in search.py and
+packed.py.
+
+The build is a map-reduce over books: worker processes count each book on its own (verse
+numbers local to the book), and the parent merges the results in canonical order, shifting each
+book's verse numbers by the number of verses before it, so the merged verse lists come out
+sorted without a sort.
+
+File layout (integers are little-endian uint32):
+
+    header      magic b'BIBLCNC1', version, word, verse, posting and bigram counts,
+                words, bigrams and labels sizes
+    word table  per word, sorted: key offset, key length, first posting, verse count, occurrences
+    bigram table per bigram, sorted: key offset, key length, count
+    verses      per verse: book index, chapter
+    postings    verse ids, grouped by word and sorted
+    words       the word keys, UTF-8
+    bigrams     the bigram keys "first second", UTF-8
+    labels      the verse labels, UTF-8, separated by newlines
+
+The tables are fixed-width and sorted by key, so a lookup is a binary search over the mapping
+(reading only the keys it compares) followed by a slice of the postings.
+
+    from concordance import open_concordance
+
+    kjv = open_concordance('kjv')
+    kjv.verses('jerusalem')          # uint32 memoryview of verse ids
+    kjv.following('living', 3)       # [('god', 30), ('creature', 14), ('creatures', 9)]
+
+Usage:
+    python tools/concordance.py build [--translation kjv amh] [--out build/] [--jobs N]
+    python tools/concordance.py verses kjv jerusalem
+    python tools/concordance.py following kjv living
+    python tools/concordance.py top amh [-n 20]
+"""
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import corpus
+from textnorm import book_tokens, tokenize
+
+MAGIC = b'BIBLCNC1'
+VERSION = 3
+
+HEADER = struct.Struct('<8s8I')
+WORD_FIELDS = 5
+BIGRAM_FIELDS = 3
+VERSE_FIELDS = 2
+
+def concordance_file(translation, out_dir=corpus.BUILD_DIR):
+    """Returns the default path of a translation's concordance file."""
+    return os.path.join(out_dir, f"{translation}.conc")
+
+def count_book(translation, book):
+    """Map step: counts the words and bigrams of one book.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        book (str): The English book name.
+
+    Returns:
+        dict: 'references' [(chapter, label)] per verse; 'verses' {word: array of verse numbers
+        within the book}; 'occurrences' and 'bigrams' Counters.
+    """
+    references = []
+    verses = {}
+    occurrences = Counter()
+    bigrams = Counter()
+    verse_tokens = iter(book_tokens(translation, book))
+    for chapter in corpus.load_book(translation, book)['chapters']:
+        for verse in chapter['verses']:
+            number = len(references)
+            references.append((chapter['chapter'], verse['verse']))
+            tokens = next(verse_tokens)
+            occurrences.update(tokens)
+            bigrams.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+            for token in dict.fromkeys(tokens):
+                word_verses = verses.get(token)
+                if word_verses is None:
+                    word_verses = verses[token] = array('I')
+                word_verses.append(number)
+    return {'references': references, 'verses': verses, 'occurrences': occurrences, 'bigrams': bigrams}
+
+def build_concordance(translation, output_file, jobs=None):
+    """Builds the concordance of a translation and writes it to disk.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        output_file (str): The path of the file to write.
+        jobs (int): Worker processes for the map step; None or 0 for one per CPU core, 1 to
+            count in this process.
+
+    Returns:
+        dict: Counts of words, verses, postings and bigrams written.
+    """
+    books = [book for book in corpus.book_names() if os.path.exists(corpus.book_file(translation, book))]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            counted = executor.map(count_book, [translation] * len(books), books, chunksize=4)
+            results = list(counted)
+    else:
+        results = [count_book(translation, book) for book in books]
+
+    # Reduce: books arrive in canonical order, so appending keeps every verse list sorted
+    book_index = {book: i for i, book in enumerate(corpus.book_names())}
+    verses = {}
+    occurrences = Counter()
+    bigrams = Counter()
+    verse_table = array('I')
+    labels = []
+    for book, result in zip(books, results):
+        offset = len(labels)
+        for chapter, label in result['references']:
+            verse_table.extend((book_index[book], chapter))
+            labels.append(label)
+        for word, book_verses in result['verses'].items():
+            word_verses = verses.get(word)
+            if word_verses is None:
+                word_verses = verses[word] = array('I')
+            word_verses.extend(number + offset for number in book_verses)
+        occurrences.update(result['occurrences'])
+        bigrams.update(result['bigrams'])
+
+    word_table = array('I')
+    postings = array('I')
+    words_blob = bytearray()
+    for word in sorted(verses):
+        key = word.encode('utf-8')
+        word_table.extend((len(words_blob), len(key), len(postings), len(verses[word]), occurrences[word]))
+        words_blob += key
+        postings.extend(verses[word])
+    bigram_table = array('I')
+    bigrams_blob = bytearray()
+    for bigram in sorted(bigrams):
+        key = bigram.encode('utf-8')
+        bigram_table.extend((len(bigrams_blob), len(key), bigrams[bigram]))
+        bigrams_blob += key
+    labels_blob = '\n'.join(labels).encode('utf-8')
+    if sys.byteorder != 'little':
+        for table in (word_table, bigram_table, verse_table, postings):
+            table.byteswap()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(verses), len(labels), len(postings), len(bigrams),
+                            len(words_blob), len(bigrams_blob), len(labels_blob)))
+        for table in (word_table, bigram_table, verse_table, postings):
+            f.write(table.tobytes())
+        f.write(words_blob)
+        f.write(bigrams_blob)
+        f.write(labels_blob)
+    os.replace(tmp_file, output_file)
+    return {'words': len(verses), 'verses': len(labels), 'postings': len(postings), 'bigrams': len(bigrams),
+            'bytes': os.path.getsize(output_file)}
+
+class Concordance:
+    """A concordance file, mapped into memory.
+
+    Args:
+        path (str): The path of a file written by build_concordance.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, word_count, verse_count, posting_count, bigram_count,
+         words_size, bigrams_size, labels_size) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} concordance")
+        self._word_count = word_count
+        self.verse_count = verse_count
+        self._bigram_count = bigram_count
+
+        # The header and every table are whole uint32s, so all of them can be cast in place
+        view = memoryview(self._mm)
+        at = HEADER.size
+        tables = []
+        for size in (word_count * WORD_FIELDS, bigram_count * BIGRAM_FIELDS, verse_count * VERSE_FIELDS, posting_count):
+            table = view[at:at + size * 4].cast('I')
+            if sys.byteorder != 'little':
+                swapped = array('I', table)
+                swapped.byteswap()
+                table.release()
+                table = memoryview(swapped)
+            tables.append(table)
+            at += size * 4
+        view.release()
+        self._words, self._bigrams, self._verses, self._postings = tables
+        self._words_at = at
+        self._bigrams_at = self._words_at + words_size
+        self._labels_at = self._bigrams_at + bigrams_size
+        self._labels_size = labels_size
+        self._labels = None
+
+    def close(self):
+        for table in (self._words, self._bigrams, self._verses, self._postings):
+            table.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _lower_bound(self, table, fields, count, blob_at, key):
+        # Index of the first entry whose key is >= key
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, length = table[mid * fields], table[mid * fields + 1]
+            if self._mm[blob_at + offset:blob_at + offset + length] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _key(self, table, fields, blob_at, index):
+        offset, length = table[index * fields], table[index * fields + 1]
+        return self._mm[blob_at + offset:blob_at + offset + length].decode('utf-8')
+
+    def _word(self, word):
+        # The word table entry of a word as (first posting, verse count, occurrences), or None
+        tokens = tokenize(word)
+        if len(tokens) != 1:
+            return None
+        key = tokens[0].encode('utf-8')
+        index = self._lower_bound(self._words, WORD_FIELDS, self._word_count, self._words_at, key)
+        if index == self._word_count or self._key(self._words, WORD_FIELDS, self._words_at, index) != tokens[0]:
+            return None
+        row = index * WORD_FIELDS
+        return self._words[row + 2], self._words[row + 3], self._words[row + 4]
+
+    def verses(self, word):
+        """Returns the ids of the verses containing a word.
+
+        Args:
+            word (str): A word; it is tokenized like verse text, so case does not matter.
+
+        Returns:
+            memoryview: Sorted uint32 verse ids, a view into the file; empty if the word does not occur.
+        """
+        entry = self._word(word)
+        if entry is None:
+            return self._postings[0:0]
+        first, count, _ = entry
+        return self._postings[first:first + count]
+
+    def count(self, word):
+        """Returns the number of occurrences of a word in the translation."""
+        entry = self._word(word)
+        return 0 if entry is None else entry[2]
+
+    def bigram_count(self, first, second):
+        """Returns how often two words occur next to each other, in this order, within a verse."""
+        tokens = tokenize(first) + tokenize(second)
+        if len(tokens) != 2:
+            return 0
+        key = ' '.join(tokens)
+        index = self._lower_bound(self._bigrams, BIGRAM_FIELDS, self._bigram_count, self._bigrams_at, key.encode('utf-8'))
+        if index == self._bigram_count or self._key(self._bigrams, BIGRAM_FIELDS, self._bigrams_at, index) != key:
+            return 0
+        return self._bigrams[index * BIGRAM_FIELDS + 2]
+
+    def following(self, word, limit=None):
+        """Returns the words that follow a word, most frequent first.
+
+        Args:
+            word (str): A word.
+            limit (int): Return at most this many.
+
+        Returns:
+            list: (next word, count) tuples.
+        """
+        tokens = tokenize(word)
+        if len(tokens) != 1:
+            return []
+        # The bigrams "word ..." are contiguous in the sorted table: from "word " up to "word!"
+        prefix = tokens[0].encode('utf-8')
+        start = self._lower_bound(self._bigrams, BIGRAM_FIELDS, self._bigram_count, self._bigrams_at, prefix + b' ')
+        stop = self._lower_bound(self._bigrams, BIGRAM_FIELDS, self._bigram_count, self._bigrams_at, prefix + b'!')
+        pairs = [(self._key(self._bigrams, BIGRAM_FIELDS, self._bigrams_at, i).split(' ', 1)[1],
+                  self._bigrams[i * BIGRAM_FIELDS + 2]) for i in range(start, stop)]
+        pairs.sort(key=lambda pair: -pair[1])
+        return pairs[:limit]
+
+    def most_common(self, n=20):
+        """Returns the n most frequent words as (word, occurrences) tuples."""
+        top = heapq.nlargest(n, range(self._word_count), key=lambda i: self._words[i * WORD_FIELDS + 4])
+        return [(self._key(self._words, WORD_FIELDS, self._words_at, i), self._words[i * WORD_FIELDS + 4]) for i in top]
+
+    def reference(self, verse_id):
+        """Returns (book, chapter, verse label) for a verse id."""
+        if self._labels is None:
+            self._labels = self._mm[self._labels_at:self._labels_at + self._labels_size].decode('utf-8').split('\n')
+        book_index, chapter = self._verses[verse_id * VERSE_FIELDS:verse_id * VERSE_FIELDS + 2]
+        return corpus.book_names()[book_index], chapter, self._labels[verse_id]
+
+_open_concordances = {}
+
+def open_concordance(translation, out_dir=corpus.BUILD_DIR):
+    """Returns the concordance of a translation, opening it on first use."""
+    path = concordance_file(translation, out_dir)
+    if path not in _open_concordances:
+        _open_concordances[path] = Concordance(path)
+    return _open_concordances[path]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the concordance and bigram tables.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Count the words and bigrams of each translation.")
+    build.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS),
+                       default=sorted(corpus.TRANSLATION_DIRS))
+    build.add_argument('--out', default=corpus.BUILD_DIR, help="Output directory (default: build/).")
+    build.add_argument('--jobs', '-j', type=int, default=0, help="Worker processes (default: one per CPU core).")
+    for name, help_text in (('verses', "Print the verses containing a word."),
+                            ('following', "Print the words following a word, most frequent first."),
+                            ('top', "Print the most frequent words.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('translation', choices=sorted(corpus.TRANSLATION_DIRS))
+        if name != 'top':
+            command.add_argument('word')
+        command.add_argument('--limit', '-n', type=int, default=20, help="Maximum number of lines to print (default: 20).")
+        command.add_argument('--index-dir', default=corpus.BUILD_DIR, help="Directory holding the tables (default: build/).")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for translation in args.translation:
+            output_file = concordance_file(translation, args.out)
+            stats = build_concordance(translation, output_file, args.jobs)
+            print(f"{output_file}: {stats['words']} words, {stats['verses']} verses, {stats['postings']} postings, "
+                  f"{stats['bigrams']} bigrams, {stats['bytes']} bytes")
+        return
+
+    concordance = open_concordance(args.translation, args.index_dir)
+    if args.command == 'verses':
+        verse_ids = concordance.verses(args.word)
+        print(f"{len(verse_ids)} verses, {concordance.count(args.word)} occurrences")
+        for verse_id in verse_ids[:args.limit]:
+            book, chapter, label = concordance.reference(verse_id)
+            print(f"{book} {chapter}:{label}")
+    elif args.command == 'following':
+        for word, count in concordance.following(args.word, args.limit):
+            print(f"{count:>7}  {word}")
+    else:
+        for word, count in concordance.most_common(args.limit):
+            print(f"{count:>7}  {word}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Shared access to the JSON output of both translations.
+
+The KJV and the Amharic 1962 JSON differ in file naming (Ruth.json vs rut.json) and in the type
+of the chapter number (string vs int). The helpers here hide that: books are identified by their
+English name in canonical order (the order of the KJV Books.json), and chapters are always ints.
+"""
+import ast
+import gzip
+import io
+import json
+import os
+import re
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directory holding the per-book JSON files of each translation
+TRANSLATION_DIRS = {
+    'kjv': os.path.join(ROOT, 'eng', 'King James Version', 'json'),
+    'amh': os.path.join(ROOT, 'amh', 'Amharic Bible 1962', 'json'),
+}
+
+PARSE_BIBLE = os.path.join(ROOT, 'amh', 'Amharic Bible 1962', 'parse_bible.py')
+
+# Default output directory for the files built by the tools
+BUILD_DIR = os.path.join(ROOT, 'build')
+
+VERSE_NUMBERS_RE = re.compile(r'\d+(?:-\d+)*')
+
+@lru_cache(maxsize=None)
+def book_mappings():
+    """Reads BOOK_MAPPINGS from parse_bible.py.
+
+    The literal is evaluated from the source rather than imported, so the tools do not need
+    the parser's dependencies.
+
+    Returns:
+        dict: Maps book abbreviations (e.g., "rut") to (English Name, Amharic Name).
+    """
+    with open(PARSE_BIBLE, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), PARSE_BIBLE)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'BOOK_MAPPINGS' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"BOOK_MAPPINGS not found in {PARSE_BIBLE}")
+
+@lru_cache(maxsize=None)
+def book_names():
+    """Returns the English names of the 66 books in canonical order, from the KJV Books.json."""
+    with open(os.path.join(TRANSLATION_DIRS['kjv'], 'Books.json'), 'r', encoding='utf-8') as f:
+        return tuple(json.load(f))
+
+@lru_cache(maxsize=None)
+def book_abbreviations():
+    """Maps English book names to the abbreviations used for the Amharic file names."""
+    return {english: abbr for abbr, (english, _) in book_mappings().items()}
+
+@lru_cache(maxsize=None)
+def amharic_names():
+    """Maps English book names to their Amharic names."""
+    return {english: amharic for english, amharic in book_mappings().values()}
+
+def book_file(translation, book):
+    """Returns the path of a book's JSON file.
+
+    Args:
+        translation (str): A key of TRANSLATION_DIRS.
+        book (str): The English book name (e.g., "Song of Solomon").
+
+    Returns:
+        str: The path, e.g. .../json/SongofSolomon.json or .../json/sos.json.
+    """
+    if translation == 'amh':
+        file_name = book_abbreviations()[book]
+    else:
+        file_name = book.replace(' ', '')
+    return os.path.join(TRANSLATION_DIRS[translation], f"{file_name}.json")
+
+def load_book(translation, book):
+    """Loads one book, with the chapter numbers converted to ints.
+
+    Args:
+        translation (str): A key of TRANSLATION_DIRS.
+        book (str): The English book name.
+
+    Returns:
+        dict: {'book', 'book_amharic', 'chapters': [{'chapter': int, 'verses': [{'verse', 'text'}]}]}
+    """
+    with open(book_file(translation, book), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for chapter in data['chapters']:
+        chapter['chapter'] = int(chapter['chapter'])
+    data['book'] = book
+    data.setdefault('book_amharic', amharic_names().get(book, ""))
+    return data
+
+def iter_books(translation):
+    """Yields (book, data) for every book of a translation in canonical order, skipping missing files."""
+    for book in book_names():
+        if os.path.exists(book_file(translation, book)):
+            yield book, load_book(translation, book)
+
+def iter_verses(translation):
+    """Yields (book, chapter, verse, text) for every verse of a translation, in canonical order."""
+    for book, data in iter_books(translation):
+        for chapter in data['chapters']:
+            for verse in chapter['verses']:
+                yield book, chapter['chapter'], verse['verse'], verse['text']
+
+def verse_numbers(label):
+    """Parses a verse label into the range of verse numbers it covers.
+
+    Args:
+        label (str): The 'verse' value, e.g. "3" or the merged range "3-4".
+
+    Returns:
+        tuple: (first, last) verse numbers, or None if the label is not numeric (the Amharic
+        text has some unnumbered entries such as psalm titles).
+    """
+    if not VERSE_NUMBERS_RE.fullmatch(label):
+        return None
+    numbers = label.split('-')
+    return int(numbers[0]), int(numbers[-1])
+
+@lru_cache(maxsize=None)
+def _book_keys():
+    keys = {}
+    for english, abbr in book_abbreviations().items():
+        keys[abbr] = english
+    for english in book_names():
+        keys[english.lower()] = english
+        keys[english.replace(' ', '').lower()] = english
+    for english, amharic in amharic_names().items():
+        keys[amharic] = english
+    return keys
+
+def resolve_book(name):
+    """Resolves a book given by English name, file name, abbreviation or Amharic name.
+
+    Args:
+        name (str): E.g. "Song of Solomon", "songofsolomon", "sos" or "መኃልየ መኃልይ ዘሰሎሞን".
+
+    Returns:
+        str: The canonical English name.
+
+    Raises:
+        KeyError: If the name is not a known book.
+    """
+    key = name.strip()
+    english = _book_keys().get(key) or _book_keys().get(key.lower())
+    if english is None:
+        raise KeyError(f"Unknown book: {name}")
+    return english
+
+def open_export(output_file):
+    """Opens an export file for writing text, compressed according to its extension.
+
+    Shared by tools/export_ndjson.py and `parse_bible.py --ndjson`; missing parent directories
+    are created.
+
+    Args:
+        output_file (str): The path; ".gz" is written with gzip and ".zst" with zstandard.
+
+    Returns:
+        file: A text file object.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    if output_file.endswith('.gz'):
+        return gzip.open(output_file, 'wt', encoding='utf-8')
+    if output_file.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("Writing .zst files needs the zstandard package (pip install zstandard)")
+        raw = open(output_file, 'wb')
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw, closefd=True), encoding='utf-8')
+    return open(output_file, 'w', encoding='utf-8')
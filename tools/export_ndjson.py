@@ -0,0 +1,53 @@
+"""Exports both translations as JSON Lines, one record per verse.
+
+Records have the same fields as `parse_bible.py --ndjson`: translation, book, book_amharic,
+chapter, verse and text. Books are read and written one at a time, so memory use is bounded by
+the largest book, not the corpus.
+
+Usage:
+    python tools/export_ndjson.py build/bible.jsonl.gz [--translation kjv amh]
+"""
+import argparse
+import json
+import sys
+
+import corpus
+
+def export_ndjson(output_file, translations=('kjv', 'amh')):
+    """Writes every verse of the given translations to a JSON Lines file.
+
+    Args:
+        output_file (str): The path of the export; see corpus.open_export for compression.
+        translations (tuple): Keys of corpus.TRANSLATION_DIRS, exported in this order.
+
+    Returns:
+        int: The number of verses written.
+    """
+    verse_count = 0
+    with corpus.open_export(output_file) as out:
+        for translation in translations:
+            for book, data in corpus.iter_books(translation):
+                for chapter in data['chapters']:
+                    for verse in chapter['verses']:
+                        out.write(json.dumps({
+                            'translation': translation,
+                            'book': book,
+                            'book_amharic': data['book_amharic'],
+                            'chapter': chapter['chapter'],
+                            'verse': verse['verse'],
+                            'text': verse['text']
+                        }, ensure_ascii=False))
+                        out.write('\n')
+                        verse_count += 1
+    return verse_count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the corpus as JSON Lines.")
+    parser.add_argument('output', help="Output file, compressed if it ends in .gz or .zst.")
+    parser.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    args = parser.parse_args(argv)
+    verse_count = export_ndjson(args.output, args.translation)
+    print(f"{args.output}: {verse_count} verses")
+
+if __name__ == "__main__":
+    sys.exit(main())
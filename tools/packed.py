@@ -0,0 +1,315 @@
+"""Packed binary corpus: one file per translation with O(1) verse lookup through mmap.
+
+File layout (all integers are little-endian uint32):
+
+    header    magic b'BIBLPACK', version, book, chapter, verse and slot counts, blob size
+    books     per book:    name offset/length, Amharic name offset/length, first chapter, chapter count
+    chapters  per chapter: chapter number, first verse, verse count, first slot, slot count
+    verses    per verse:   first number, last number, label offset/length, text offset/length
+    slots     per chapter, verse number n -> verse row at first slot + n (NO_VERSE if absent)
+    blob      UTF-8 text; the texts of a chapter are contiguous, followed by labels and names
+
+Books are stored in canonical order whether or not a translation has them. Verse labels are
+kept as strings, since the Amharic text has merged ranges ("3-4") and unnumbered entries; the
+slot table maps every number of a range to the same verse row.
+
+Usage:
+    python tools/packed.py build [--translation kjv amh] [--out build/]
+    python tools/packed.py get build/kjv.bibpack Genesis 1 1-3
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+import corpus
+
+MAGIC = b'BIBLPACK'
+VERSION = 1
+
+HEADER = struct.Struct('<8s6I')
+BOOK = struct.Struct('<6I')
+CHAPTER = struct.Struct('<5I')
+VERSE = struct.Struct('<6I')
+SLOT = struct.Struct('<I')
+
+NO_VERSE = 0xFFFFFFFF
+
+def packed_file(translation, out_dir=corpus.BUILD_DIR):
+    """Returns the default path of a translation's packed file."""
+    return os.path.join(out_dir, f"{translation}.bibpack")
+
+def write_packed(translation, output_file):
+    """Packs every book of a translation into a single file.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        output_file (str): The path of the packed file to write.
+
+    Returns:
+        dict: Counts of books, chapters and verses written, and the file size.
+    """
+    books = []
+    chapters = []
+    verses = []
+    slots = []
+    texts = bytearray()
+    strings = []  # Verse labels, placed after the texts
+
+    loaded = dict(corpus.iter_books(translation))
+    for book in corpus.book_names():
+        data = loaded.get(book, {'chapters': []})
+        book_amharic = data.get('book_amharic') or corpus.amharic_names().get(book, "")
+        books.append((book.encode('utf-8'), book_amharic.encode('utf-8'), len(chapters), len(data['chapters'])))
+        for chapter in data['chapters']:
+            numbered = [corpus.verse_numbers(v['verse']) for v in chapter['verses']]
+            slot_count = max((last for _, last in filter(None, numbered)), default=0) + 1
+            first_slot = len(slots)
+            slots.extend([NO_VERSE] * slot_count)
+            chapters.append((chapter['chapter'], len(verses), len(chapter['verses']), first_slot, slot_count))
+            for verse, numbers in zip(chapter['verses'], numbered):
+                first, last = numbers or (0, 0)
+                for n in range(first, last + 1) if numbers else ():
+                    if slots[first_slot + n] == NO_VERSE:
+                        slots[first_slot + n] = len(verses)
+                text = verse['text'].encode('utf-8')
+                label = verse['verse'].encode('utf-8')
+                verses.append([first, last, len(strings), label, len(texts), len(text)])
+                strings.append(label)
+                texts += text
+
+    # Lay the labels and book names out after the texts, then fix up their offsets
+    blob = texts
+    string_offsets = []
+    for value in strings:
+        string_offsets.append(len(blob))
+        blob += value
+    for verse in verses:
+        label = verse[3]
+        verse[2], verse[3] = string_offsets[verse[2]], len(label)
+    book_rows = []
+    for name, book_amharic, first_chapter, chapter_count in books:
+        book_rows.append((len(blob), len(name), len(blob) + len(name), len(book_amharic), first_chapter, chapter_count))
+        blob += name + book_amharic
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(book_rows), len(chapters), len(verses), len(slots), len(blob)))
+        f.write(b''.join(BOOK.pack(*book) for book in book_rows))
+        f.write(b''.join(CHAPTER.pack(*chapter) for chapter in chapters))
+        f.write(b''.join(VERSE.pack(*verse) for verse in verses))
+        f.write(struct.pack(f'<{len(slots)}I', *slots))
+        f.write(blob)
+    os.replace(tmp_file, output_file)
+    return {'books': len(loaded), 'chapters': len(chapters), 'verses': len(verses),
+            'bytes': os.path.getsize(output_file)}
+
+class PackedBible:
+    """Read-only view of a packed file, mapped into memory.
+
+    Lookups index straight into the mapped tables and decode only the requested text, so opening
+    the file costs nothing beyond the mmap and processes opening the same file share its pages.
+
+    Args:
+        path (str): The path of a file written by write_packed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, book_count, chapter_count, verse_count, slot_count, blob_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} packed Bible file")
+        self._books_at = HEADER.size
+        self._chapters_at = self._books_at + book_count * BOOK.size
+        self._verses_at = self._chapters_at + chapter_count * CHAPTER.size
+        self._slots_at = self._verses_at + verse_count * VERSE.size
+        self._blob_at = self._slots_at + slot_count * SLOT.size
+        self.book_count = book_count
+        self.verse_count = verse_count
+        self._book_index = {book: i for i, book in enumerate(corpus.book_names())}
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _string(self, offset, length):
+        start = self._blob_at + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def _book(self, book):
+        try:
+            index = self._book_index[corpus.resolve_book(book)]
+        except KeyError:
+            raise KeyError(f"Unknown book: {book}") from None
+        return BOOK.unpack_from(self._mm, self._books_at + index * BOOK.size)
+
+    def _chapter(self, book, chapter):
+        _, _, _, _, first_chapter, chapter_count = self._book(book)
+        chapter = int(chapter)
+        # Chapters are normally numbered from 1 without gaps, so try the direct position first
+        candidates = [chapter - 1] if 0 < chapter <= chapter_count else []
+        candidates += range(chapter_count)
+        for i in candidates:
+            row = CHAPTER.unpack_from(self._mm, self._chapters_at + (first_chapter + i) * CHAPTER.size)
+            if row[0] == chapter:
+                return row
+        raise KeyError(f"{book} has no chapter {chapter}")
+
+    def _verse_row(self, index):
+        first, last, label_offset, label_length, text_offset, text_length = VERSE.unpack_from(
+            self._mm, self._verses_at + index * VERSE.size)
+        return label_offset, label_length, text_offset, text_length
+
+    def _slot(self, chapter_row, number):
+        _, _, _, first_slot, slot_count = chapter_row
+        if not 0 < number < slot_count:
+            return NO_VERSE
+        return SLOT.unpack_from(self._mm, self._slots_at + (first_slot + number) * SLOT.size)[0]
+
+    def book_names(self, book):
+        """Returns (English name, Amharic name) of a book."""
+        name_offset, name_length, amharic_offset, amharic_length, _, _ = self._book(book)
+        return self._string(name_offset, name_length), self._string(amharic_offset, amharic_length)
+
+    def chapters(self, book):
+        """Returns the chapter numbers of a book, in file order."""
+        _, _, _, _, first_chapter, chapter_count = self._book(book)
+        return [CHAPTER.unpack_from(self._mm, self._chapters_at + (first_chapter + i) * CHAPTER.size)[0]
+                for i in range(chapter_count)]
+
+    def verse_id(self, book, chapter, verse):
+        """Returns the id of a verse: its row number, which counts verses in canonical order.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+            chapter (int): The chapter number.
+            verse (int or str): A verse number, or a verse label such as "3-4".
+
+        Returns:
+            int: The verse id; for a number inside a merged range, the id of the whole range.
+
+        Raises:
+            KeyError: If the book, chapter or verse does not exist.
+        """
+        chapter_row = self._chapter(book, chapter)
+        numbers = corpus.verse_numbers(str(verse))
+        index = self._slot(chapter_row, numbers[0]) if numbers else NO_VERSE
+        if index == NO_VERSE:
+            # Unnumbered labels are looked up by name
+            _, first_verse, verse_count, _, _ = chapter_row
+            for index in range(first_verse, first_verse + verse_count):
+                label_offset, label_length, _, _ = self._verse_row(index)
+                if self._string(label_offset, label_length) == str(verse):
+                    return index
+            raise KeyError(f"{book} {chapter} has no verse {verse}")
+        return index
+
+    def chapter_ids(self, book, chapter):
+        """Returns the range of verse ids of a chapter.
+
+        Raises:
+            KeyError: If the book or chapter does not exist.
+        """
+        _, first_verse, verse_count, _, _ = self._chapter(book, chapter)
+        return range(first_verse, first_verse + verse_count)
+
+    def verse_by_id(self, verse_id):
+        """Returns (label, text) of the verse with the given id."""
+        if not 0 <= verse_id < self.verse_count:
+            raise KeyError(f"No verse with id {verse_id}")
+        label_offset, label_length, text_offset, text_length = self._verse_row(verse_id)
+        return self._string(label_offset, label_length), self._string(text_offset, text_length)
+
+    def verse(self, book, chapter, verse):
+        """Returns the text of one verse.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+            chapter (int): The chapter number.
+            verse (int or str): A verse number, or a verse label such as "3-4".
+
+        Returns:
+            str: The verse text; for a number inside a merged range, the text of the whole range.
+
+        Raises:
+            KeyError: If the book, chapter or verse does not exist.
+        """
+        _, _, text_offset, text_length = self._verse_row(self.verse_id(book, chapter, verse))
+        return self._string(text_offset, text_length)
+
+    def verses(self, book, chapter, first=None, last=None):
+        """Returns a chapter, or the verses from first to last, as (label, text) pairs.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+            chapter (int): The chapter number.
+            first (int): The first verse number, or None for the start of the chapter.
+            last (int): The last verse number, or None for the end of the chapter.
+
+        Returns:
+            list: (label, text) tuples in file order.
+        """
+        chapter_row = self._chapter(book, chapter)
+        _, first_verse, verse_count, _, _ = chapter_row
+        start, stop = first_verse, first_verse + verse_count
+        if first is not None:
+            start = self._slot(chapter_row, int(first))
+            if start == NO_VERSE:
+                raise KeyError(f"{book} {chapter} has no verse {first}")
+        if last is not None:
+            end = self._slot(chapter_row, int(last))
+            if end == NO_VERSE:
+                raise KeyError(f"{book} {chapter} has no verse {last}")
+            stop = end + 1
+        rows = [self._verse_row(i) for i in range(start, stop)]
+        if not rows:
+            return []
+        # The texts of consecutive verses are adjacent in the blob, so read them as one slice
+        span_start = rows[0][2]
+        span = self._mm[self._blob_at + span_start:self._blob_at + rows[-1][2] + rows[-1][3]]
+        return [(self._string(label_offset, label_length),
+                 span[text_offset - span_start:text_offset - span_start + text_length].decode('utf-8'))
+                for label_offset, label_length, text_offset, text_length in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query packed Bible files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Pack the JSON of each translation into one file.")
+    build.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS),
+                       default=sorted(corpus.TRANSLATION_DIRS))
+    build.add_argument('--out', default=corpus.BUILD_DIR, help="Output directory (default: build/).")
+    get = commands.add_parser('get', help="Print a verse, a verse range or a chapter.")
+    get.add_argument('file')
+    get.add_argument('book')
+    get.add_argument('chapter', type=int)
+    get.add_argument('verses', nargs='?', help="A verse number or a range like 1-3; the whole chapter if omitted.")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for translation in args.translation:
+            output_file = packed_file(translation, args.out)
+            stats = write_packed(translation, output_file)
+            print(f"{output_file}: {stats['books']} books, {stats['chapters']} chapters, "
+                  f"{stats['verses']} verses, {stats['bytes']} bytes")
+        return
+
+    with PackedBible(args.file) as bible:
+        first = last = None
+        if args.verses:
+            first, _, last = args.verses.partition('-')
+            last = last or first
+        for label, text in bible.verses(args.book, args.chapter, first, last):
+            print(f"{label}\t{text}")
+
+if __name__ == "__main__":
+    sys.exit(main())
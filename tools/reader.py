@@ -0,0 +1,206 @@
+"""Lazy, cached reader for the JSON of either translation.
+
+    from reader import Bible
+
+    kjv = Bible('kjv', max_bytes=32 * 1024 * 1024)
+    kjv.get('John', 3, 16).text
+    [v.text for v in kjv.range('Ruth', 1, 16, 17)]
+    for verse in kjv: ...
+
+Books are parsed the first time they are used and kept in an LRU cache bounded by the estimated
+memory of the parsed books; the least recently used book is dropped when a new one would go over
+the limit. The reader is safe to share between threads.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import corpus
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class Verse:
+    """One verse. The chapter is always an int; the verse label is a string such as "3-4"."""
+
+    __slots__ = ('book', 'chapter', 'verse', 'text')
+
+    def __init__(self, book, chapter, verse, text):
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        self.text = text
+
+    def __repr__(self):
+        return f"Verse({self.book!r}, {self.chapter}, {self.verse!r}, {self.text!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Verse):
+            return NotImplemented
+        return (self.book, self.chapter, self.verse, self.text) == (other.book, other.chapter, other.verse, other.text)
+
+    def __hash__(self):
+        return hash((self.book, self.chapter, self.verse, self.text))
+
+class Book:
+    """A parsed book: its verses by chapter, and an index from verse number to position."""
+
+    __slots__ = ('name', 'name_amharic', 'chapters', 'numbers', 'size')
+
+    def __init__(self, data):
+        self.name = data['book']
+        self.name_amharic = data['book_amharic']
+        self.chapters = {}
+        self.numbers = {}
+        size = sys.getsizeof(self.chapters)
+        for chapter in data['chapters']:
+            number = chapter['chapter']
+            if number in self.chapters:
+                # A chapter repeated in the JSON: the first occurrence wins
+                continue
+            verses = []
+            numbers = {}
+            for verse in chapter['verses']:
+                label = sys.intern(verse['verse'])
+                verse_range = corpus.verse_numbers(label)
+                if verse_range:
+                    for n in range(verse_range[0], verse_range[1] + 1):
+                        numbers.setdefault(n, len(verses))
+                verses.append(Verse(self.name, number, label, verse['text']))
+                size += sys.getsizeof(verses[-1]) + sys.getsizeof(verse['text'])
+            self.chapters[number] = verses
+            self.numbers[number] = numbers
+            size += sys.getsizeof(verses) + sys.getsizeof(numbers)
+        self.size = size
+
+    def chapter(self, chapter):
+        try:
+            return self.chapters[int(chapter)]
+        except KeyError:
+            raise KeyError(f"{self.name} has no chapter {chapter}") from None
+
+    def position(self, chapter, verse):
+        """Returns the index of a verse, given by number or label, within its chapter's list."""
+        chapter = int(chapter)
+        verses = self.chapter(chapter)
+        verse_range = corpus.verse_numbers(str(verse))
+        if verse_range and verse_range[0] in self.numbers[chapter]:
+            return self.numbers[chapter][verse_range[0]]
+        for i, candidate in enumerate(verses):
+            if candidate.verse == str(verse):
+                return i
+        raise KeyError(f"{self.name} {chapter} has no verse {verse}")
+
+class Bible:
+    """Reader for one translation.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS ('kjv' or 'amh').
+        max_bytes (int): Approximate memory limit for the cached books; the most recently used
+            book is always kept, even if it alone is over the limit.
+    """
+
+    def __init__(self, translation='kjv', max_bytes=DEFAULT_MAX_BYTES):
+        if translation not in corpus.TRANSLATION_DIRS:
+            raise ValueError(f"Unknown translation: {translation}")
+        self.translation = translation
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def books(self):
+        """The English names of the books, in canonical order."""
+        return corpus.book_names()
+
+    @property
+    def cached_bytes(self):
+        """Estimated memory held by the cached books."""
+        return self._cached_bytes
+
+    def book(self, name):
+        """Returns a parsed Book, loading it on first use.
+
+        Args:
+            name (str): The book, by any name corpus.resolve_book accepts.
+        """
+        name = corpus.resolve_book(name)
+        with self._lock:
+            book = self._cache.get(name)
+            if book is not None:
+                self._cache.move_to_end(name)
+                self.hits += 1
+                return book
+        # Parse outside the lock so other threads can keep reading cached books
+        book = Book(corpus.load_book(self.translation, name))
+        with self._lock:
+            self.misses += 1
+            if name in self._cache:
+                return self._cache[name]
+            self._cache[name] = book
+            self._cached_bytes += book.size
+            while self._cached_bytes > self.max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= evicted.size
+        return book
+
+    def get(self, book, chapter, verse):
+        """Returns one Verse.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+            chapter (int): The chapter number.
+            verse (int or str): A verse number or label; a number inside a merged Amharic
+                range returns the whole range.
+
+        Raises:
+            KeyError: If the book, chapter or verse does not exist.
+        """
+        parsed = self.book(book)
+        return parsed.chapter(chapter)[parsed.position(chapter, verse)]
+
+    def range(self, book, chapter, first=None, last=None, last_chapter=None):
+        """Returns a list of Verses from chapter:first to last_chapter:last.
+
+        Args:
+            book (str): The book, by any name corpus.resolve_book accepts.
+            chapter (int): The first chapter.
+            first (int or str): The first verse, or None for the start of the chapter.
+            last (int or str): The last verse, or None for the end of the last chapter.
+            last_chapter (int): The last chapter, if the range spans chapters; defaults to chapter.
+        """
+        parsed = self.book(book)
+        chapter = int(chapter)
+        last_chapter = chapter if last_chapter is None else int(last_chapter)
+        parsed.chapter(chapter)  # Raises KeyError for an unknown first chapter
+        verses = []
+        for number in sorted(parsed.chapters):
+            if not chapter <= number <= last_chapter:
+                continue
+            chapter_verses = parsed.chapters[number]
+            start = parsed.position(number, first) if number == chapter and first is not None else 0
+            stop = parsed.position(number, last) + 1 if number == last_chapter and last is not None else len(chapter_verses)
+            verses.extend(chapter_verses[start:stop])
+        return verses
+
+    def chapter(self, book, chapter):
+        """Returns the Verses of one chapter."""
+        return list(self.book(book).chapter(chapter))
+
+    def __iter__(self):
+        """Iterates over every verse of the translation in canonical order."""
+        for name in corpus.book_names():
+            if not os.path.exists(corpus.book_file(self.translation, name)):
+                continue
+            parsed = self.book(name)
+            for number in parsed.chapters:
+                yield from parsed.chapters[number]
+
+    def clear(self):
+        """Drops every cached book."""
+        with self._lock:
+            self._cache.clear()
+            self._cached_bytes = 0
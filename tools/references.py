@@ -0,0 +1,411 @@
+"""Verse reference parsing: "Gen 1:1-3", "1 Sam 2", "ዘፍጥረት 1፥1", "1sa 3:4" and the like.
+
+Every book alias (English names, common English abbreviations, the Amharic names with their
+short forms, and the file abbreviations from BOOK_MAPPINGS) is inserted into a character trie
+once, and the trie is compiled into a single regular expression whose alternatives share their
+prefixes, so matching a book name is one pass of the C regex engine whatever the number of
+aliases. Case, the space after a book number ("1Sam", "1 Sam") and a trailing period ("Gen.")
+do not matter. Two-letter abbreviations that are common words (re, la, da...) are left out so
+scanning prose does not pick them up.
+
+After the book comes the chapter, and optionally a verse and a range end:
+
+    John 3          whole chapter
+    John 3:16       one verse (":" "." or the Ethiopic "፥" separate chapter and verse)
+    John 3:16-18    verses of one chapter
+    John 3:16-4:2   across chapters
+    John 3-4        whole chapters
+    Jude 3          a verse, in the books of one chapter
+
+parse() reads a single reference, scan() finds every reference in free text, and
+ReferenceResolver turns references into ranges of verse ids (the row numbers of the packed
+files, see packed.py).
+
+Usage:
+    python tools/references.py "Gen 1:1-3" "ዘፍጥረት 1፥1"
+    python tools/references.py --scan < notes.txt
+"""
+import argparse
+import re
+import sys
+from functools import lru_cache
+
+import corpus
+import packed
+
+# Common English abbreviations, in addition to the full names and the file abbreviations.
+# Numbered books are listed without their number, which is added in each accepted form.
+ENGLISH_ABBREVIATIONS = {
+    'Genesis': ('gen', 'gn'),
+    'Exodus': ('exod', 'exo', 'ex'),
+    'Leviticus': ('lev', 'lv'),
+    'Numbers': ('num', 'nm', 'nb'),
+    'Deuteronomy': ('deut', 'dt'),
+    'Joshua': ('josh', 'jsh'),
+    'Judges': ('judg', 'jdgs', 'jg'),
+    'Ruth': ('rth',),
+    'Samuel': ('sam', 'sm', 'sa'),
+    'Kings': ('kgs', 'kin', 'ki'),
+    'Chronicles': ('chron', 'chr', 'ch'),
+    'Ezra': ('ezr',),
+    'Nehemiah': ('neh',),
+    'Esther': ('esth',),
+    'Job': ('jb',),
+    'Psalms': ('psalm', 'pss', 'psa', 'ps'),
+    'Proverbs': ('prov', 'prv'),
+    'Ecclesiastes': ('eccles', 'eccl', 'ecc', 'qoh'),
+    'Song of Solomon': ('song of songs', 'song', 'sos', 'canticles', 'cant'),
+    'Isaiah': ('isa',),
+    'Jeremiah': ('jer',),
+    'Lamentations': ('lam',),
+    'Ezekiel': ('ezek', 'eze', 'ezk'),
+    'Daniel': ('dan', 'dn'),
+    'Hosea': ('hos',),
+    'Joel': ('jl',),
+    'Amos': ('amo',),
+    'Obadiah': ('obad', 'ob'),
+    'Jonah': ('jnh', 'jon'),
+    'Micah': ('mic', 'mc'),
+    'Nahum': ('nah',),
+    'Habakkuk': ('hab', 'hb'),
+    'Zephaniah': ('zeph', 'zep', 'zp'),
+    'Haggai': ('hag', 'hg'),
+    'Zechariah': ('zech', 'zec', 'zc'),
+    'Malachi': ('mal', 'ml'),
+    'Matthew': ('matt', 'mat', 'mt'),
+    'Mark': ('mrk', 'mar', 'mk'),
+    'Luke': ('luk', 'lk'),
+    'John': ('jhn', 'jn'),
+    'Acts': ('act',),
+    'Romans': ('rom', 'rm'),
+    'Corinthians': ('cor', 'co'),
+    'Galatians': ('gal',),
+    'Ephesians': ('eph',),
+    'Philippians': ('phil', 'php', 'pp'),
+    'Colossians': ('col',),
+    'Thessalonians': ('thess', 'thes', 'th'),
+    'Timothy': ('tim', 'ti'),
+    'Titus': ('tit',),
+    'Philemon': ('philem', 'phm', 'phlm'),
+    'Hebrews': ('heb',),
+    'James': ('jas', 'jm'),
+    'Peter': ('pet', 'pt'),
+    'Jude': ('jud', 'jde'),
+    'Revelation': ('rev', 'apocalypse'),
+}
+
+# Forms accepted only after a book number ("1 Jo", "2 Joh")
+NUMBERED_ABBREVIATIONS = {
+    'John': ('jo', 'joh'),
+}
+
+ORDINALS = {
+    '1': ('1', 'i', '1st', 'first'),
+    '2': ('2', 'ii', '2nd', 'second'),
+    '3': ('3', 'iii', '3rd', 'third'),
+}
+
+# Words the Amharic names start or end with that are commonly left out ("ኢሳይያስ" for "ትንቢተ ኢሳይያስ")
+AMHARIC_PREFIXES = ('መጽሐፈ ', 'ትንቢተ ', 'ወደ ')
+AMHARIC_SUFFIXES = (' ወንጌል', ' መልእክት', ' ሰዎች')
+
+# Common Amharic abbreviations and short names not derived from the names above
+AMHARIC_ABBREVIATIONS = {
+    'Genesis': ('ዘፍ',),
+    'Exodus': ('ዘጸ',),
+    'Leviticus': ('ዘሌ',),
+    'Numbers': ('ዘኍ', 'ዘኁ'),
+    'Deuteronomy': ('ዘዳ',),
+    'Psalms': ('መዝ', 'መዝሙር'),
+    'Proverbs': ('ምሳ',),
+    'Isaiah': ('ኢሳ',),
+    'Jeremiah': ('ኤር',),
+    'Ezekiel': ('ሕዝ',),
+    'Daniel': ('ዳን',),
+    'Matthew': ('ማቴ',),
+    'Mark': ('ማር',),
+    'Luke': ('ሉቃ',),
+    'John': ('ዮሐ',),
+    'Acts': ('ሐዋ',),
+    'Galatians': ('ገላ',),
+    'Ephesians': ('ኤፌ',),
+    'Philippians': ('ፊል',),
+    'Colossians': ('ቆላ',),
+    'Hebrews': ('ዕብ',),
+    'James': ('ያዕ',),
+    'Revelation': ('ራእ', 'ራእይ'),
+}
+
+# Books of one chapter, where "Jude 3" means verse 3
+SINGLE_CHAPTER_BOOKS = frozenset(['Obadiah', 'Philemon', '2 John', '3 John', 'Jude'])
+
+# Left out of alias keys
+SKIPPED = re.compile(r'[\s.]+')
+
+REFERENCE_TAIL = (r'\.?\s*(?P<chapter>\d+)'
+                  r'(?:\s*[:፥.]\s*(?P<verse>\d+))?'
+                  r'(?:\s*[-–—]\s*(?P<end>\d+)(?:\s*[:፥.]\s*(?P<end_verse>\d+))?)?'
+                  r'(?!\d)')
+
+def alias_key(alias):
+    """Normalizes a book alias for lookup: case-folded, without spaces or periods."""
+    return SKIPPED.sub('', alias).casefold()
+
+def _amharic_short_forms(amharic):
+    forms = {amharic}
+    number, _, rest = amharic.partition('ኛ ')
+    if not rest or not number.isdigit():
+        number, rest = '', amharic
+    for prefix in AMHARIC_PREFIXES:
+        if rest.startswith(prefix):
+            rest = rest[len(prefix):]
+    for suffix in AMHARIC_SUFFIXES:
+        if rest.endswith(suffix):
+            rest = rest[:-len(suffix)]
+            # "የማቴዎስ ወንጌል" -> "ማቴዎስ": the ye- prefix is part of the first syllable
+            if rest.startswith('የ') and len(rest) > 2:
+                rest = rest[1:]
+    if number:
+        forms.update((f"{number}ኛ {rest}", f"{number} {rest}", f"{number}ኛ {amharic.partition('ኛ ')[2]}"))
+    else:
+        forms.add(rest)
+    return forms
+
+@lru_cache(maxsize=None)
+def _alias_forms():
+    # {alias as written, case-folded with single spaces: English name}, without ambiguous aliases
+    forms = {}
+    owners = {}
+
+    def add(alias, book):
+        alias = " ".join(alias.casefold().split())
+        forms[alias] = book
+        owners.setdefault(alias_key(alias), set()).add(book)
+
+    for abbr, (english, amharic) in corpus.book_mappings().items():
+        add(abbr, english)
+        for form in _amharic_short_forms(amharic) | set(AMHARIC_ABBREVIATIONS.get(english, ())):
+            add(form, english)
+    for english in corpus.book_names():
+        number, _, name = english.partition(' ')
+        if number not in ORDINALS:
+            add(english, english)
+            for form in ENGLISH_ABBREVIATIONS.get(english, ()):
+                add(form, english)
+            continue
+        for form in (name,) + ENGLISH_ABBREVIATIONS.get(name, ()) + NUMBERED_ABBREVIATIONS.get(name, ()):
+            for ordinal in ORDINALS[number]:
+                add(f"{ordinal} {form}", english)
+    return {alias: book for alias, book in forms.items() if len(owners[alias_key(alias)]) == 1}
+
+@lru_cache(maxsize=None)
+def book_aliases():
+    """Maps every accepted book alias, normalized with alias_key, to its English book name.
+
+    Aliases that would name more than one book are left out.
+
+    Returns:
+        dict: {alias key: English name}
+    """
+    return {alias_key(alias): book for alias, book in _alias_forms().items()}
+
+def _trie_pattern(node):
+    # Each node maps a character to its child, '' marks the end of an alias; a space matches any
+    # run of whitespace, including none ("1 Sam" and "1Sam")
+    alternatives = [(r'\s*' if char == ' ' else re.escape(char)) + _trie_pattern(node[char])
+                    for char in sorted(c for c in node if c)]
+    if not alternatives:
+        return ''
+    pattern = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+    return f"(?:{pattern})?" if '' in node else pattern
+
+@lru_cache(maxsize=None)
+def reference_re():
+    """Compiles the reference pattern: the book alias trie followed by REFERENCE_TAIL."""
+    trie = {}
+    for alias in _alias_forms():
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(rf'(?<!\w)(?P<book>{_trie_pattern(trie)})(?=[\s.\d])' + REFERENCE_TAIL, re.IGNORECASE)
+
+class Reference:
+    """A parsed reference. verse and last_verse are None for whole chapters; start and end give
+    the span of the reference in the text it was found in."""
+
+    __slots__ = ('book', 'chapter', 'verse', 'last_chapter', 'last_verse', 'start', 'end')
+
+    def __init__(self, book, chapter, verse=None, last_chapter=None, last_verse=None, start=0, end=0):
+        self.book = book
+        self.chapter = chapter
+        self.verse = verse
+        self.last_chapter = chapter if last_chapter is None else last_chapter
+        self.last_verse = verse if last_verse is None and last_chapter is None else last_verse
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Reference({str(self)!r}, span=({self.start}, {self.end}))"
+
+    def __str__(self):
+        text = f"{self.book} {self.chapter}"
+        if self.verse is not None:
+            text += f":{self.verse}"
+        if (self.last_chapter, self.last_verse) != (self.chapter, self.verse):
+            if self.last_chapter != self.chapter:
+                text += f"-{self.last_chapter}" + (f":{self.last_verse}" if self.last_verse is not None else "")
+            else:
+                text += f"-{self.last_verse}"
+        return text
+
+    def __eq__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def key(self):
+        """The reference without its span: (book, chapter, verse, last_chapter, last_verse)."""
+        return self.book, self.chapter, self.verse, self.last_chapter, self.last_verse
+
+def _reference(match):
+    book = book_aliases().get(alias_key(match.group('book')))
+    if book is None:
+        return None
+    chapter = int(match.group('chapter'))
+    verse = match.group('verse')
+    end, end_verse = match.group('end'), match.group('end_verse')
+    verse = int(verse) if verse else None
+    if book in SINGLE_CHAPTER_BOOKS and verse is None and end_verse is None:
+        chapter, verse = 1, chapter
+    if end is None:
+        return Reference(book, chapter, verse, start=match.start(), end=match.end())
+    if end_verse is not None:
+        return Reference(book, chapter, verse, int(end), int(end_verse), match.start(), match.end())
+    if verse is not None:
+        return Reference(book, chapter, verse, chapter, int(end), match.start(), match.end())
+    return Reference(book, chapter, None, int(end), None, match.start(), match.end())
+
+@lru_cache(maxsize=65536)
+def parse(text):
+    """Parses a string holding exactly one reference.
+
+    Results are memoized, so repeated strings in a batch cost a dictionary lookup.
+
+    Args:
+        text (str): E.g. "Gen 1:1-3", "1 Sam 2" or "ዘፍጥረት 1፥1".
+
+    Returns:
+        Reference: The reference, or None if the string is not a reference.
+    """
+    match = reference_re().fullmatch(text.strip())
+    return _reference(match) if match else None
+
+def scan(text):
+    """Finds every reference in free text.
+
+    Args:
+        text (str): Any text.
+
+    Returns:
+        list: References in the order they appear, with their start and end offsets.
+    """
+    references = []
+    for match in reference_re().finditer(text):
+        reference = _reference(match)
+        if reference is not None:
+            references.append(reference)
+    return references
+
+class ReferenceResolver:
+    """Resolves references to ranges of verse ids in the packed file of a translation.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        packed_dir (str): Directory holding {translation}.bibpack (see packed.py build).
+    """
+
+    def __init__(self, translation='kjv', packed_dir=corpus.BUILD_DIR):
+        self.bible = packed.PackedBible(packed.packed_file(translation, packed_dir))
+
+    def close(self):
+        self.bible.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def verse_ids(self, reference):
+        """Returns the range of verse ids a Reference covers, or None if it is not in the translation.
+
+        A verse inside a merged Amharic range resolves to the whole range.
+        """
+        try:
+            if reference.verse is None:
+                first = self.bible.chapter_ids(reference.book, reference.chapter).start
+            else:
+                first = self.bible.verse_id(reference.book, reference.chapter, reference.verse)
+            if reference.last_verse is None:
+                last = self.bible.chapter_ids(reference.book, reference.last_chapter)[-1]
+            else:
+                last = self.bible.verse_id(reference.book, reference.last_chapter, reference.last_verse)
+        except (KeyError, IndexError):
+            return None
+        return range(first, last + 1) if last >= first else None
+
+    def resolve(self, text):
+        """Parses one reference string and returns its range of verse ids, or None."""
+        reference = parse(text)
+        return None if reference is None else self.verse_ids(reference)
+
+    def resolve_many(self, texts):
+        """Resolves a batch of reference strings.
+
+        Args:
+            texts (iterable): Reference strings.
+
+        Returns:
+            list: One range of verse ids (or None) per string, in order.
+        """
+        resolved = {}
+        results = []
+        for text in texts:
+            ids = resolved.get(text, resolved)
+            if ids is resolved:
+                ids = resolved[text] = self.resolve(text)
+            results.append(ids)
+        return results
+
+    def scan(self, text):
+        """Finds every reference in free text and resolves it.
+
+        Returns:
+            list: (Reference, range of verse ids or None) pairs, in text order.
+        """
+        return [(reference, self.verse_ids(reference)) for reference in scan(text)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse verse references and resolve them to verse ids.")
+    parser.add_argument('references', nargs='*', help="Reference strings; read from stdin (one per line) if none.")
+    parser.add_argument('--scan', action='store_true', help="Find every reference in the input text instead.")
+    parser.add_argument('--translation', choices=sorted(corpus.TRANSLATION_DIRS), default='kjv')
+    parser.add_argument('--dir', default=corpus.BUILD_DIR, help="Directory holding the packed files (default: build/).")
+    args = parser.parse_args(argv)
+
+    with ReferenceResolver(args.translation, args.dir) as resolver:
+        if args.scan:
+            text = " ".join(args.references) if args.references else sys.stdin.read()
+            for reference, ids in resolver.scan(text):
+                print(f"{text[reference.start:reference.end]}\t{reference}\t{'-' if ids is None else f'{ids.start}-{ids.stop - 1}'}")
+            return
+        texts = args.references or [line.rstrip('\n') for line in sys.stdin]
+        for text, ids in zip(texts, resolver.resolve_many(texts)):
+            print(f"{text}\t{parse(text) or '-'}\t{'-' if ids is None else f'{ids.start}-{ids.stop - 1}'}")
+
+if __name__ == "__main__":
+    sys.exit(main())
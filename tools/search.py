@@ -0,0 +1,330 @@
+"""Full-text search over both translations with a positional inverted index.
+
+Each translation gets one index file mapping every token to its postings, the (verse id,
+position) pairs where it occurs. Verse ids number the verses in canonical order. Tokens are
+those of textnorm.tokenize, read from the per-book token caches, and queries are tokenized the
+same way. The file is mapped with mmap and nothing is decoded until a query needs it: the term
+dictionary is read on the first query and postings are sliced straight out of the mapping.
+
+Queries are words, "quoted phrases", AND (also implied between terms), OR, NOT (or a leading -)
+and parentheses, e.g.:  "in the beginning" God   |   lamb OR sheep -goat   |   "ብርሃን ይሁን"
+
+File layout (integers are little-endian uint32):
+
+    header    magic b'BIBLIDX1', version, term, verse and posting counts, terms and labels sizes
+    terms     the sorted terms, UTF-8, separated by newlines
+    term table per term: first posting, posting count
+    verses    per verse: book index, chapter
+    labels    the verse labels, UTF-8, separated by newlines
+    postings  (verse id, position) pairs, grouped by term and sorted
+
+Usage:
+    python tools/search.py build [--translation kjv amh] [--out build/]
+    python tools/search.py query kjv '"without form" AND void'
+"""
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+import corpus
+from textnorm import book_tokens, tokenize
+
+MAGIC = b'BIBLIDX1'
+VERSION = 3
+
+HEADER = struct.Struct('<8s6I')
+TERM = struct.Struct('<2I')
+VERSE = struct.Struct('<2I')
+
+def index_file(translation, out_dir=corpus.BUILD_DIR):
+    """Returns the default path of a translation's index file."""
+    return os.path.join(out_dir, f"{translation}.idx")
+
+def build_index(translation, output_file):
+    """Builds the inverted index of a translation and writes it to disk.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        output_file (str): The path of the index file to write.
+
+    Returns:
+        dict: Counts of terms, verses and postings written.
+    """
+    book_index = {book: i for i, book in enumerate(corpus.book_names())}
+    postings = {}
+    verses = array('I')
+    labels = []
+    verse_id = 0
+    for book, data in corpus.iter_books(translation):
+        verse_tokens = iter(book_tokens(translation, book))
+        for chapter in data['chapters']:
+            for verse in chapter['verses']:
+                verses.extend((book_index[book], chapter['chapter']))
+                labels.append(verse['verse'])
+                for position, token in enumerate(next(verse_tokens)):
+                    term_postings = postings.get(token)
+                    if term_postings is None:
+                        term_postings = postings[token] = array('I')
+                    term_postings.extend((verse_id, position))
+                verse_id += 1
+
+    terms = sorted(postings)
+    term_table = array('I')
+    all_postings = array('I')
+    for term in terms:
+        term_table.extend((len(all_postings) // 2, len(postings[term]) // 2))
+        all_postings.extend(postings[term])
+    terms_blob = '\n'.join(terms).encode('utf-8')
+    labels_blob = '\n'.join(labels).encode('utf-8')
+    if sys.byteorder != 'little':
+        for table in (term_table, verses, all_postings):
+            table.byteswap()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    tmp_file = output_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(terms), len(labels), len(all_postings) // 2,
+                            len(terms_blob), len(labels_blob)))
+        f.write(terms_blob)
+        f.write(term_table.tobytes())
+        f.write(verses.tobytes())
+        f.write(labels_blob)
+        # Keep the postings 4-byte aligned so they can be cast to uint32 in place
+        f.write(b'\0' * (-f.tell() % 4))
+        f.write(all_postings.tobytes())
+    os.replace(tmp_file, output_file)
+    return {'terms': len(terms), 'verses': len(labels), 'postings': len(all_postings) // 2}
+
+class SearchIndex:
+    """A persisted inverted index, mapped into memory and decoded lazily.
+
+    Args:
+        path (str): The path of a file written by build_index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, term_count, verse_count, posting_count, terms_size, labels_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} search index")
+        self.verse_count = verse_count
+        self._terms_at = HEADER.size
+        self._term_table_at = self._terms_at + terms_size
+        self._verses_at = self._term_table_at + term_count * TERM.size
+        self._labels_at = self._verses_at + verse_count * VERSE.size
+        postings_at = self._labels_at + labels_size
+        postings_at += -postings_at % 4
+        self._terms_size = terms_size
+        self._labels_size = labels_size
+        self._postings = memoryview(self._mm)[postings_at:postings_at + posting_count * 8].cast('I')
+        if sys.byteorder != 'little':
+            postings = array('I', self._postings)
+            postings.byteswap()
+            self._postings.release()
+            self._postings = memoryview(postings)
+        self._terms = None
+        self._labels = None
+
+    def close(self):
+        self._postings.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _term_ids(self):
+        if self._terms is None:
+            terms = self._mm[self._terms_at:self._terms_at + self._terms_size].decode('utf-8')
+            self._terms = {term: i for i, term in enumerate(terms.split('\n'))} if terms else {}
+        return self._terms
+
+    def postings(self, term):
+        """Returns the flat (verse id, position, verse id, position, ...) postings of a term.
+
+        Args:
+            term (str): A token, as produced by tokenize.
+
+        Returns:
+            memoryview: uint32 view into the index; empty if the term does not occur.
+        """
+        term_id = self._term_ids().get(term)
+        if term_id is None:
+            return self._postings[0:0]
+        first, count = TERM.unpack_from(self._mm, self._term_table_at + term_id * TERM.size)
+        return self._postings[first * 2:(first + count) * 2]
+
+    def term_verses(self, term):
+        """Returns the set of verse ids containing a term."""
+        return set(self.postings(term)[0::2])
+
+    def phrase_verses(self, tokens):
+        """Returns the set of verse ids containing the tokens next to each other, in order."""
+        if not tokens:
+            return set()
+        if len(tokens) == 1:
+            return self.term_verses(tokens[0])
+        # Start from the rarest token and check the others at their expected offsets
+        lists = [self.postings(token) for token in tokens]
+        pivot = min(range(len(tokens)), key=lambda i: len(lists[i]))
+        candidates = set(zip(lists[pivot][0::2], lists[pivot][1::2]))
+        for i, other in enumerate(lists):
+            if i == pivot or not candidates:
+                continue
+            offset = i - pivot
+            candidate_verses = {verse_id for verse_id, _ in candidates}
+            present = {(verse_id, position - offset) for verse_id, position in zip(other[0::2], other[1::2])
+                       if verse_id in candidate_verses}
+            candidates &= present
+        return {verse_id for verse_id, _ in candidates}
+
+    def search(self, query):
+        """Runs a query.
+
+        Args:
+            query (str): Words, "phrases", AND, OR, NOT, - and parentheses.
+
+        Returns:
+            list: The matching verse ids, in canonical order.
+        """
+        return sorted(QueryParser(self, query).parse())
+
+    def reference(self, verse_id):
+        """Returns (book, chapter, verse label) for a verse id."""
+        if self._labels is None:
+            self._labels = self._mm[self._labels_at:self._labels_at + self._labels_size].decode('utf-8').split('\n')
+        book_index, chapter = VERSE.unpack_from(self._mm, self._verses_at + verse_id * VERSE.size)
+        return corpus.book_names()[book_index], chapter, self._labels[verse_id]
+
+QUERY_TOKEN_RE = re.compile(r'"([^"]*)"?|(\()|(\))|(-)(?=\S)|([^\s()"]+)')
+
+class QueryParser:
+    """Recursive descent parser that evaluates a query to a set of verse ids.
+
+        query   := or_expr
+        or_expr := and_expr ("OR" and_expr)*
+        and_expr:= unary (["AND"] unary)*
+        unary   := ("NOT" | "-") unary | "(" or_expr ")" | phrase | word
+    """
+
+    def __init__(self, index, query):
+        self.index = index
+        self.tokens = []
+        for phrase, open_paren, close_paren, minus, word in QUERY_TOKEN_RE.findall(query):
+            if open_paren or close_paren or minus:
+                self.tokens.append(('op', open_paren or close_paren or 'NOT'))
+            elif word in ('AND', 'OR', 'NOT'):
+                self.tokens.append(('op', word))
+            else:
+                terms = tokenize(word or phrase)
+                # Punctuation alone (a bare -, "", ።) has no terms and would match nothing
+                if terms:
+                    self.tokens.append(('terms', terms))
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return set()
+        result = self._or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.pos][1]!r} in query")
+        return result
+
+    def _or(self):
+        result = self._and()
+        while self._peek() == ('op', 'OR'):
+            self._next()
+            result = result | self._and()
+        return result
+
+    def _and(self):
+        result = self._unary()
+        while True:
+            kind, value = self._peek()
+            if kind is None or value in ('OR', ')'):
+                return result
+            if value == 'AND':
+                self._next()
+            result = result & self._unary()
+
+    def _unary(self):
+        kind, value = self._next()
+        if kind == 'op' and value == 'NOT':
+            return set(range(self.index.verse_count)) - self._unary()
+        if kind == 'op' and value == '(':
+            result = self._or()
+            if self._next() != ('op', ')'):
+                raise ValueError("Missing ) in query")
+            return result
+        if kind == 'terms':
+            # A word that splits into several tokens ("LORD's", "፤ሰማይ።") is matched as a phrase
+            return self.index.phrase_verses(value)
+        if kind is None:
+            raise ValueError("Unexpected end of query")
+        raise ValueError(f"Unexpected {value!r} in query")
+
+_open_indexes = {}
+
+def open_index(translation, out_dir=corpus.BUILD_DIR):
+    """Returns the index of a translation, opening it on first use."""
+    path = index_file(translation, out_dir)
+    if path not in _open_indexes:
+        _open_indexes[path] = SearchIndex(path)
+    return _open_indexes[path]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the full-text search indexes.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Index the JSON of each translation.")
+    build.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS),
+                       default=sorted(corpus.TRANSLATION_DIRS))
+    build.add_argument('--out', default=corpus.BUILD_DIR, help="Output directory (default: build/).")
+    query = commands.add_parser('query', help="Print the verses matching a query.")
+    query.add_argument('translation', choices=sorted(corpus.TRANSLATION_DIRS))
+    query.add_argument('query')
+    query.add_argument('--index-dir', default=corpus.BUILD_DIR, help="Directory holding the indexes (default: build/).")
+    query.add_argument('--limit', type=int, default=20, help="Maximum number of verses to print (default: 20).")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for translation in args.translation:
+            output_file = index_file(translation, args.out)
+            stats = build_index(translation, output_file)
+            print(f"{output_file}: {stats['terms']} terms, {stats['verses']} verses, {stats['postings']} postings")
+        return
+
+    index = open_index(args.translation, args.index_dir)
+    try:
+        verse_ids = index.search(args.query)
+    except ValueError as e:
+        print(f"Invalid query {args.query!r}: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(verse_ids)} verses")
+    books = {}
+    for verse_id in verse_ids[:args.limit]:
+        book, chapter, label = index.reference(verse_id)
+        if book not in books:
+            books[book] = corpus.load_book(args.translation, book)
+        text = next((v['text'] for c in books[book]['chapters'] if c['chapter'] == chapter
+                     for v in c['verses'] if v['verse'] == label), "")
+        print(f"{book} {chapter}:{label}\t{text}")
+
+if __name__ == "__main__":
+    sys.exit(main())
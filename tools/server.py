@@ -0,0 +1,267 @@
+"""Asynchronous HTTP verse service over the JSON of both translations.
+
+Routes (GET or HEAD; the book is any name corpus.resolve_book accepts, URL-encoded):
+
+    /                                      the translations
+    /{translation}                         the books of a translation
+    /{translation}/{book}                  the chapter numbers of a book
+    /{translation}/{book}/{chapter}        a whole chapter
+    /{translation}/{book}/{chapter}/{verse}           one verse, e.g. /kjv/John/3/16
+    /{translation}/{book}/{chapter}/{first}-{last}    a range, e.g. /amh/Genesis/1/1-5
+
+Verse responses are JSON objects with translation, book, book_amharic, chapter and a list of
+{'verse', 'text'} entries. Books are loaded on first use through reader.Bible; every rendered
+response is kept in an LRU cache keyed by the request path, together with a strong ETag, so a
+repeated request is answered from memory and a conditional GET whose If-None-Match matches
+(weak comparison: a list of tags, W/ tags or *) gets 304 Not Modified. Error responses are not
+cached, so requests for unknown paths cannot evict good entries.
+
+Connections are kept alive (HTTP/1.1). The routes take no request body, so the server does not
+read one: a request that announces a body (a Content-Length other than 0, or any
+Transfer-Encoding) and every 405 is answered with Connection: close, and the connection is closed
+rather than reading the body as the next request.
+
+Usage:
+    python tools/server.py [--host 127.0.0.1] [--port 8080] [--preload]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+from collections import OrderedDict
+from urllib.parse import unquote
+
+import corpus
+import reader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ENTRIES = 50000
+
+MAX_HEADER_BYTES = 16384
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           431: 'Request Header Fields Too Large'}
+
+class Response:
+    """A rendered response: status, JSON body and its ETag, with the header block prebuilt."""
+
+    __slots__ = ('status', 'body', 'etag', 'head', 'not_modified')
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        headers = (f"Content-Type: application/json; charset=utf-8\r\n"
+                   f"Content-Length: {len(self.body)}\r\n")
+        if status == 200:
+            # The corpus only changes with a redeploy, so successful responses may be cached downstream
+            headers += f"ETag: {self.etag}\r\nCache-Control: public, max-age=86400\r\n"
+        self.head = f"HTTP/1.1 {status} {REASONS[status]}\r\n{headers}".encode('ascii')
+        self.not_modified = (f"HTTP/1.1 304 Not Modified\r\nETag: {self.etag}\r\n"
+                             f"Cache-Control: public, max-age=86400\r\n").encode('ascii')
+
+class NotFound(Exception):
+    pass
+
+def etag_matches(if_none_match, etag):
+    """Tells whether an If-None-Match header value matches an ETag (RFC 9110 weak comparison).
+
+    Args:
+        if_none_match (str): The header value: *, or a comma-separated list of entity tags.
+        etag (str): The quoted strong ETag of the response.
+
+    Returns:
+        bool: True if the value is * or lists the tag, with or without a W/ prefix.
+    """
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag[:2] == 'W/':
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+class VerseService:
+    """Renders and caches the responses of the routes above.
+
+    Args:
+        max_bytes (int): Memory limit of each translation's reader.Bible book cache.
+        cache_entries (int): Number of rendered responses kept in memory.
+    """
+
+    def __init__(self, max_bytes=reader.DEFAULT_MAX_BYTES, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.bibles = {translation: reader.Bible(translation, max_bytes) for translation in corpus.TRANSLATION_DIRS}
+        self.cache_entries = cache_entries
+        self._responses = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def preload(self):
+        """Loads every book of both translations, so no request has to read a file."""
+        for bible in self.bibles.values():
+            for _ in bible:
+                pass
+
+    def cached(self, path):
+        """Returns the cached Response for a path, or None."""
+        response = self._responses.get(path)
+        if response is not None:
+            self._responses.move_to_end(path)
+            self.hits += 1
+        return response
+
+    def store(self, path, response):
+        """Caches a rendered Response; only successful ones, as any path can produce an error."""
+        self.misses += 1
+        if response.status != 200:
+            return
+        self._responses[path] = response
+        if len(self._responses) > self.cache_entries:
+            self._responses.popitem(last=False)
+
+    def render(self, path):
+        """Renders the Response for a request path (without the query string).
+
+        This may load a book from disk, so the server runs it outside the event loop.
+        """
+        parts = [unquote(part) for part in path.strip('/').split('/')] if path.strip('/') else []
+        try:
+            return Response(200, self._route(parts))
+        except NotFound as e:
+            return Response(404, {'error': str(e)})
+        except ValueError as e:
+            return Response(400, {'error': str(e)})
+
+    def _route(self, parts):
+        if not parts:
+            return {'translations': sorted(self.bibles)}
+        bible = self.bibles.get(parts[0])
+        if bible is None:
+            raise NotFound(f"Unknown translation: {parts[0]}")
+        if len(parts) == 1:
+            return {'translation': parts[0], 'books': bible.books}
+        if len(parts) > 4:
+            raise NotFound("Unknown route")
+        try:
+            book = bible.book(parts[1])
+        except (KeyError, ValueError, OSError):
+            raise NotFound(f"Unknown book: {parts[1]}") from None
+        if len(parts) == 2:
+            return {'translation': parts[0], 'book': book.name, 'book_amharic': book.name_amharic,
+                    'chapters': sorted(book.chapters)}
+        try:
+            chapter = int(parts[2])
+        except ValueError:
+            raise ValueError(f"Invalid chapter: {parts[2]}") from None
+        try:
+            if len(parts) == 3:
+                verses = bible.chapter(book.name, chapter)
+            else:
+                first, _, last = parts[3].partition('-')
+                verses = bible.range(book.name, chapter, first, last or first)
+        except KeyError as e:
+            raise NotFound(e.args[0]) from None
+        if not verses:
+            raise NotFound(f"{book.name} {chapter} has no verses {parts[3]}")
+        return {'translation': parts[0], 'book': book.name, 'book_amharic': book.name_amharic, 'chapter': chapter,
+                'verses': [{'verse': verse.verse, 'text': verse.text} for verse in verses]}
+
+    async def handle(self, stream_reader, writer):
+        """Serves the requests of one connection until the client closes it."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await stream_reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(self._error(431, "Request headers too large"))
+                    break
+                lines = request.decode('iso-8859-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    writer.write(self._error(400, "Malformed request line"))
+                    break
+                headers = {}
+                has_body = False
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if value:
+                        name, value = name.strip().lower(), value.strip()
+                        headers[name] = value
+                        # Checked per line, so a repeated header cannot hide an earlier body length
+                        if name == 'transfer-encoding' or (name == 'content-length' and value != '0'):
+                            has_body = True
+                keep_alive = (headers.get('connection', '').lower() != 'close' if version == 'HTTP/1.1'
+                              else headers.get('connection', '').lower() == 'keep-alive')
+                if has_body:
+                    # The body is never read, so the connection cannot carry another request
+                    keep_alive = False
+
+                if method not in ('GET', 'HEAD'):
+                    keep_alive = False
+                    writer.write(self._error(405, f"Method {method} not allowed"))
+                else:
+                    path = target.split('?', 1)[0]
+                    response = self.cached(path)
+                    if response is None:
+                        response = await loop.run_in_executor(None, self.render, path)
+                        self.store(path, response)
+                    connection = b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"
+                    if response.status == 200 and etag_matches(headers.get('if-none-match', ''), response.etag):
+                        writer.write(response.not_modified + connection)
+                    elif method == 'HEAD':
+                        writer.write(response.head + connection)
+                    else:
+                        writer.write(response.head + connection + response.body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _error(self, status, message, keep_alive=False):
+        response = Response(status, {'error': message})
+        connection = b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"
+        return response.head + connection + response.body
+
+async def serve(service, host, port):
+    """Runs the service until cancelled."""
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    logger.info(f"Serving on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve verses of both translations over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--preload', action='store_true', help="Load every book before accepting requests.")
+    parser.add_argument('--max-bytes', type=int, default=reader.DEFAULT_MAX_BYTES,
+                        help="Memory limit of each translation's book cache in bytes (default: 64 MB).")
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help=f"Rendered responses kept in memory (default: {DEFAULT_CACHE_ENTRIES}).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    service = VerseService(args.max_bytes, args.cache_entries)
+    if args.preload:
+        service.preload()
+        logger.info("Loaded every book")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
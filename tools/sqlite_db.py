@@ -0,0 +1,217 @@
+"""SQLite build target: both translations in one database with full-text search.
+
+Schema:
+
+    translations (id, code, name)
+    books        (id, translation_id, position, name, name_amharic)
+    chapters     (id, book_id, position, number)
+    verses       (id, chapter_id, position, label, first_number, last_number, text)
+    verses_fts   FTS5 index over verses.text (external content, rowid = verses.id)
+    verse_refs   view joining the four tables: translation, book, book_amharic, chapter, verse, text
+
+Verse labels are kept as in the JSON ("3-4" for merged Amharic verses); first_number and
+last_number hold the numeric range and are NULL for unnumbered entries. Rows are inserted with
+batched executemany calls inside a single transaction, and the FTS index is built in one pass at
+the end. Loading a translation replaces any rows it already has in the database.
+
+Usage:
+    python tools/sqlite_db.py build/bible.sqlite [--translation kjv amh]
+
+parse_bible.py --sqlite FILE uses SQLiteWriter to load the Amharic text straight from the HTML.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+import corpus
+
+TRANSLATION_NAMES = {
+    'kjv': "King James Version",
+    'amh': "Amharic Bible 1962",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    translation_id INTEGER NOT NULL REFERENCES translations(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_amharic TEXT,
+    UNIQUE (translation_id, name)
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    position INTEGER NOT NULL,
+    number INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chapters_book_number ON chapters (book_id, number);
+CREATE TABLE IF NOT EXISTS verses (
+    id INTEGER PRIMARY KEY,
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id),
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    first_number INTEGER,
+    last_number INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verses_chapter_number ON verses (chapter_id, first_number);
+CREATE VIRTUAL TABLE IF NOT EXISTS verses_fts USING fts5(
+    text, content='verses', content_rowid='id', tokenize='unicode61'
+);
+CREATE VIEW IF NOT EXISTS verse_refs AS
+    SELECT verses.id AS id, translations.code AS translation, books.name AS book,
+           books.name_amharic AS book_amharic, chapters.number AS chapter,
+           verses.label AS verse, verses.text AS text
+    FROM verses
+    JOIN chapters ON chapters.id = verses.chapter_id
+    JOIN books ON books.id = chapters.book_id
+    JOIN translations ON translations.id = books.translation_id;
+"""
+
+class SQLiteWriter:
+    """Streams verses into the database in batches, inside one transaction.
+
+    Verses must arrive grouped by book and chapter, in the order they should be stored; a new
+    chapter row starts whenever the book or chapter number changes.
+
+    Args:
+        path (str): The database file, created if missing.
+        translation (str): The translation code the verses belong to ('kjv' or 'amh').
+        batch_size (int): Number of verse rows per executemany call.
+    """
+
+    def __init__(self, path, translation, batch_size=5000):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = MEMORY")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.verse_count = 0
+        self._verses = []
+        self._book_key = None
+        self._chapter_key = None
+        self._book_position = 0
+        self._chapter_position = 0
+        self._verse_position = 0
+
+        self.conn.execute("BEGIN")
+        self.conn.execute("INSERT OR IGNORE INTO translations (code, name) VALUES (?, ?)",
+                          (translation, TRANSLATION_NAMES.get(translation, translation)))
+        self.translation_id = self.conn.execute("SELECT id FROM translations WHERE code = ?", (translation,)).fetchone()[0]
+        self._delete_translation()
+        self._next_book_id = self._next_id('books')
+        self._next_chapter_id = self._next_id('chapters')
+        self._next_verse_id = self._next_id('verses')
+        self._books = []
+        self._chapters = []
+
+    def _next_id(self, table):
+        return self.conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    def _delete_translation(self):
+        books = "SELECT id FROM books WHERE translation_id = ?"
+        chapters = f"SELECT id FROM chapters WHERE book_id IN ({books})"
+        self.conn.execute(f"DELETE FROM verses WHERE chapter_id IN ({chapters})", (self.translation_id,))
+        self.conn.execute(f"DELETE FROM chapters WHERE book_id IN ({books})", (self.translation_id,))
+        self.conn.execute("DELETE FROM books WHERE translation_id = ?", (self.translation_id,))
+
+    def add_verse(self, book, book_amharic, chapter, verse, text):
+        """Queues one verse for insertion.
+
+        Args:
+            book (str): The English book name.
+            book_amharic (str): The Amharic book name.
+            chapter (int): The chapter number.
+            verse (str): The verse label, e.g. "1" or "3-4".
+            text (str): The verse text.
+        """
+        if book != self._book_key:
+            self._book_key = book
+            self._chapter_key = None
+            self._book_id = self._next_book_id
+            self._next_book_id += 1
+            self._books.append((self._book_id, self.translation_id, self._book_position, book, book_amharic))
+            self._book_position += 1
+            self._chapter_position = 0
+        if chapter != self._chapter_key:
+            self._chapter_key = chapter
+            self._chapter_id = self._next_chapter_id
+            self._next_chapter_id += 1
+            self._chapters.append((self._chapter_id, self._book_id, self._chapter_position, int(chapter)))
+            self._chapter_position += 1
+            self._verse_position = 0
+        numbers = corpus.verse_numbers(verse) or (None, None)
+        self._verses.append((self._next_verse_id, self._chapter_id, self._verse_position, verse,
+                             numbers[0], numbers[1], text))
+        self._next_verse_id += 1
+        self._verse_position += 1
+        self.verse_count += 1
+        if len(self._verses) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Inserts the queued rows."""
+        self.conn.executemany("INSERT INTO books VALUES (?, ?, ?, ?, ?)", self._books)
+        self.conn.executemany("INSERT INTO chapters VALUES (?, ?, ?, ?)", self._chapters)
+        self.conn.executemany("INSERT INTO verses VALUES (?, ?, ?, ?, ?, ?, ?)", self._verses)
+        self._books.clear()
+        self._chapters.clear()
+        self._verses.clear()
+
+    def close(self):
+        """Inserts the remaining rows, rebuilds the full-text index and commits."""
+        self.flush()
+        self.conn.execute("INSERT INTO verses_fts (verses_fts) VALUES ('rebuild')")
+        self.conn.execute("COMMIT")
+        self.conn.close()
+
+    def abort(self):
+        """Rolls back everything written by this writer."""
+        self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def load_translation(path, translation):
+    """Loads a translation from its JSON into the database.
+
+    Args:
+        path (str): The database file.
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+
+    Returns:
+        int: The number of verses loaded.
+    """
+    with SQLiteWriter(path, translation) as writer:
+        for book, data in corpus.iter_books(translation):
+            for chapter in data['chapters']:
+                for verse in chapter['verses']:
+                    writer.add_verse(book, data['book_amharic'], chapter['chapter'], verse['verse'], verse['text'])
+    return writer.verse_count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the JSON of each translation into a SQLite database.")
+    parser.add_argument('database', help="The database file, e.g. build/bible.sqlite.")
+    parser.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    args = parser.parse_args(argv)
+    for translation in args.translation:
+        verse_count = load_translation(args.database, translation)
+        print(f"{args.database}: loaded {verse_count} {translation} verses")
+
+if __name__ == "__main__":
+    sys.exit(main())
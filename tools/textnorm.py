@@ -0,0 +1,232 @@
+"""Text normalization and tokenization shared by the tools, with per-book token caches.
+
+normalize() puts verse and query text into one canonical form:
+
+- Unicode NFC;
+- typographic apostrophes (the KJV's ’) become ASCII ';
+- Amharic homophone letters are folded to one series, since the 1962 text (like Amharic
+  spelling generally) writes the same word with either: ሐ ኀ -> ሀ, ሠ -> ሰ, ዐ -> አ, ፀ -> ጸ,
+  in each vowel order (ሑ -> ሁ, ሡ -> ሱ, ...);
+- casefolding.
+
+tokenize() then splits the normalized text into runs of letters and digits, with inner
+apostrophes kept ("lord's"). Ethiopic punctuation (U+1360-U+1368: ፡ ። ፣ ፤ ፥ ፦ ፧ ፨) is not a word
+character, so it separates tokens just like the ASCII punctuation of the KJV.
+
+Tokenizing is done once per book and cached next to its JSON, in a tokens/ directory beside the
+json/ directory of the translation (tokens/Ruth.tok, tokens/rut.tok). A cache file records the
+size and modification time of the JSON it was built from and is rebuilt when they no longer
+match. Layout (integers are little-endian):
+
+    header      magic b'BIBLTOK1', version, JSON size (uint64), JSON mtime in ns (uint64),
+                verse, token and vocabulary counts, vocabulary size in bytes (uint32)
+    offsets     per verse and one more: index of its first token (uint32)
+    tokens      per token: index into the vocabulary (uint32)
+    vocabulary  the distinct tokens of the book, UTF-8, separated by newlines
+
+Usage:
+    python tools/textnorm.py build [--translation kjv amh] [--jobs N]
+    python tools/textnorm.py tokenize "The LORD’s ሕዝብ።"
+"""
+import argparse
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import corpus
+
+MAGIC = b'BIBLTOK1'
+# Bump when normalize() or tokenize() changes, so existing caches are rebuilt
+VERSION = 2
+
+HEADER = struct.Struct('<8sIQQ4I')
+
+TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+# First letter of each homophone series -> first letter of the series it folds into. A series
+# is the consonant in its seven vowel orders, in consecutive code points. The labialized forms
+# after them do not line up between series (ሗ is hwa, ሇ hoa) and are left alone.
+HOMOPHONE_SERIES = {
+    'ሐ': 'ሀ',
+    'ኀ': 'ሀ',
+    'ሠ': 'ሰ',
+    'ዐ': 'አ',
+    'ፀ': 'ጸ',
+}
+
+def _fold_table():
+    table = {}
+    for source, target in HOMOPHONE_SERIES.items():
+        for order in range(7):
+            table[ord(source) + order] = chr(ord(target) + order)
+    table[ord('’')] = "'"
+    table[ord('‘')] = "'"
+    return table
+
+FOLD_TABLE = _fold_table()
+
+def normalize(text):
+    """Returns text in the canonical form the tokens are taken from.
+
+    Args:
+        text (str): Verse or query text in either translation.
+
+    Returns:
+        str: NFC, with apostrophes and Amharic homophones folded, casefolded.
+    """
+    return unicodedata.normalize('NFC', text).translate(FOLD_TABLE).casefold()
+
+def tokenize(text):
+    """Splits text into normalized tokens.
+
+    Args:
+        text (str): Verse or query text in either translation.
+
+    Returns:
+        list: The tokens in order.
+    """
+    return TOKEN_RE.findall(normalize(text))
+
+def token_file(translation, book):
+    """Returns the path of a book's token cache, in tokens/ beside the translation's json/."""
+    json_file = corpus.book_file(translation, book)
+    name = os.path.splitext(os.path.basename(json_file))[0]
+    return os.path.join(os.path.dirname(os.path.dirname(json_file)), 'tokens', f"{name}.tok")
+
+def _source_stamp(translation, book):
+    stat = os.stat(corpus.book_file(translation, book))
+    return stat.st_size, stat.st_mtime_ns
+
+def write_tokens(translation, book):
+    """Tokenizes a book and writes its cache file.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        book (str): The English book name.
+
+    Returns:
+        list: One list of tokens per verse, in file order.
+    """
+    stamp = _source_stamp(translation, book)
+    verse_tokens = [tokenize(verse['text']) for chapter in corpus.load_book(translation, book)['chapters']
+                    for verse in chapter['verses']]
+    vocabulary = {}
+    offsets = array('I', [0])
+    ids = array('I')
+    for tokens in verse_tokens:
+        ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        offsets.append(len(ids))
+    vocabulary_blob = '\n'.join(vocabulary).encode('utf-8')
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        ids.byteswap()
+
+    output_file = token_file(translation, book)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *stamp, len(verse_tokens), len(ids), len(vocabulary), len(vocabulary_blob)))
+        f.write(offsets.tobytes())
+        f.write(ids.tobytes())
+        f.write(vocabulary_blob)
+    os.replace(tmp_file, output_file)
+    return verse_tokens
+
+def _read_tokens(translation, book):
+    # (offsets, ids, vocabulary) from a cache file that matches the current JSON, or None
+    try:
+        with open(token_file(translation, book), 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, size, mtime_ns, verse_count, token_count, vocabulary_count, vocabulary_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or (size, mtime_ns) != _source_stamp(translation, book):
+        return None
+    at = HEADER.size
+    offsets = array('I')
+    offsets.frombytes(data[at:at + (verse_count + 1) * 4])
+    at += (verse_count + 1) * 4
+    ids = array('I')
+    ids.frombytes(data[at:at + token_count * 4])
+    at += token_count * 4
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        ids.byteswap()
+    vocabulary = data[at:at + vocabulary_size].decode('utf-8').split('\n') if vocabulary_count else []
+    return offsets, ids, vocabulary
+
+def book_tokens(translation, book):
+    """Returns the tokens of every verse of a book, from its cache (built or refreshed as needed).
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        book (str): The English book name.
+
+    Returns:
+        list: One list of tokens per verse, in file order (the order of corpus.iter_verses).
+    """
+    cached = _read_tokens(translation, book)
+    if cached is None:
+        return write_tokens(translation, book)
+    offsets, ids, vocabulary = cached
+    tokens = [vocabulary[i] for i in ids]
+    return [tokens[offsets[n]:offsets[n + 1]] for n in range(len(offsets) - 1)]
+
+def token_counts(translation, book):
+    """Returns the number of tokens of every verse of a book as an array, without decoding them."""
+    cached = _read_tokens(translation, book)
+    if cached is None:
+        return array('I', map(len, write_tokens(translation, book)))
+    offsets = cached[0]
+    return array('I', (offsets[n + 1] - offsets[n] for n in range(len(offsets) - 1)))
+
+def build_tokens(translations=('kjv', 'amh'), jobs=None):
+    """Writes the token cache of every book that lacks an up-to-date one.
+
+    Args:
+        translations (tuple): Keys of corpus.TRANSLATION_DIRS.
+        jobs (int): Worker processes; None or 0 for one per CPU core, 1 to run in this process.
+
+    Returns:
+        dict: Number of books written and already up to date.
+    """
+    books = [(translation, book) for translation in translations for book in corpus.book_names()
+             if os.path.exists(corpus.book_file(translation, book))]
+    stale = [(translation, book) for translation, book in books if _read_tokens(translation, book) is None]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # Only the files matter; drop the returned tokens rather than pickling them back
+            list(executor.map(_write_tokens_quietly, *zip(*stale), chunksize=4))
+    else:
+        for translation, book in stale:
+            write_tokens(translation, book)
+    return {'written': len(stale), 'current': len(books) - len(stale)}
+
+def _write_tokens_quietly(translation, book):
+    write_tokens(translation, book)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the token caches or show how text is tokenized.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Tokenize every book whose cache is missing or out of date.")
+    build.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    build.add_argument('--jobs', '-j', type=int, default=0, help="Worker processes (default: one per CPU core).")
+    show = commands.add_parser('tokenize', help="Print the tokens of some text.")
+    show.add_argument('text')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        stats = build_tokens(tuple(args.translation), args.jobs)
+        print(f"{stats['written']} books tokenized, {stats['current']} already up to date")
+    else:
+        print(' '.join(tokenize(args.text)))
+
+if __name__ == "__main__":
+    sys.exit(main())
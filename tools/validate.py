@@ -0,0 +1,269 @@
+"""Integrity checks over the JSON of both translations.
+
+Every book is checked in a worker process; each worker loads the book in both translations, so
+the Amharic structure can be compared with the KJV without a second pass. Checks:
+
+    missing_book         the book's JSON file does not exist                          error
+    unreadable_book      the file is not valid JSON or lacks the expected keys         error
+    duplicate_chapter    a chapter number appears more than once                        error
+    missing_chapter      a gap in the chapter numbers                                    error
+    chapter_order        chapter numbers are not increasing                             error
+    duplicate_verse      a verse number is covered twice (alone or in a range)          error
+    missing_verse        a gap in the verse numbers of a chapter                        error
+    verse_order          verse numbers are not increasing within a chapter              error
+    empty_text           a verse without text                                           error
+    html_entity          a character reference such as &#4964; (with or without the ;)
+                         left in a label or text                                        error
+    html_tag             markup such as <br> left in a label or text                    error
+    unnumbered_verse     a verse label that is not a number or range (psalm titles)     warning
+    chapter_count        the Amharic book has a different number of chapters           warning
+    verse_count          an Amharic chapter ends on a different verse number            warning
+
+The two count checks are warnings because the Amharic versification legitimately differs from
+the KJV in places. The report is JSON: a summary (counts per check, books, chapters, verses,
+seconds) and the list of issues. The exit status is 1 if there are errors (or, with --strict,
+warnings), so the command can gate a rebuild.
+
+Usage:
+    python tools/validate.py [--output build/validation.json] [--jobs N] [--strict]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import corpus
+
+# The semicolon is optional: the parser leaves a reference without one literal, and an unknown
+# named reference (&bogus;) comes out without its semicolon
+ENTITY_RE = re.compile(r'&(?:#\d+|#[xX][0-9a-fA-F]+|[a-zA-Z]+);?')
+TAG_RE = re.compile(r'</?[a-zA-Z][^>]*>')
+
+SEVERITIES = {
+    'missing_book': 'error',
+    'unreadable_book': 'error',
+    'duplicate_chapter': 'error',
+    'missing_chapter': 'error',
+    'chapter_order': 'error',
+    'duplicate_verse': 'error',
+    'missing_verse': 'error',
+    'verse_order': 'error',
+    'empty_text': 'error',
+    'html_entity': 'error',
+    'html_tag': 'error',
+    'unnumbered_verse': 'warning',
+    'chapter_count': 'warning',
+    'verse_count': 'warning',
+}
+
+def _issue(check, translation, book, message, chapter=None, verse=None):
+    return {'check': check, 'severity': SEVERITIES[check], 'translation': translation, 'book': book,
+            'chapter': chapter, 'verse': verse, 'message': message}
+
+def check_chapters(translation, book, chapters):
+    """Checks the chapter numbering of one book.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        book (str): The English book name.
+        chapters (list): The chapter entries, with int chapter numbers.
+
+    Returns:
+        list: Issues found.
+    """
+    issues = []
+    seen = set()
+    previous = 0
+    for chapter in chapters:
+        number = chapter['chapter']
+        if number in seen:
+            issues.append(_issue('duplicate_chapter', translation, book, f"Chapter {number} appears more than once", number))
+            continue
+        if number < previous:
+            issues.append(_issue('chapter_order', translation, book, f"Chapter {number} follows chapter {previous}", number))
+        seen.add(number)
+        previous = max(previous, number)
+    for number in sorted(set(range(1, max(seen, default=0) + 1)) - seen):
+        issues.append(_issue('missing_chapter', translation, book, f"Chapter {number} is missing", number))
+    return issues
+
+def check_verses(translation, book, chapter):
+    """Checks the verses of one chapter: numbering, text and leftover markup.
+
+    Args:
+        translation (str): A key of corpus.TRANSLATION_DIRS.
+        book (str): The English book name.
+        chapter (dict): A chapter entry, with an int chapter number.
+
+    Returns:
+        list: Issues found.
+    """
+    issues = []
+    number = chapter['chapter']
+    covered = set()
+    previous = 0
+    for verse in chapter['verses']:
+        label, text = verse['verse'], verse['text']
+        for value in (label, text):
+            entity = ENTITY_RE.search(value)
+            if entity:
+                issues.append(_issue('html_entity', translation, book, f"Character reference {entity.group()} left in {value[:60]!r}",
+                                     number, label))
+            tag = TAG_RE.search(value)
+            if tag:
+                issues.append(_issue('html_tag', translation, book, f"Markup {tag.group()} left in {value[:60]!r}", number, label))
+        if not text.strip():
+            issues.append(_issue('empty_text', translation, book, "Verse has no text", number, label))
+        numbers = corpus.verse_numbers(label)
+        if numbers is None:
+            issues.append(_issue('unnumbered_verse', translation, book, f"Verse label {label!r} is not a number or range",
+                                 number, label))
+            continue
+        first, last = numbers
+        if first < previous or last < first:
+            issues.append(_issue('verse_order', translation, book, f"Verse {label} follows verse {previous}", number, label))
+        duplicates = covered.intersection(range(first, last + 1))
+        if duplicates:
+            issues.append(_issue('duplicate_verse', translation, book,
+                                 f"Verse {', '.join(map(str, sorted(duplicates)))} appears more than once", number, label))
+        covered.update(range(first, last + 1))
+        previous = max(previous, last)
+    missing = sorted(set(range(1, max(covered, default=0) + 1)) - covered)
+    if missing:
+        issues.append(_issue('missing_verse', translation, book, f"Verse {_ranges(missing)} missing", number))
+    return issues
+
+def _ranges(numbers):
+    # [1, 2, 3, 7] -> "1-3, 7"
+    spans = []
+    for n in numbers:
+        if spans and spans[-1][1] == n - 1:
+            spans[-1][1] = n
+        else:
+            spans.append([n, n])
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in spans)
+
+def _last_verses(chapters):
+    # {chapter: highest verse number}, first occurrence of each chapter only
+    last_verses = {}
+    for chapter in chapters:
+        if chapter['chapter'] in last_verses:
+            continue
+        numbers = [corpus.verse_numbers(v['verse']) for v in chapter['verses']]
+        last_verses[chapter['chapter']] = max((last for _, last in filter(None, numbers)), default=0)
+    return last_verses
+
+def check_structure(book, kjv_chapters, amh_chapters):
+    """Compares the chapter and verse counts of the Amharic book with the KJV.
+
+    Returns:
+        list: Issues found, reported against the Amharic text.
+    """
+    issues = []
+    kjv_last = _last_verses(kjv_chapters)
+    amh_last = _last_verses(amh_chapters)
+    if len(kjv_last) != len(amh_last):
+        issues.append(_issue('chapter_count', 'amh', book, f"{len(amh_last)} chapters, the KJV has {len(kjv_last)}"))
+    for number, last in amh_last.items():
+        if number in kjv_last and kjv_last[number] != last:
+            ends = f"Ends on verse {last}" if last else "No numbered verses"
+            issues.append(_issue('verse_count', 'amh', book, f"{ends}, the KJV chapter ends on verse {kjv_last[number]}", number))
+    return issues
+
+def validate_book(book, translations=('kjv', 'amh')):
+    """Runs every check on one book in the given translations.
+
+    Args:
+        book (str): The English book name.
+        translations (tuple): Keys of corpus.TRANSLATION_DIRS.
+
+    Returns:
+        tuple: (issues, {'chapters': n, 'verses': n}) over the translations.
+    """
+    issues = []
+    counts = {'chapters': 0, 'verses': 0}
+    loaded = {}
+    for translation in translations:
+        path = corpus.book_file(translation, book)
+        if not os.path.exists(path):
+            issues.append(_issue('missing_book', translation, book, f"{path} does not exist"))
+            continue
+        try:
+            chapters = corpus.load_book(translation, book)['chapters']
+            for chapter in chapters:
+                for verse in chapter['verses']:
+                    verse['verse'], verse['text']
+        except (ValueError, KeyError, TypeError) as e:
+            issues.append(_issue('unreadable_book', translation, book, f"{path}: {e!r}"))
+            continue
+        loaded[translation] = chapters
+        counts['chapters'] += len(chapters)
+        issues.extend(check_chapters(translation, book, chapters))
+        for chapter in chapters:
+            counts['verses'] += len(chapter['verses'])
+            issues.extend(check_verses(translation, book, chapter))
+    if 'kjv' in loaded and 'amh' in loaded:
+        issues.extend(check_structure(book, loaded['kjv'], loaded['amh']))
+    return issues, counts
+
+def validate(translations=('kjv', 'amh'), jobs=None):
+    """Validates every book, in parallel.
+
+    Args:
+        translations (tuple): Keys of corpus.TRANSLATION_DIRS.
+        jobs (int): Worker processes; None or 0 for one per CPU core, 1 to run in this process.
+
+    Returns:
+        dict: The report, {'summary': {...}, 'issues': [...]}.
+    """
+    start = time.perf_counter()
+    books = corpus.book_names()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(validate_book, books, [translations] * len(books), chunksize=4))
+    else:
+        results = [validate_book(book, translations) for book in books]
+
+    issues = [issue for book_issues, _ in results for issue in book_issues]
+    summary = {
+        'translations': list(translations),
+        'books': len(books),
+        'chapters': sum(counts['chapters'] for _, counts in results),
+        'verses': sum(counts['verses'] for _, counts in results),
+        'errors': sum(1 for issue in issues if issue['severity'] == 'error'),
+        'warnings': sum(1 for issue in issues if issue['severity'] == 'warning'),
+        'checks': {name: sum(1 for issue in issues if issue['check'] == name) for name in SEVERITIES},
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    return {'summary': summary, 'issues': issues}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the JSON of both translations for structural and text problems.")
+    parser.add_argument('--output', '-o', help="Write the full JSON report to this file (default: print it).")
+    parser.add_argument('--translation', nargs='+', choices=sorted(corpus.TRANSLATION_DIRS), default=['kjv', 'amh'])
+    parser.add_argument('--jobs', '-j', type=int, default=0, help="Worker processes (default: one per CPU core).")
+    parser.add_argument('--strict', action='store_true', help="Exit with status 1 on warnings too.")
+    args = parser.parse_args(argv)
+
+    report = validate(tuple(args.translation), args.jobs)
+    summary = report['summary']
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        counts = ", ".join(f"{name} {count}" for name, count in summary['checks'].items() if count)
+        print(f"{summary['verses']} verses in {summary['books']} books: {summary['errors']} errors, "
+              f"{summary['warnings']} warnings ({counts or 'none'}) in {summary['seconds']}s; report in {args.output}",
+              file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    if summary['errors'] or (args.strict and summary['warnings']):
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())